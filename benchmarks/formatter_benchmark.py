@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""Compare the streaming formatters with the previous string-concatenation versions.
+
+Builds a synthetic word-level result (100k segments by default) and times
+SRT, VTT and word-timestamp output both ways, plus streaming to a file.
+
+    python benchmarks/formatter_benchmark.py --segments 100000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from core.formatters import format_timestamp, format_srt, format_vtt, format_word_timestamps, write_result
+
+
+# Previous implementations, kept here as the comparison baseline
+def legacy_format_srt(segments):
+    srt_content = ""
+    for i, segment in enumerate(segments, start=1):
+        start = format_timestamp(segment['start'], always_include_hours=True, decimal_marker=',')
+        end = format_timestamp(segment['end'], always_include_hours=True, decimal_marker=',')
+        srt_content += f"{i}\n{start} --> {end}\n{segment['text'].strip()}\n\n"
+    return srt_content
+
+
+def legacy_format_vtt(segments):
+    vtt_content = "WEBVTT\n\n"
+    for i, segment in enumerate(segments, start=1):
+        start = format_timestamp(segment['start'], always_include_hours=True)
+        end = format_timestamp(segment['end'], always_include_hours=True)
+        vtt_content += f"{start} --> {end}\n{segment['text'].strip()}\n\n"
+    return vtt_content
+
+
+def legacy_format_word_timestamps(result):
+    if not result.get('segments'):
+        return "No word timestamps available in results."
+    formatted_text = ""
+    for segment in result['segments']:
+        if 'words' in segment:
+            for word in segment['words']:
+                timestamp = format_timestamp(word['start'])
+                formatted_text += f"[{timestamp}] {word['word']} "
+            formatted_text += "\n"
+        else:
+            start = format_timestamp(segment['start'])
+            formatted_text += f"[{start}] {segment['text'].strip()}\n"
+    return formatted_text
+
+
+def make_result(segment_count, words_per_segment=6):
+    segments = []
+    position = 0.0
+    for i in range(segment_count):
+        words = []
+        for j in range(words_per_segment):
+            words.append({'word': f" word{j}", 'start': position, 'end': position + 0.3, 'probability': 0.9})
+            position += 0.35
+        segments.append({
+            'id': i,
+            'start': words[0]['start'],
+            'end': words[-1]['end'],
+            'text': "".join(word['word'] for word in words),
+            'words': words
+        })
+    return {'text': "".join(segment['text'] for segment in segments), 'segments': segments}
+
+
+def measure(function):
+    """Return (seconds, peak traced MB) for one call"""
+    # Time without tracing first, since tracemalloc slows allocation-heavy code
+    start = time.perf_counter()
+    function()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / (1024 * 1024)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--segments", type=int, default=100000, help="number of synthetic segments")
+    args = parser.parse_args(argv)
+
+    result = make_result(args.segments)
+    segments = result['segments']
+    cases = [
+        ("srt", lambda: legacy_format_srt(segments), lambda: format_srt(segments)),
+        ("vtt", lambda: legacy_format_vtt(segments), lambda: format_vtt(segments)),
+        ("word_timestamps", lambda: legacy_format_word_timestamps(result), lambda: format_word_timestamps(result)),
+    ]
+
+    print(f"{args.segments} segments, {len(segments[0]['words'])} words each")
+    print(f"{'format':16s} {'legacy s':>9s} {'new s':>9s} {'speedup':>8s} {'legacy MB':>10s} {'new MB':>8s}")
+    for name, legacy, new in cases:
+        if legacy() != new():
+            print(f"{name}: outputs differ!")
+            return 1
+        legacy_time, legacy_mb = measure(legacy)
+        new_time, new_mb = measure(new)
+        print(f"{name:16s} {legacy_time:9.3f} {new_time:9.3f} {legacy_time / new_time:7.2f}x {legacy_mb:10.1f} {new_mb:8.1f}")
+
+    # Streaming straight to a file never holds the document in memory
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in ("srt", "word_timestamps"):
+            path = os.path.join(tmp, f"out.{name}")
+            def stream():
+                with open(path, 'w', encoding='utf-8') as f:
+                    write_result(result, name, f)
+            elapsed, peak_mb = measure(stream)
+            print(f"{name + ' -> file':16s} {'':9s} {elapsed:9.3f} {'':8s} {'':10s} {peak_mb:8.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
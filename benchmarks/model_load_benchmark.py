@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""Compare whisper.load_model with the memory-mapped loader in core.checkpoints.
+
+Each load runs in a fresh interpreter so nothing is shared between runs
+except the operating system's page cache. Reported per model and loader:
+load time and, on Linux, how much of the process's memory is private
+anonymous memory (weight copies no other process can share) versus
+file-backed pages that every process mapping the same file shares.
+
+    python benchmarks/model_load_benchmark.py --models tiny base small --runs 3
+
+The first mmap run converts the checkpoint, so it is done once as a warm-up.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+
+# Runs inside the child interpreter; prints one JSON line with the measurements
+CHILD_SCRIPT = r'''
+import json, os, sys, time
+sys.path.insert(0, sys.argv[1])
+import torch, whisper
+from core.checkpoints import load_mmap_model
+model_name, loader = sys.argv[2], sys.argv[3]
+start = time.perf_counter()
+if loader == "mmap":
+    model = load_mmap_model(model_name)
+else:
+    model = whisper.load_model(model_name, device="cpu")
+load_seconds = time.perf_counter() - start
+with torch.no_grad():
+    # Touch every weight once, as a transcription would
+    model.encoder(torch.zeros(1, model.dims.n_mels, 3000))
+memory = {}
+if os.path.exists("/proc/self/smaps_rollup"):
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            key, _, value = line.partition(":")
+            if key in ("Rss", "Anonymous"):
+                memory[key] = int(value.split()[0]) / 1024
+print(json.dumps({"load": load_seconds, "rss_mb": memory.get("Rss"), "anonymous_mb": memory.get("Anonymous")}))
+'''
+
+
+def run_child(model_name, loader):
+    output = subprocess.run([sys.executable, "-c", CHILD_SCRIPT, SRC_DIR, model_name, loader],
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--models", nargs="+", default=["tiny"], help="model names or checkpoint paths")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    for model_name in args.models:
+        run_child(model_name, "mmap")  # Convert once and warm the page cache
+        for loader in ("whisper", "mmap"):
+            runs = [run_child(model_name, loader) for _ in range(args.runs)]
+            line = f"{model_name:<12} {loader:<8} load {statistics.median(r['load'] for r in runs):6.2f}s"
+            if runs[-1]['rss_mb'] is not None:
+                line += f"  RSS {runs[-1]['rss_mb']:6.0f} MB, of which private {runs[-1]['anonymous_mb']:6.0f} MB"
+            print(line)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
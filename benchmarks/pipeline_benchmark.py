@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""Benchmark decode -> transcribe -> format on synthetic audio, offline and headless.
+
+Fixtures are generated locally from a fixed seed, so every run sees the same
+samples: a steady tone with harmonics, speech-like noise (voiced pulses and
+hiss shaped by vowel formants, in syllable-length bursts), speech with long
+pauses between phrases, and near-silence. Each pattern is written as a WAV
+file for every --durations length. Each file then goes through the same
+stages as the app: FFmpeg decode, transcription with an already downloaded
+model (tiny by default, temperature 0 so decoding is deterministic) and
+writing every output format. Reported per stage: throughput in seconds of
+audio per second, latency percentiles over all files and runs, and the
+process's peak memory.
+
+    python benchmarks/pipeline_benchmark.py --save-baseline baseline.json
+    python benchmarks/pipeline_benchmark.py --baseline baseline.json --threshold 0.15
+
+With --baseline, exits non-zero if any stage's p50 or p95 latency, or the
+peak memory, is more than --threshold (a fraction) worse than the baseline.
+Only compare baselines recorded on the same machine with the same options.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import wave
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from core.audio import SAMPLE_RATE
+from core.formatters import write_result_next_to_source
+from core.instrumentation import JobMetrics, collect_metrics, peak_rss_mb
+from core.pipeline import load_model, decode_audio, transcribe_file
+
+PATTERNS = ("tone", "speech", "pauses", "silence")
+STAGES = ("decode", "transcribe", "format")
+OUTPUT_FORMATS = ("text", "srt", "vtt", "json")
+PERCENTILES = (50, 95, 99)
+# Latency differences below this are timer and scheduler noise, never a regression
+NOISE_FLOOR_MS = 2.0
+
+# Rough first and second formants (Hz) of a few vowels
+VOWEL_FORMANTS = ((730, 1090), (270, 2290), (530, 1840), (570, 840), (300, 870))
+
+
+def tone(rng, samples):
+    """A slowly gliding tone with a few harmonics"""
+    t = np.arange(samples) / SAMPLE_RATE
+    frequency = 220 + 40 * np.sin(2 * np.pi * 0.2 * t)
+    phase = 2 * np.pi * np.cumsum(frequency) / SAMPLE_RATE
+    return 0.3 * sum(np.sin(harmonic * phase) / harmonic for harmonic in (1, 2, 3))
+
+
+def _syllable(rng, length):
+    """One voiced or unvoiced burst filtered through a random vowel's formants"""
+    pitch = rng.uniform(100, 220)
+    pulses = np.zeros(length)
+    pulses[::max(1, int(SAMPLE_RATE / pitch))] = 1.0
+    source = pulses + 0.05 * rng.standard_normal(length) if rng.random() < 0.8 else rng.standard_normal(length)
+    spectrum = np.fft.rfft(source)
+    frequencies = np.fft.rfftfreq(length, 1 / SAMPLE_RATE)
+    response = sum(1 / (1 + ((frequencies - formant) / 120) ** 2) for formant in VOWEL_FORMANTS[rng.integers(5)])
+    burst = np.fft.irfft(spectrum * response, length)
+    return burst * np.hanning(length) / (np.abs(burst).max() + 1e-9)
+
+
+def speech(rng, samples, pause_every=None):
+    """Syllable-rate bursts of shaped noise; with pause_every, a 2-4 s pause after that many seconds"""
+    audio = np.zeros(samples)
+    position = 0
+    phrase_start = 0
+    while position < samples:
+        length = int(rng.uniform(0.12, 0.35) * SAMPLE_RATE)
+        burst = _syllable(rng, length)[:samples - position]
+        audio[position:position + len(burst)] = 0.3 * rng.uniform(0.5, 1.0) * burst
+        position += length + int(rng.uniform(0.0, 0.08) * SAMPLE_RATE)
+        if pause_every and position - phrase_start > pause_every * SAMPLE_RATE:
+            position += int(rng.uniform(2.0, 4.0) * SAMPLE_RATE)
+            phrase_start = position
+    return audio
+
+
+def generate_fixture(pattern, seconds, seed=0):
+    """Float samples for one fixture; the same pattern, length and seed always give the same audio"""
+    rng = np.random.default_rng([seed, PATTERNS.index(pattern), int(seconds * 1000)])
+    samples = int(seconds * SAMPLE_RATE)
+    if pattern == "tone":
+        audio = tone(rng, samples)
+    elif pattern == "speech":
+        audio = speech(rng, samples)
+    elif pattern == "pauses":
+        audio = speech(rng, samples, pause_every=5.0)
+    else:
+        audio = np.zeros(samples)
+    # A faint noise floor, as in any real recording
+    return audio + 0.002 * rng.standard_normal(samples)
+
+
+def write_wav(path, audio):
+    with wave.open(path, 'wb') as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(SAMPLE_RATE)
+        f.writeframes((np.clip(audio, -1, 1) * 32767).astype('<i2').tobytes())
+
+
+def write_fixtures(directory, durations, seed=0):
+    """Write every pattern at every duration and return [(path, seconds)]"""
+    fixtures = []
+    for seconds in durations:
+        for pattern in PATTERNS:
+            path = os.path.join(directory, f"{pattern}_{seconds:g}s.wav")
+            write_wav(path, generate_fixture(pattern, seconds, seed))
+            fixtures.append((path, seconds))
+    return fixtures
+
+
+def summarize(samples):
+    """Latency percentiles in ms and throughput for a list of (seconds taken, seconds of audio)"""
+    latencies = np.array([seconds for seconds, _ in samples])
+    total_audio = sum(audio for _, audio in samples)
+    summary = {f"p{p}_ms": float(np.percentile(latencies, p)) * 1000 for p in PERCENTILES}
+    summary['total_seconds'] = float(latencies.sum())
+    summary['audio_per_second'] = total_audio / latencies.sum() if latencies.sum() else 0.0
+    return summary
+
+
+def run_benchmark(fixtures, model_name, runs, output_dir):
+    import torch
+    torch.manual_seed(0)
+    with contextlib.redirect_stdout(io.StringIO()):
+        model, load_seconds, _ = load_model(model_name, "cpu")
+        # Warm-up: first-call allocations and kernel selection should not count
+        transcribe_file(model, fixtures[0][0], model_name, format_options={'temperature': 0.0}, use_cache=False)
+    load_rss = peak_rss_mb()
+
+    samples = {name: [] for name in STAGES}
+    breakdown = {}
+    for _ in range(runs):
+        for audio_file, seconds in fixtures:
+            metrics = JobMetrics(audio_file, model_name, "cpu")
+            # The pipeline prints per-file diagnostics; keep the report readable
+            with contextlib.redirect_stdout(io.StringIO()), collect_metrics(metrics):
+                start = time.perf_counter()
+                audio_data = decode_audio(audio_file)
+                decoded = time.perf_counter()
+                result = transcribe_file(model, audio_file, model_name, format_options={'temperature': 0.0},
+                                         use_cache=False, audio_data=audio_data)
+                transcribed = time.perf_counter()
+                for output_format in OUTPUT_FORMATS:
+                    write_result_next_to_source(result, audio_file, output_format, output_dir)
+                formatted = time.perf_counter()
+            samples["decode"].append((decoded - start, seconds))
+            samples["transcribe"].append((transcribed - decoded, seconds))
+            samples["format"].append((formatted - transcribed, seconds))
+            for name in ("mel", "encoder", "decoder"):
+                breakdown[name] = breakdown.get(name, 0.0) + metrics.stages.get(name, 0.0)
+
+    report = {name: summarize(samples[name]) for name in STAGES}
+    report['pipeline'] = summarize([(sum(samples[name][i][0] for name in STAGES), samples["decode"][i][1])
+                                    for i in range(len(samples["decode"]))])
+    report['transcribe']['breakdown_seconds'] = breakdown
+    report['load_seconds'] = load_seconds
+    report['load_rss_mb'] = load_rss
+    report['peak_rss_mb'] = peak_rss_mb()
+    return report
+
+
+def environment():
+    import torch
+    return {
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'python': platform.python_version(),
+        'torch': torch.__version__,
+        'torch_threads': torch.get_num_threads()
+    }
+
+
+def compare(report, baseline, threshold):
+    """Lines describing each compared figure and the list of regressions beyond threshold"""
+    lines = []
+    regressions = []
+    checks = [(f"{name} p{p}", report[name][f"p{p}_ms"], baseline['results'].get(name, {}).get(f"p{p}_ms"), "ms")
+              for name in STAGES + ('pipeline',) for p in (50, 95)]
+    checks.append(("peak memory", report['peak_rss_mb'], baseline['results'].get('peak_rss_mb'), "MB"))
+    for label, current, previous, unit in checks:
+        if current is None or not previous:
+            continue
+        change = current / previous - 1
+        marker = ""
+        if change > threshold and (unit != "ms" or current - previous > NOISE_FLOOR_MS):
+            marker = "  REGRESSION"
+            regressions.append(label)
+        lines.append(f"{label:<16} {previous:10.1f} -> {current:10.1f} {unit}  {change:+7.1%}{marker}")
+    return lines, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="tiny", help="model name or checkpoint path (must already be downloaded)")
+    parser.add_argument("--durations", type=float, nargs="+", default=[5, 30, 90],
+                        help="fixture lengths in seconds, one file per pattern each")
+    parser.add_argument("--runs", type=int, default=3, help="times each fixture is processed")
+    parser.add_argument("--threads", type=int, help="torch CPU threads (default: torch's choice)")
+    parser.add_argument("--seed", type=int, default=0, help="fixture seed")
+    parser.add_argument("--json", help="also write the full report to this JSON file")
+    parser.add_argument("--baseline", help="compare against this baseline and fail on regressions")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="allowed slowdown or memory growth over the baseline (default 0.2 = 20%%)")
+    parser.add_argument("--save-baseline", help="write this run as a baseline file")
+    args = parser.parse_args(argv)
+
+    import torch
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    config = {'model': args.model, 'durations': args.durations, 'runs': args.runs, 'seed': args.seed,
+              'patterns': list(PATTERNS), 'formats': list(OUTPUT_FORMATS)}
+
+    with tempfile.TemporaryDirectory() as directory:
+        output_dir = os.path.join(directory, "out")
+        os.makedirs(output_dir)
+        fixtures = write_fixtures(directory, args.durations, args.seed)
+        audio_seconds = sum(seconds for _, seconds in fixtures)
+        print(f"{len(fixtures)} fixtures, {audio_seconds:g}s of audio, {args.runs} runs, model {args.model}")
+        report = run_benchmark(fixtures, args.model, args.runs, output_dir)
+
+    print(f"{'stage':<12} {'p50':>9} {'p95':>9} {'p99':>9}  {'audio s/s':>10}")
+    for name in STAGES + ('pipeline',):
+        row = report[name]
+        print(f"{name:<12} {row['p50_ms']:7.1f}ms {row['p95_ms']:7.1f}ms {row['p99_ms']:7.1f}ms  "
+              f"{row['audio_per_second']:10.1f}")
+    breakdown = report['transcribe']['breakdown_seconds']
+    print("transcribe:  " + ", ".join(f"{name} {seconds:.2f}s" for name, seconds in breakdown.items()))
+    print(f"model load {report['load_seconds']:.2f}s, peak RSS {report['peak_rss_mb'] or 0:.0f} MB "
+          f"({report['load_rss_mb'] or 0:.0f} MB after load)")
+
+    run = {'environment': environment(), 'config': config, 'results': report}
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(run, f, indent=2)
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            json.dump(run, f, indent=2)
+        print(f"Saved baseline to {args.save_baseline}")
+
+    if not args.baseline:
+        return 0
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    if baseline.get('config') != config:
+        print("warning: the baseline was recorded with different options; figures may not be comparable")
+    if baseline.get('environment', {}).get('platform') != run['environment']['platform']:
+        print("warning: the baseline was recorded on a different platform")
+    lines, regressions = compare(report, baseline, args.threshold)
+    print(f"Compared with {args.baseline} (threshold {args.threshold:.0%}):")
+    for line in lines:
+        print("  " + line)
+    if regressions:
+        print(f"REGRESSION: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
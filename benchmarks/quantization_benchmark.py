@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""Compare fp32 and dynamic int8 CPU transcription: word error rate and speed per model.
+
+The corpus is a directory of audio files, each with a reference transcript
+of the same name and a .txt extension (meeting.wav + meeting.txt). Every
+model is run on the CPU in both modes over the same files; the table shows
+corpus WER against the references, total wall time and the real-time
+factor (processing time / audio length, lower is faster).
+
+    python benchmarks/quantization_benchmark.py --corpus samples/ --models tiny base small
+
+The first int8 run of a model also quantizes it and stores it on disk, so
+each mode transcribes one warm-up file before timing starts.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from core.audio import SAMPLE_RATE
+from core.metrics import corpus_word_error_rate
+from core.pipeline import load_model, decode_audio
+
+AUDIO_EXTENSIONS = ('.wav', '.mp3', '.m4a', '.flac', '.ogg')
+DTYPES = ("float32", "int8")
+
+
+def load_corpus(corpus_dir):
+    """(audio path, reference text) pairs for every audio file with a reference transcript"""
+    corpus = []
+    for name in sorted(os.listdir(corpus_dir)):
+        stem, extension = os.path.splitext(name)
+        reference = os.path.join(corpus_dir, stem + ".txt")
+        if extension.lower() in AUDIO_EXTENSIONS and os.path.exists(reference):
+            with open(reference, encoding='utf-8') as f:
+                corpus.append((os.path.join(corpus_dir, name), f.read()))
+    return corpus
+
+
+def read_audio(audio_file):
+    audio_data = decode_audio(audio_file)
+    if audio_data is None:
+        import whisper
+        audio_data = whisper.load_audio(audio_file)
+    return audio_data
+
+
+def run_mode(model_name, dtype, corpus, audio, threads):
+    import torch
+    if threads:
+        torch.set_num_threads(threads)
+    model, load_time, _ = load_model(model_name, "cpu", dtype)
+    # Warm-up: first-call allocations and kernel selection should not count
+    model.transcribe(audio[0][:30 * SAMPLE_RATE], fp16=False)
+
+    pairs = []
+    start_time = time.perf_counter()
+    for (audio_file, reference), audio_data in zip(corpus, audio):
+        result = model.transcribe(audio_data, fp16=False, temperature=0.0)
+        pairs.append((reference, result['text']))
+    elapsed = time.perf_counter() - start_time
+    audio_seconds = sum(len(audio_data) for audio_data in audio) / SAMPLE_RATE
+    return {
+        'model': model_name,
+        'dtype': dtype,
+        'wer': corpus_word_error_rate(pairs),
+        'seconds': elapsed,
+        'rtf': elapsed / audio_seconds if audio_seconds else 0.0,
+        'load_seconds': load_time
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", required=True, help="directory of audio files with same-name .txt references")
+    parser.add_argument("--models", nargs="+", default=["tiny"], help="model names or checkpoint paths")
+    parser.add_argument("--threads", type=int, help="torch CPU threads (default: torch's choice)")
+    parser.add_argument("--json", help="also write the rows to this JSON file")
+    args = parser.parse_args(argv)
+
+    corpus = load_corpus(args.corpus)
+    if not corpus:
+        print(f"No audio files with .txt references in {args.corpus}", file=sys.stderr)
+        return 1
+    # Decode once; both modes see exactly the same samples
+    audio = [read_audio(audio_file) for audio_file, _ in corpus]
+    print(f"{len(corpus)} files, {sum(len(a) for a in audio) / SAMPLE_RATE:.0f}s of audio")
+
+    rows = []
+    for model_name in args.models:
+        for dtype in DTYPES:
+            rows.append(run_mode(model_name, dtype, corpus, audio, args.threads))
+            row = rows[-1]
+            print(f"{row['model']:<12} {row['dtype']:<8} WER {row['wer']:6.1%}  "
+                  f"{row['seconds']:7.1f}s  RTF {row['rtf']:.3f}")
+        fp32, int8 = rows[-2], rows[-1]
+        speedup = fp32['seconds'] / int8['seconds'] if int8['seconds'] else 0.0
+        print(f"{model_name}: int8 is {speedup:.2f}x the speed of fp32, "
+              f"WER {int8['wer'] - fp32['wer']:+.1%}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(rows, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
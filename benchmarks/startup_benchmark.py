@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""Measure GUI cold start: interpreter start -> imports -> first paint of the main window.
+
+Each run launches a fresh interpreter so module caches do not hide import
+cost. Exits non-zero if the median time to first paint exceeds --max-seconds.
+
+    python benchmarks/startup_benchmark.py --runs 5 --max-seconds 2.0
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+
+# Runs inside the child interpreter; prints one JSON line with the timings
+CHILD_SCRIPT = r'''
+import time
+start = time.perf_counter()
+import json, sys
+sys.path.insert(0, sys.argv[1])
+from PyQt6.QtCore import QObject, QEvent, QTimer
+from PyQt6.QtWidgets import QApplication
+from gui.main_window import MainWindow
+imported = time.perf_counter()
+
+class FirstPaint(QObject):
+    def __init__(self):
+        super().__init__()
+        self.painted = None
+        self.torch_loaded = None
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Type.Paint and self.painted is None:
+            self.painted = time.perf_counter()
+            self.torch_loaded = 'torch' in sys.modules
+            QTimer.singleShot(0, app.quit)
+        return False
+
+app = QApplication(sys.argv[:1])
+window = MainWindow()
+created = time.perf_counter()
+first_paint = FirstPaint()
+window.installEventFilter(first_paint)
+window.show()
+QTimer.singleShot(10000, app.quit)  # Safety net if no paint ever arrives
+app.exec()
+if window.hardware_probe is not None:
+    window.hardware_probe.wait()
+print(json.dumps({
+    "import": imported - start,
+    "window": created - start,
+    "first_paint": (first_paint.painted or time.perf_counter()) - start,
+    "torch_loaded_before_paint": first_paint.torch_loaded,
+}))
+'''
+
+
+def run_once():
+    env = dict(os.environ)
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD_SCRIPT, SRC_DIR],
+        capture_output=True, text=True, env=env, check=True
+    ).stdout
+    # The app prints diagnostics too; the timings are the last JSON line
+    return json.loads([line for line in output.splitlines() if line.startswith("{")][-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="number of cold starts to measure")
+    parser.add_argument("--max-seconds", type=float, help="fail if median time to first paint exceeds this")
+    args = parser.parse_args(argv)
+
+    runs = [run_once() for _ in range(args.runs)]
+    for stage in ("import", "window", "first_paint"):
+        values = [run[stage] for run in runs]
+        print(f"{stage:12s} median {statistics.median(values) * 1000:7.1f} ms  "
+              f"min {min(values) * 1000:7.1f} ms  max {max(values) * 1000:7.1f} ms")
+
+    if any(run["torch_loaded_before_paint"] for run in runs):
+        print("warning: torch was imported before the first paint")
+
+    median_paint = statistics.median(run["first_paint"] for run in runs)
+    if args.max_seconds is not None and median_paint > args.max_seconds:
+        print(f"REGRESSION: median first paint {median_paint:.2f}s exceeds {args.max_seconds:.2f}s")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,21 @@
-import subprocess
-import re
+import contextlib
+import importlib.util
 import os
-import shutil
 import sys
 
+def _load_hardware_module():
+    """Load src/core/hardware.py directly.
+
+    This script runs before any dependencies are installed, so the core
+    package itself (which needs numpy) cannot be imported; hardware.py only
+    uses the standard library.
+    """
+    module_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "src", "core", "hardware.py")
+    spec = importlib.util.spec_from_file_location("whisper_transcriber_hardware", module_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
 def detect_cuda_version():
     """
     Detect CUDA version using nvidia-smi.
@@ -12,59 +24,19 @@ def detect_cuda_version():
         - "NOT_FOUND" if nvidia-smi works but CUDA version can't be extracted
         - "COMMAND_FAILED" if the nvidia-smi command fails
     """
-    cuda_version = None
-    
     try:
-        # Check if nvidia-smi is available using shutil.which
-        nvidia_smi_path = shutil.which("nvidia-smi")
-        if nvidia_smi_path:
-            # First try a simple call with no arguments to verify it works
-            try:
-                result = subprocess.run([nvidia_smi_path], capture_output=True, text=True, timeout=5)
-                if result.returncode == 0:
-                    # Extract CUDA version from the direct output
-                    version_match = re.search(r"CUDA Version:\s+(\d+\.\d+)", result.stdout)
-                    if version_match:
-                        cuda_version = version_match.group(1)
-                    else:
-                        return "NOT_FOUND"
-                else:
-                    return "COMMAND_FAILED"
-            except Exception:
-                return "COMMAND_FAILED"
-        else:
-            # Try looking for it manually in common locations
-            possible_paths = [
-                os.path.join(os.environ.get("ProgramFiles", "C:\\Program Files"), "NVIDIA Corporation\\NVSMI\\nvidia-smi.exe"),
-                os.path.join(os.environ.get("ProgramW6432", "C:\\Program Files"), "NVIDIA Corporation\\NVSMI\\nvidia-smi.exe")
-            ]
-            
-            for possible_path in possible_paths:
-                if os.path.exists(possible_path):
-                    try:
-                        result = subprocess.run([possible_path], capture_output=True, text=True, timeout=5)
-                        if result.returncode == 0:
-                            # Extract CUDA version from output
-                            version_match = re.search(r"CUDA Version:\s+(\d+\.\d+)", result.stdout)
-                            if version_match:
-                                cuda_version = version_match.group(1)
-                                break
-                            else:
-                                return "NOT_FOUND"
-                        else:
-                            continue  # Try next path
-                    except Exception:
-                        continue  # Try next path
-            
-            # If we've checked all paths and still have no version
-            if cuda_version is None:
-                return "COMMAND_FAILED"
+        hardware = _load_hardware_module()
+        # Keep diagnostics off stdout, which install scripts redirect into cuda_version.txt
+        with contextlib.redirect_stdout(sys.stderr):
+            info = hardware.get_nvidia_smi_info()
     except Exception:
         return "COMMAND_FAILED"
-        
-    return cuda_version or "NOT_FOUND"
+    
+    if info["status"] == hardware.STATUS_OK:
+        return info["cuda_version"]
+    return info["status"]
 
 if __name__ == "__main__":
     # When run directly, print the CUDA version to stdout
     version = detect_cuda_version()
-    print(version)
\ No newline at end of file
+    print(version)
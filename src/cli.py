@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""Headless command line transcriber.
+
+Runs the same load -> decode -> transcribe -> format pipeline as the GUI
+without importing Qt, e.g.:
+
+    python -m src.cli recordings/*.mp3 --model base --format srt --format json
+
+Binary transcripts (.wtr) given as inputs are converted to the requested
+formats without loading a model:
+
+    python -m src.cli archive/*.wtr --format srt
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+
+# Make the core package importable whether run as a module or a script, as run.py does
+current_dir = os.path.dirname(os.path.abspath(__file__))
+if current_dir not in sys.path:
+    sys.path.insert(0, current_dir)
+
+from core.formatters import TRANSCRIPTION_FORMATS, output_file_for
+from core.alignment import unaligned_segments
+from core.pipeline import (
+    select_device, model_dtype, load_model, transcribe_file, lookup_cached_result, transcribe_files_batched,
+    prefetch_audio, BackgroundWriter, align_words, cached_words
+)
+from core.batching import batching_supported
+from core.instrumentation import JobMetrics, MetricsLog, collect_metrics
+from core.binary_transcript import BINARY_EXTENSION, TranscriptFormatError, export_transcript
+
+AUDIO_EXTENSIONS = ('.mp3', '.wav', '.m4a', '.flac', '.ogg')
+
+# Output formats selectable on the command line, e.g. "srt" -> "SRT Subtitles"
+OUTPUT_FORMATS = {fmt["output_format"]: name for name, fmt in TRANSCRIPTION_FORMATS.items()}
+
+
+def collect_audio_files(inputs, recursive=False):
+    """Expand files, glob patterns and directories into a sorted list of audio files"""
+    audio_files = []
+    for pattern in inputs:
+        if os.path.isdir(pattern):
+            walker = os.walk(pattern) if recursive else [(pattern, [], os.listdir(pattern))]
+            for root, _, names in walker:
+                audio_files.extend(
+                    os.path.join(root, name) for name in names
+                    if name.lower().endswith(AUDIO_EXTENSIONS)
+                )
+        else:
+            matches = glob.glob(pattern, recursive=recursive)
+            audio_files.extend(matches if matches else [pattern])
+    # Keep order stable and drop duplicates
+    return list(dict.fromkeys(os.path.abspath(f) for f in sorted(audio_files)))
+
+
+def build_format_options(output_formats):
+    """Merge the transcribe options of every requested format"""
+    options = {"verbose": False, "word_timestamps": False}
+    for output_format in output_formats:
+        format_options = TRANSCRIPTION_FORMATS[OUTPUT_FORMATS[output_format]]["options"]
+        options["word_timestamps"] = options["word_timestamps"] or format_options.get("word_timestamps", False)
+    return options
+
+
+def needs_word_alignment(output_formats):
+    """Whether any of the output formats shows word timings"""
+    return any(TRANSCRIPTION_FORMATS[OUTPUT_FORMATS[output_format]].get("align_words", False)
+               for output_format in output_formats)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Transcribe audio files with Whisper without the GUI")
+    parser.add_argument("inputs", nargs="+",
+                        help="audio files, glob patterns or directories (.wtr binary transcripts are converted)")
+    parser.add_argument("--model", "-m", default="tiny",
+                        help="Whisper model (tiny, base, small, medium, large) or checkpoint path (default: tiny)")
+    parser.add_argument("--format", "-f", dest="formats", action="append", choices=sorted(OUTPUT_FORMATS),
+                        help="output format, may be repeated (default: text)")
+    parser.add_argument("--output-dir", "-o", help="write results here instead of next to each source file")
+    parser.add_argument("--device", choices=["auto", "cpu", "cuda"], default="auto", help="processing device")
+    parser.add_argument("--recursive", "-r", action="store_true", help="search directories and ** globs recursively")
+    parser.add_argument("--long-form", action="store_true", help="split long CPU jobs across worker processes")
+    parser.add_argument("--vad", action="store_true",
+                        help="skip silence with voice activity detection; timestamps stay on the original timeline")
+    parser.add_argument("--batch-size", type=int, default=1,
+                        help="decode this many 30 s windows from different files together (default: 1, no batching)")
+    parser.add_argument("--int8", action="store_true",
+                        help="on the CPU, run a dynamically int8-quantized copy of the model "
+                             "(faster, slightly less accurate)")
+    parser.add_argument("--words", action="store_true",
+                        help="add word timings to every output, including json (word_timestamps always has them)")
+    parser.add_argument("--no-cache", action="store_true", help="always re-transcribe instead of reusing cached results")
+    parser.add_argument("--metrics", metavar="FILE",
+                        help="append per-file stage timings, real-time factor and peak memory as JSON lines "
+                             "(- for stderr)")
+    return parser.parse_args(argv)
+
+
+class OutputReporter:
+    """Count failures and report written files from the background writer thread"""
+
+    def __init__(self, metrics_log=None):
+        self.failures = 0
+        self.metrics_log = metrics_log
+        self.job_metrics = {}  # queue index -> JobMetrics
+
+    def fail(self, audio_file, error, index=None):
+        self.failures += 1
+        print(f"ERROR: {audio_file}: {error}", file=sys.stderr)
+        self.finish_job(index, error)
+
+    def finish_job(self, index, error=None):
+        """Complete the file's metrics once its output is written (or it failed) and log them"""
+        metrics = self.job_metrics.pop(index, None)
+        if metrics is not None and self.metrics_log:
+            self.metrics_log.write(metrics.finish(error))
+
+    def written(self, index, audio_file, result, output_files, error):
+        if error:
+            self.fail(audio_file, error, index)
+            return
+        self.finish_job(index)
+        for output_file in output_files:
+            print(f"  wrote {output_file}")
+        if 'vad' in result:
+            print(f"  skipped {result['vad']['skipped_fraction']:.0%} of {os.path.basename(audio_file)} as silence")
+
+
+def add_word_timings(args, model, audio_file, result, metrics, use_cache, audio_data=None):
+    """Align the result's words when an output shows them; cached alignments are reused"""
+    if args.align_words:
+        with collect_metrics(metrics):
+            align_words(model, audio_file, result, args.model, audio_data=audio_data, use_cache=use_cache,
+                        dtype=args.dtype)
+
+
+def run_batched(args, audio_files, output_formats, format_options, device, use_cache, reporter, writer):
+    """Transcribe the queue with cross-file batching"""
+    misses = []
+    unaligned = []  # Cached results still missing word timings, finished once the model is loaded
+    for index, audio_file in enumerate(audio_files):
+        metrics = reporter.job_metrics[index] = JobMetrics(audio_file, args.model, device, args.dtype)
+        result = None
+        if use_cache:
+            result = lookup_cached_result(audio_file, args.model, format_options, batched=True, dtype=args.dtype)
+        if result is None:
+            misses.append(index)
+            continue
+        print(audio_file)
+        metrics.cached = True
+        if args.align_words and unaligned_segments(cached_words(audio_file, result, args.model, args.dtype)):
+            unaligned.append((index, result))
+            continue
+        writer.submit(index, audio_file, result, output_formats, args.output_dir, metrics)
+    if not misses and not unaligned:
+        return
+
+    def submit(index, result, audio_data=None):
+        audio_file = audio_files[index]
+        try:
+            add_word_timings(args, model, audio_file, result, reporter.job_metrics[index], use_cache, audio_data)
+        except Exception as e:
+            reporter.fail(audio_file, e, index)
+            return
+        writer.submit(index, audio_file, result, output_formats, args.output_dir, reporter.job_metrics[index])
+
+    # The model passes are shared by the whole batch, so they are reported as one "batch" record
+    batch_metrics = JobMetrics(None, args.model, device, args.dtype, event="batch")
+    try:
+        with collect_metrics(batch_metrics):
+            model, load_time, _ = load_model(args.model, device, args.dtype)
+    except Exception as e:
+        print(f"ERROR: Could not load {args.model} model: {e}", file=sys.stderr)
+        pending = misses + [index for index, _ in unaligned]
+        reporter.failures += len(pending)
+        for index in pending:
+            reporter.finish_job(index, e)
+        return
+    print(f"Model {args.model} ({args.dtype}) loaded on {device} in {load_time:.1f}s")
+    for index, result in unaligned:
+        submit(index, result)
+    if not misses:
+        if reporter.metrics_log:
+            reporter.metrics_log.write(batch_metrics.finish())
+        return
+    start_time = time.time()
+    print(f"Decoding {len(misses)} files in batches of {args.batch_size} windows")
+    with collect_metrics(batch_metrics):
+        for done, (miss, audio_file, result, audio_data, error) in enumerate(transcribe_files_batched(
+                model, [audio_files[index] for index in misses], args.model, device=device,
+                format_options=format_options, batch_size=args.batch_size, use_cache=use_cache, dtype=args.dtype,
+                metrics=[reporter.job_metrics[index] for index in misses]), start=1):
+            index = misses[miss]
+            print(f"[{done}/{len(misses)}] {audio_file}")
+            if error:
+                reporter.fail(audio_file, error, index)
+            else:
+                submit(index, result, audio_data)
+    print(f"Batched transcription took {time.time() - start_time:.1f}s")
+    if reporter.metrics_log:
+        reporter.metrics_log.write(batch_metrics.finish())
+
+
+def run_sequential(args, audio_files, output_formats, format_options, device, use_cache, reporter, writer):
+    """Transcribe one file at a time while the next files decode and finished ones are written"""
+    def lookup(audio_file):
+        if not use_cache:
+            return None
+        return lookup_cached_result(audio_file, args.model, format_options, args.long_form, args.vad,
+                                    dtype=args.dtype)
+
+    job_metrics = [JobMetrics(audio_file, args.model, device, args.dtype) for audio_file in audio_files]
+    reporter.job_metrics.update(enumerate(job_metrics))
+    model = None
+    for index, audio_file, result, audio_data, error in prefetch_audio(audio_files, lookup, metrics=job_metrics):
+        print(f"[{index + 1}/{len(audio_files)}] {audio_file}")
+        start_time = time.time()
+        if error:
+            reporter.fail(audio_file, error, index)
+            continue
+        if result is not None:
+            job_metrics[index].cached = True
+            if args.align_words and use_cache:
+                cached_words(audio_file, result, args.model, args.dtype)
+        if model is None and (result is None or args.align_words and unaligned_segments(result)):
+            # Load lazily so a fully cached run never pays for the model
+            try:
+                with collect_metrics(job_metrics[index]):
+                    model, load_time, _ = load_model(args.model, device, args.dtype)
+            except Exception as e:
+                print(f"ERROR: Could not load {args.model} model: {e}", file=sys.stderr)
+                return False
+            print(f"Model {args.model} ({args.dtype}) loaded on {device} in {load_time:.1f}s")
+        if result is None:
+            try:
+                with collect_metrics(job_metrics[index]):
+                    result = transcribe_file(
+                        model,
+                        audio_file,
+                        args.model,
+                        device=device,
+                        format_options=format_options,
+                        long_form=args.long_form,
+                        use_cache=use_cache,
+                        vad=args.vad,
+                        audio_data=audio_data,
+                        dtype=args.dtype
+                    )
+            except Exception as e:
+                reporter.fail(audio_file, e, index)
+                continue
+        try:
+            add_word_timings(args, model, audio_file, result, job_metrics[index], use_cache, audio_data)
+        except Exception as e:
+            reporter.fail(audio_file, e, index)
+            continue
+        print(f"  transcribed in {time.time() - start_time:.1f}s")
+        writer.submit(index, audio_file, result, output_formats, args.output_dir, job_metrics[index])
+    return True
+
+
+def export_binary_transcripts(transcript_files, output_formats, output_dir=None):
+    """Convert .wtr files to the requested text formats; returns the number that failed"""
+    failures = 0
+    for transcript_file in transcript_files:
+        for output_format in output_formats:
+            if output_format == "binary":
+                print(f"ERROR: {transcript_file}: cannot convert a binary transcript to {output_format}",
+                      file=sys.stderr)
+                failures += 1
+                continue
+            output_file = output_file_for(transcript_file, output_format, output_dir)
+            try:
+                print(f"  wrote {export_transcript(transcript_file, output_file, output_format)}")
+            except (OSError, TranscriptFormatError) as e:
+                print(f"ERROR: {transcript_file}: {e}", file=sys.stderr)
+                failures += 1
+    return failures
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    output_formats = args.formats or ["text"]
+    inputs = collect_audio_files(args.inputs, recursive=args.recursive)
+    transcript_files = [f for f in inputs if f.lower().endswith(BINARY_EXTENSION)]
+    audio_files = [f for f in inputs if not f.lower().endswith(BINARY_EXTENSION)]
+    if not inputs:
+        print("No audio files found", file=sys.stderr)
+        return 1
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+    export_failures = export_binary_transcripts(transcript_files, output_formats, args.output_dir)
+    if not audio_files:
+        return 1 if export_failures else 0
+
+    device = select_device(None if args.device == "auto" else args.device == "cuda")
+    if args.device == "cuda" and device != "cuda":
+        print("CUDA requested but not available", file=sys.stderr)
+        return 1
+    if args.int8 and device != "cpu":
+        print("--int8 only applies on the CPU; running the regular model on CUDA")
+    args.dtype = model_dtype(device, args.int8)
+    args.align_words = args.words or needs_word_alignment(output_formats)
+
+    format_options = build_format_options(output_formats)
+    use_cache = not args.no_cache
+    reporter = OutputReporter(MetricsLog(args.metrics) if args.metrics else None)
+    writer = BackgroundWriter(reporter.written)
+    try:
+        if args.batch_size > 1 and batching_supported(format_options) and not args.long_form and not args.vad:
+            run_batched(args, audio_files, output_formats, format_options, device, use_cache, reporter, writer)
+        else:
+            if args.batch_size > 1:
+                print("Batching is not available with --long-form or --vad; transcribing one file at a time")
+            if not run_sequential(args, audio_files, output_formats, format_options, device, use_cache,
+                                  reporter, writer):
+                return 1
+    finally:
+        # Let queued formatting and writes finish before reporting
+        writer.close()
+
+    failures = reporter.failures
+    print(f"{len(audio_files) - failures} succeeded, {failures} failed")
+    return 1 if failures or export_failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,4 @@
+from .model_cache import ModelCache, get_model_cache
+from .audio import load_audio
+
+__all__ = ['ModelCache', 'get_model_cache', 'load_audio']
@@ -0,0 +1,92 @@
+import hashlib
+import json
+
+import numpy as np
+
+from .audio import SAMPLE_RATE
+
+# Whisper's encoder sees 30 seconds at a time, so segments are aligned in groups spanning at most this
+WINDOW_SECONDS = 30
+# Mel frames per second (Whisper's hop length is 160 samples)
+FRAMES_PER_SECOND = 100
+
+
+def transcript_digest(result):
+    """Hash of the segments' timing and tokens; alignments are stored against the transcript they belong to"""
+    material = [[segment['start'], segment['end'], segment.get('tokens') or segment['text']]
+                for segment in result.get('segments', [])]
+    return hashlib.blake2b(json.dumps([result.get('language'), material]).encode('utf-8'),
+                           digest_size=20).hexdigest()
+
+
+def segments_in_range(segments, start=None, end=None):
+    """Indexes of the segments overlapping [start, end) seconds; None leaves that side open"""
+    return [index for index, segment in enumerate(segments)
+            if (start is None or segment['end'] > start) and (end is None or segment['start'] < end)]
+
+
+def unaligned_segments(result, start=None, end=None):
+    """Indexes of the segments in the range that have no word timings yet"""
+    segments = result.get('segments', [])
+    return [index for index in segments_in_range(segments, start, end) if 'words' not in segments[index]]
+
+
+def alignment_groups(segments, indexes):
+    """Split segment indexes into runs of neighbouring segments that fit one 30-second window"""
+    groups = []
+    for index in indexes:
+        group = groups[-1] if groups else None
+        if (group and index == group[-1] + 1
+                and segments[index]['end'] - segments[group[0]]['start'] <= WINDOW_SECONDS):
+            group.append(index)
+        else:
+            groups.append([index])
+    return groups
+
+
+def _segment_tokens(segment, tokenizer):
+    tokens = segment.get('tokens')
+    if tokens is None:
+        tokens = tokenizer.encode(segment['text'])
+    return [token for token in tokens if token < tokenizer.eot]
+
+
+def align_segments(model, audio, result, indexes):
+    """Add Whisper word timings to the given segments of result, in place, and return {index: words}.
+
+    Each group of neighbouring segments is aligned against its own clip of
+    the audio: one forward pass over the clip's mel spectrogram and the
+    segments' text tokens, then dynamic time warping over the cross-attention
+    weights, exactly as whisper.transcribe does with word_timestamps=True.
+    Segment start and end times are left as transcribed, so output that does
+    not show words is unchanged. Segments longer than one window get no words.
+    """
+    import torch
+    from whisper.audio import HOP_LENGTH, N_FRAMES, log_mel_spectrogram, pad_or_trim
+    from whisper.timing import add_word_timestamps
+    from whisper.tokenizer import get_tokenizer
+
+    segments = result['segments']
+    tokenizer = get_tokenizer(model.is_multilingual, num_languages=model.num_languages,
+                              language=result.get('language') or "en", task="transcribe")
+    aligned = {}
+    for group in alignment_groups(segments, indexes):
+        seek = int(segments[group[0]]['start'] * FRAMES_PER_SECOND)
+        clip = audio[seek * HOP_LENGTH:seek * HOP_LENGTH + WINDOW_SECONDS * SAMPLE_RATE]
+        num_frames = min(int(np.ceil(segments[group[-1]]['end'] * FRAMES_PER_SECOND)) - seek,
+                         len(clip) // HOP_LENGTH)
+        if num_frames <= 0 or num_frames > N_FRAMES:
+            for index in group:
+                aligned[index] = segments[index]['words'] = []
+            continue
+        mel = log_mel_spectrogram(pad_or_trim(torch.from_numpy(np.ascontiguousarray(clip, dtype=np.float32))),
+                                  model.dims.n_mels, device=model.device)
+        # Copies: add_word_timestamps also moves segment boundaries to the first and last word
+        copies = [{'seek': seek, 'start': segments[index]['start'], 'end': segments[index]['end'],
+                   'tokens': _segment_tokens(segments[index], tokenizer)} for index in group]
+        previous_end = segments[group[0] - 1]['end'] if group[0] > 0 else 0.0
+        add_word_timestamps(segments=copies, model=model, tokenizer=tokenizer, mel=mel, num_frames=num_frames,
+                            last_speech_timestamp=previous_end)
+        for index, copy in zip(group, copies):
+            aligned[index] = segments[index]['words'] = copy.get('words', [])
+    return aligned
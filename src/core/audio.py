@@ -0,0 +1,164 @@
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+
+import numpy as np
+
+# Whisper expects 16 kHz mono audio
+SAMPLE_RATE = 16000
+
+# Bytes read from the FFmpeg pipe per block (~2 seconds of s16le audio)
+BLOCK_SIZE = 64 * 1024
+
+
+def _ffmpeg_command(audio_file):
+    """Build the FFmpeg command that decodes a file to 16 kHz mono s16le on stdout"""
+    # Ensure absolute file path with proper slashes for Windows
+    file_path = os.path.abspath(audio_file).replace('\\', '/')
+    cmd = [
+        "ffmpeg", "-nostdin", "-loglevel", "error", "-threads", "0",
+        "-i", file_path,
+        "-f", "s16le",
+        "-ac", "1",
+        "-acodec", "pcm_s16le",
+        "-ar", str(SAMPLE_RATE),
+        "-"
+    ]
+    return cmd
+
+
+def ffmpeg_available():
+    return shutil.which("ffmpeg") is not None
+
+
+def probe_duration(audio_file):
+    """Return the duration of a media file in seconds using ffprobe, or None if unknown"""
+    ffprobe_path = shutil.which("ffprobe")
+    if not ffprobe_path:
+        return None
+    try:
+        result = subprocess.run(
+            [ffprobe_path, "-v", "error", "-show_entries", "format=duration",
+             "-of", "default=noprint_wrappers=1:nokey=1", os.path.abspath(audio_file)],
+            capture_output=True, text=True, timeout=10
+        )
+        return float(result.stdout.strip())
+    except (ValueError, subprocess.SubprocessError, OSError):
+        return None
+
+
+def read_pcm_stream(stream, expected_samples=0, block_size=BLOCK_SIZE):
+    """Read s16le PCM from a binary stream into a float32 array.
+
+    Blocks are converted straight into a preallocated output buffer, so peak
+    memory is the float32 result plus one block instead of the raw bytes and
+    two intermediate copies. The buffer grows if the stream is longer than expected.
+    """
+    block = np.empty(block_size // 2, dtype=np.int16)
+    block_bytes = memoryview(block).cast('B')
+    audio = np.empty(max(int(expected_samples), len(block)), dtype=np.float32)
+    position = 0
+    pending = 0  # Bytes of a partially filled sample carried over between reads
+
+    while True:
+        count = stream.readinto(block_bytes[pending:])
+        if not count:
+            break
+        available = pending + count
+        samples = available // 2
+
+        if position + samples > len(audio):
+            # Grow geometrically so long unknown-length streams stay linear
+            grown = np.empty(max(len(audio) * 3 // 2, position + samples), dtype=np.float32)
+            grown[:position] = audio[:position]
+            audio = grown
+
+        np.multiply(block[:samples], 1 / 32768.0, out=audio[position:position + samples], casting='unsafe')
+        position += samples
+
+        # Keep an odd trailing byte for the next read
+        pending = available - samples * 2
+        if pending:
+            block_bytes[0] = block_bytes[available - 1]
+
+    if len(audio) - position > SAMPLE_RATE:
+        # Release the unused tail of an over-estimated buffer
+        return audio[:position].copy()
+    return audio[:position]
+
+
+def _open_decoder(audio_file):
+    stderr_file = tempfile.TemporaryFile()
+    process = subprocess.Popen(
+        _ffmpeg_command(audio_file),
+        stdout=subprocess.PIPE,
+        stderr=stderr_file,  # A file rather than a pipe so FFmpeg can never block on stderr
+        bufsize=0
+    )
+    return process, stderr_file
+
+
+def _finish_decoder(process, stderr_file, check=True):
+    process.stdout.close()
+    returncode = process.wait()
+    stderr_file.seek(0)
+    message = stderr_file.read().decode('utf-8', errors='replace').strip()
+    stderr_file.close()
+    if check and returncode != 0:
+        raise RuntimeError(f"FFmpeg failed with exit code {returncode}: {message[-500:]}")
+
+
+class DecoderGroup:
+    """FFmpeg processes decoding on behalf of one consumer, so they can all be stopped at once"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._processes = set()
+        self.stopped = False
+
+    def add(self, process):
+        with self._lock:
+            if not self.stopped:
+                self._processes.add(process)
+                return
+        # Started after stop(): nobody wants this audio any more
+        process.kill()
+
+    def discard(self, process):
+        with self._lock:
+            self._processes.discard(process)
+
+    def stop(self):
+        """Kill every running decoder; their load_audio calls fail with an FFmpeg error"""
+        with self._lock:
+            self.stopped = True
+            processes = list(self._processes)
+        for process in processes:
+            process.kill()
+
+
+def load_audio(audio_file, block_size=BLOCK_SIZE, group=None):
+    """Decode an audio file to a 16 kHz mono float32 array by streaming FFmpeg output.
+
+    group, a DecoderGroup, lets another thread kill the decode part way through.
+    """
+    duration = probe_duration(audio_file)
+    # Preallocate from the probed duration with a little slack for rounding
+    expected_samples = int((duration + 1) * SAMPLE_RATE) if duration else 0
+
+    process, stderr_file = _open_decoder(audio_file)
+    if group is not None:
+        group.add(process)
+    try:
+        audio = read_pcm_stream(process.stdout, expected_samples, block_size)
+    except BaseException:
+        process.kill()
+        _finish_decoder(process, stderr_file, check=False)
+        raise
+    finally:
+        if group is not None:
+            group.discard(process)
+    _finish_decoder(process, stderr_file)
+    return audio
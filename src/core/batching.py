@@ -0,0 +1,164 @@
+import threading
+from contextlib import contextmanager
+
+from .audio import SAMPLE_RATE
+from .instrumentation import stage
+from .longform import find_silence_splits, offset_result, stitch_results
+
+# Whisper's encoder always sees exactly 30 seconds of audio
+WINDOW_SECONDS = 30
+# Windows decoded together in one encoder/decoder pass
+DEFAULT_BATCH_SIZE = 8
+# Longer files are cut at silences into pieces that each fit one window
+SPLIT_CHUNK_SECONDS = 20
+SPLIT_SEARCH_SECONDS = 5
+# Same quality gates as whisper.transcribe; failing windows are redone with temperature fallback
+COMPRESSION_RATIO_THRESHOLD = 2.4
+LOGPROB_THRESHOLD = -1.0
+NO_SPEECH_THRESHOLD = 0.6
+# Seconds per timestamp token
+TIMESTAMP_SECONDS = 0.02
+
+
+def batching_supported(options):
+    """Word timestamps need the full transcribe loop, so they cannot be batched"""
+    return not options.get('word_timestamps', False)
+
+
+def split_windows(audio):
+    """(start, end) sample ranges of at most WINDOW_SECONDS covering the audio"""
+    if len(audio) <= WINDOW_SECONDS * SAMPLE_RATE:
+        return [(0, len(audio))]
+    return find_silence_splits(audio, SPLIT_CHUNK_SECONDS, SPLIT_SEARCH_SECONDS)
+
+
+def _needs_fallback(decoded):
+    if decoded.no_speech_prob > NO_SPEECH_THRESHOLD and decoded.avg_logprob < LOGPROB_THRESHOLD:
+        return False  # Silence; nothing better to find
+    return decoded.compression_ratio > COMPRESSION_RATIO_THRESHOLD or decoded.avg_logprob < LOGPROB_THRESHOLD
+
+
+def segments_from_tokens(decoded, tokenizer, duration):
+    """Split one window's decoded tokens into Whisper-style segments at its timestamp tokens"""
+    segments = []
+    start = None
+    text_tokens = []
+
+    def add_segment(end):
+        segments.append({
+            'seek': 0,
+            'start': start or 0.0,
+            'end': end,
+            'text': tokenizer.decode(text_tokens),
+            'tokens': list(text_tokens),
+            'temperature': decoded.temperature,
+            'avg_logprob': decoded.avg_logprob,
+            'compression_ratio': decoded.compression_ratio,
+            'no_speech_prob': decoded.no_speech_prob
+        })
+
+    for token in decoded.tokens:
+        if token >= tokenizer.timestamp_begin:
+            timestamp = (token - tokenizer.timestamp_begin) * TIMESTAMP_SECONDS
+            if start is not None and text_tokens:
+                add_segment(timestamp)
+                text_tokens = []
+            # A closing timestamp also opens the next segment unless another one follows
+            start = timestamp
+        elif token < tokenizer.eot:
+            text_tokens.append(token)
+    if text_tokens:
+        # No closing timestamp: the segment runs to the end of the window
+        add_segment(duration)
+    return segments
+
+
+class BatchDecoder:
+    """Decode 30-second windows from many clips in shared encoder/decoder batches.
+
+    add(key, audio) queues a clip's windows; whenever batch_size windows are
+    pending they are decoded together. Finished clips are handed back as
+    (key, result) from add() and flush(), in completion order. control (a
+    JobControl) is checked before every decoder step, so cancelling or
+    pausing takes effect within a batch rather than after it.
+    """
+
+    def __init__(self, model, batch_size=DEFAULT_BATCH_SIZE, fp16=False, control=None, **options):
+        import whisper
+        self.whisper = whisper
+        self.model = model
+        self.batch_size = max(1, batch_size)
+        self.fp16 = fp16
+        self.control = control
+        self.options = options
+        self.language = options.get('language')
+        self.task = options.get('task', 'transcribe')
+        self.tokenizer = whisper.tokenizer.get_tokenizer(
+            model.is_multilingual, num_languages=model.num_languages, language=self.language, task=self.task
+        )
+        self.pending = []  # (key, window index, offset seconds, window audio)
+        self.clips = {}  # key -> [window results or None]
+
+    def add(self, key, audio):
+        windows = split_windows(audio)
+        self.clips[key] = [None] * len(windows)
+        for index, (start, end) in enumerate(windows):
+            self.pending.append((key, index, start / SAMPLE_RATE, audio[start:end]))
+        finished = []
+        while len(self.pending) >= self.batch_size:
+            finished.extend(self._decode(self.pending[:self.batch_size]))
+            self.pending = self.pending[self.batch_size:]
+        return finished
+
+    def flush(self):
+        finished = self._decode(self.pending) if self.pending else []
+        self.pending = []
+        return finished
+
+    @contextmanager
+    def _checked_steps(self):
+        """Check the job control before each decoder pass this thread makes while the block runs"""
+        if self.control is None:
+            yield
+            return
+        # The model may be shared with jobs on other threads, which have their own controls
+        thread = threading.get_ident()
+
+        def check(module, inputs):
+            if threading.get_ident() == thread:
+                self.control.check()
+
+        # Ahead of the instrumentation hooks, so a cancelled step never opens a stage
+        handle = self.model.decoder.register_forward_pre_hook(check, prepend=True)
+        try:
+            yield
+        finally:
+            handle.remove()
+
+    def _decode(self, batch):
+        import torch
+        whisper = self.whisper
+        with stage("mel"):
+            mel = torch.stack([
+                whisper.log_mel_spectrogram(whisper.pad_or_trim(window), self.model.dims.n_mels)
+                for _, _, _, window in batch
+            ]).to(self.model.device)
+        options = whisper.DecodingOptions(task=self.task, language=self.language, fp16=self.fp16)
+        with stage("transcribe"), self._checked_steps():
+            decoded_batch = whisper.decode(self.model, mel, options)
+
+        finished = []
+        for (key, index, offset, window), decoded in zip(batch, decoded_batch):
+            duration = len(window) / SAMPLE_RATE
+            if _needs_fallback(decoded):
+                # Rare hard window: rerun it alone with the full temperature fallback
+                with self._checked_steps():
+                    result = self.model.transcribe(window, fp16=self.fp16, **self.options)
+            else:
+                segments = segments_from_tokens(decoded, self.tokenizer, duration)
+                result = {'text': "".join(segment['text'] for segment in segments),
+                          'segments': segments, 'language': decoded.language}
+            self.clips[key][index] = offset_result(result, offset)
+            if all(part is not None for part in self.clips[key]):
+                finished.append((key, stitch_results(self.clips.pop(key))))
+        return finished
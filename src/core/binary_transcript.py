@@ -0,0 +1,275 @@
+"""Compact binary transcript files (.wtr) with a time index for random access.
+
+Layout, all little-endian:
+
+    header      magic "WTR1", version, flags, block count, segment count,
+                word count, metadata length
+    index       per block: first segment start, latest segment end (running
+                maximum), file offset, stored length, segment count
+    metadata    UTF-8 JSON: top-level result fields, the segment columns
+                and their dtypes, Whisper's segment key order
+    blocks      up to BLOCK_SEGMENTS segments each, stored as columns (see
+                _encode_block), zlib-compressed when FLAG_ZLIB is set
+
+Readers load the header, index and metadata only; segments are decoded a
+block at a time, and a time range reads just the blocks that overlap it.
+"""
+import json
+import struct
+import zlib
+
+import numpy as np
+
+from .formatters import SEGMENT_WRITERS
+from .transcript import Transcript
+
+MAGIC = b"WTR1"
+VERSION = 1
+BINARY_EXTENSION = ".wtr"
+# Segments per block: the unit of compression and of random access
+BLOCK_SEGMENTS = 512
+FLAG_ZLIB = 1
+
+HEADER = struct.Struct("<4sHHIQQI")
+INDEX_ENTRY = struct.Struct("<ddQII")
+BLOCK_HEADER = struct.Struct("<IIIII")  # segments, tokens, words, text bytes, word text bytes
+INDEX_DTYPE = np.dtype([('start', '<f8'), ('end', '<f8'), ('offset', '<u8'), ('length', '<u4'), ('count', '<u4')])
+
+OFFSET_DTYPE = np.dtype('<u4')
+TOKEN_DTYPE = np.dtype('<i4')
+
+
+class TranscriptFormatError(Exception):
+    """Raised when a file is not a readable binary transcript"""
+
+
+def _relative(offsets, first, last):
+    return (offsets[first:last + 1] - offsets[first]).astype(OFFSET_DTYPE)
+
+
+def _encode_block(transcript, first, last):
+    """Columns of segments first..last-1 as one byte string"""
+    text = transcript.texts[transcript.text_offsets[first]:transcript.text_offsets[last]].encode('utf-8')
+    word_first, word_last = transcript.word_offsets[first], transcript.word_offsets[last]
+    word_text = transcript.word_texts[
+        transcript.word_text_offsets[word_first]:transcript.word_text_offsets[word_last]].encode('utf-8')
+    token_first = token_last = 0
+    if transcript.has_tokens:
+        token_first, token_last = transcript.token_offsets[first], transcript.token_offsets[last]
+
+    parts = [BLOCK_HEADER.pack(last - first, token_last - token_first, word_last - word_first,
+                               len(text), len(word_text))]
+    for column in transcript.columns.values():
+        parts.append(column[first:last].astype(column.dtype.newbyteorder('<')).tobytes())
+    parts.append(_relative(transcript.text_offsets, first, last).tobytes())
+    if transcript.has_tokens:
+        parts.append(_relative(transcript.token_offsets, first, last).tobytes())
+        parts.append(transcript.tokens[token_first:token_last].astype(TOKEN_DTYPE).tobytes())
+    parts.append(transcript.has_words[first:last].astype(np.uint8).tobytes())
+    parts.append(_relative(transcript.word_offsets, first, last).tobytes())
+    for column in transcript.word_columns.values():
+        parts.append(column[word_first:word_last].astype(column.dtype.newbyteorder('<')).tobytes())
+    parts.append(_relative(transcript.word_text_offsets, word_first, word_last).tobytes())
+    parts.append(text)
+    parts.append(word_text)
+    return b"".join(parts)
+
+
+def write_transcript(result, path, compress=True, block_segments=BLOCK_SEGMENTS):
+    """Write a result dict or Transcript to path as a binary transcript file"""
+    transcript = Transcript.from_result(result)
+    segment_count = len(transcript.starts)
+    bounds = list(range(0, segment_count, block_segments)) + [segment_count]
+    blocks = list(zip(bounds[:-1], bounds[1:]))
+    metadata = json.dumps({
+        # The full text is only stored when it is not just the segment texts joined
+        'text': None if transcript.text == transcript.texts else transcript.text,
+        'extra': transcript.extra,
+        'segment_fields': transcript.segment_fields,
+        'segment_columns': [[key, column.dtype.newbyteorder('<').str] for key, column in transcript.columns.items()],
+        'word_columns': [[key, column.dtype.newbyteorder('<').str] for key, column in transcript.word_columns.items()],
+        'has_tokens': transcript.has_tokens
+    }, ensure_ascii=False).encode('utf-8')
+    # Latest end so far: segments may overlap, so a block's range is what seeking must cover
+    running_end = np.maximum.accumulate(transcript.ends) if segment_count else transcript.ends
+
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, FLAG_ZLIB if compress else 0, len(blocks), segment_count,
+                            int(transcript.word_offsets[-1]), len(metadata)))
+        index_position = f.tell()
+        # The index is filled in once the blocks' offsets and sizes are known
+        f.write(b"\0" * (INDEX_ENTRY.size * len(blocks)))
+        f.write(metadata)
+        index = []
+        for first, last in blocks:
+            data = _encode_block(transcript, first, last)
+            if compress:
+                data = zlib.compress(data, 6)
+            index.append(INDEX_ENTRY.pack(float(transcript.starts[first]), float(running_end[last - 1]),
+                                          f.tell(), len(data), last - first))
+            f.write(data)
+        f.seek(index_position)
+        f.write(b"".join(index))
+    return path
+
+
+class TranscriptReader:
+    """Random access to a binary transcript file.
+
+    Opening reads only the header, the block index and the metadata.
+    segments() and export() decode one block at a time, and with a time
+    range only the blocks overlapping it are read. read() loads the whole
+    file straight into a Transcript.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'rb')
+        try:
+            header = self.file.read(HEADER.size)
+            if len(header) < HEADER.size:
+                raise TranscriptFormatError(f"{path} is not a binary transcript")
+            magic, version, self.flags, block_count, self.segment_count, self.word_count, metadata_length = \
+                HEADER.unpack(header)
+            if magic != MAGIC:
+                raise TranscriptFormatError(f"{path} is not a binary transcript")
+            if version > VERSION:
+                raise TranscriptFormatError(f"{path} needs a newer version of this program (format {version})")
+            self.index = np.frombuffer(self.file.read(INDEX_DTYPE.itemsize * block_count), dtype=INDEX_DTYPE)
+            self.metadata = json.loads(self.file.read(metadata_length).decode('utf-8'))
+        except Exception:
+            self.file.close()
+            raise
+        self.segment_columns = [(key, np.dtype(dtype)) for key, dtype in self.metadata['segment_columns']]
+        self.word_columns = [(key, np.dtype(dtype)) for key, dtype in self.metadata['word_columns']]
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return self.segment_count
+
+    @property
+    def duration(self):
+        return float(self.index['end'][-1]) if len(self.index) else 0.0
+
+    def blocks_in_range(self, start=None, end=None):
+        """Indexes of the blocks that can hold segments overlapping [start, end) seconds"""
+        first = 0 if start is None else int(np.searchsorted(self.index['end'], start, side='right'))
+        last = len(self.index) if end is None else int(np.searchsorted(self.index['start'], end, side='left'))
+        return range(first, max(first, last))
+
+    def _read_block_bytes(self, block):
+        entry = self.index[block]
+        self.file.seek(int(entry['offset']))
+        data = self.file.read(int(entry['length']))
+        return zlib.decompress(data) if self.flags & FLAG_ZLIB else data
+
+    def read_block(self, block):
+        """Transcript of one block's segments"""
+        data = memoryview(self._read_block_bytes(block))
+        count, token_count, word_count, text_bytes, word_text_bytes = BLOCK_HEADER.unpack_from(data)
+        position = BLOCK_HEADER.size
+
+        def take(dtype, length):
+            nonlocal position
+            array = np.frombuffer(data, dtype=dtype, count=length, offset=position)
+            position += array.nbytes
+            return array
+
+        columns = {key: take(dtype, count) for key, dtype in self.segment_columns}
+        text_offsets = take(OFFSET_DTYPE, count + 1)
+        tokens = token_offsets = None
+        if self.metadata['has_tokens']:
+            token_offsets = take(OFFSET_DTYPE, count + 1)
+            tokens = take(TOKEN_DTYPE, token_count)
+        has_words = take(np.uint8, count).astype(bool)
+        word_offsets = take(OFFSET_DTYPE, count + 1)
+        word_columns = {key: take(dtype, word_count) for key, dtype in self.word_columns}
+        word_text_offsets = take(OFFSET_DTYPE, word_count + 1)
+        texts = bytes(data[position:position + text_bytes]).decode('utf-8')
+        position += text_bytes
+        word_texts = bytes(data[position:position + word_text_bytes]).decode('utf-8')
+        return Transcript.from_columns(
+            texts, self.metadata['extra'], self.metadata['segment_fields'], columns, texts, text_offsets,
+            tokens=tokens, token_offsets=token_offsets, has_words=has_words, word_offsets=word_offsets,
+            word_columns=word_columns, word_texts=word_texts, word_text_offsets=word_text_offsets)
+
+    def segments(self, start=None, end=None):
+        """Segments overlapping [start, end) seconds (all of them by default), decoded block by block"""
+        for block in self.blocks_in_range(start, end):
+            for segment in self.read_block(block)['segments']:
+                if (start is None or segment['end'] > start) and (end is None or segment['start'] < end):
+                    yield segment
+
+    def export(self, sink, output_format, start=None, end=None):
+        """Write the segments in range to a text sink as SRT, VTT, plain text, word timestamps or JSON.
+
+        All but JSON are streamed block by block.
+        """
+        if output_format == "json":
+            if start is None and end is None:
+                result = self.read().to_dict()
+            else:
+                # Only the range: its text is rebuilt from its segments, like a result for just that audio
+                segments = [dict(segment) for segment in self.segments(start, end)]
+                result = {'text': "".join(segment['text'] for segment in segments), 'segments': segments,
+                          **self.metadata['extra']}
+            json.dump(result, sink, indent=2)
+            return
+        if output_format not in SEGMENT_WRITERS:
+            raise ValueError(f"Cannot export a binary transcript as {output_format}")
+        if output_format == "text" and start is None and end is None and self.metadata['text'] is not None:
+            sink.write(self.metadata['text'])
+            return
+        SEGMENT_WRITERS[output_format](sink).write_segments(self.segments(start, end))
+
+    def read(self):
+        """Load the whole file into one Transcript"""
+        blocks = [self.read_block(block) for block in range(len(self.index))]
+
+        def joined(arrays, dtype):
+            return np.concatenate(arrays).astype(dtype) if arrays else np.zeros(0, dtype=dtype)
+
+        def offsets(arrays):
+            # Each block's offsets start at zero; shift them past the previous blocks
+            combined, base = [np.zeros(1, dtype=np.int64)], 0
+            for array in arrays:
+                combined.append(array[1:].astype(np.int64) + base)
+                base += int(array[-1])
+            return np.concatenate(combined)
+
+        texts = "".join(block.texts for block in blocks)
+        text = self.metadata['text']
+        return Transcript.from_columns(
+            texts if text is None else text, self.metadata['extra'], self.metadata['segment_fields'],
+            {key: joined([block.columns[key] for block in blocks], dtype.newbyteorder('='))
+             for key, dtype in self.segment_columns},
+            texts, offsets([block.text_offsets for block in blocks]),
+            tokens=joined([block.tokens for block in blocks], np.int32) if self.metadata['has_tokens'] else None,
+            token_offsets=offsets([block.token_offsets for block in blocks]),
+            has_words=joined([block.has_words for block in blocks], bool),
+            word_offsets=offsets([block.word_offsets for block in blocks]),
+            word_columns={key: joined([block.word_columns[key] for block in blocks], dtype.newbyteorder('='))
+                          for key, dtype in self.word_columns},
+            word_texts="".join(block.word_texts for block in blocks),
+            word_text_offsets=offsets([block.word_text_offsets for block in blocks]))
+
+
+def read_transcript(path):
+    """Load a binary transcript file into a Transcript"""
+    with TranscriptReader(path) as reader:
+        return reader.read()
+
+
+def export_transcript(path, output_file, output_format, start=None, end=None):
+    """Convert a binary transcript file to a text format (streamed, except for JSON)"""
+    with TranscriptReader(path) as reader, open(output_file, 'w', encoding='utf-8') as f:
+        reader.export(f, output_format, start, end)
+    return output_file
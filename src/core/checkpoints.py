@@ -0,0 +1,131 @@
+import hashlib
+import os
+import warnings
+from contextlib import contextmanager
+
+# Float32 copies of the checkpoints, laid out so their weights can be memory-mapped
+MMAP_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "whisper-transcriber", "mmap")
+MMAP_FORMAT_VERSION = 1
+
+def model_identity(model_name):
+    """Stable string naming a model; checkpoint paths include size and mtime so edits are noticed"""
+    if os.path.isfile(model_name):
+        stat = os.stat(model_name)
+        return f"{os.path.abspath(model_name)}|{stat.st_size}|{stat.st_mtime_ns}"
+    return model_name
+
+
+def cache_file_path(model_name, tag, cache_dir, salt=""):
+    """Derived-model file name: <stem>-<tag>-<digest of the model identity and salt>.pt"""
+    digest = hashlib.blake2b(f"{model_identity(model_name)}|{salt}".encode('utf-8'), digest_size=8).hexdigest()
+    stem = os.path.splitext(os.path.basename(model_name))[0]
+    return os.path.join(cache_dir, f"{stem}-{tag}-{digest}.pt")
+
+
+def mmap_checkpoint_path(model_name, cache_dir=None):
+    return cache_file_path(model_name, "fp32", cache_dir or MMAP_CACHE_DIR, f"v{MMAP_FORMAT_VERSION}")
+
+
+def convert_checkpoint(model_name, path):
+    """Write every tensor of the model, in float32, to a checkpoint that torch.load can memory-map.
+
+    Official checkpoints store float16 weights that whisper.load_model copies
+    into a float32 model, so they cannot be mapped directly. The converted
+    file also holds the non-persistent buffers (causal mask, alignment heads),
+    so a checkpoint's alignment heads survive the conversion.
+    """
+    import torch
+    import whisper
+    model = whisper.load_model(model_name, device="cpu")
+    tensors = {}
+    sparse = []
+    for name, tensor in list(model.named_parameters()) + list(model.named_buffers()):
+        if tensor.is_sparse:
+            sparse.append(name)
+            tensor = tensor.to_dense()
+        tensors[name] = tensor.detach().float() if tensor.is_floating_point() else tensor.detach()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    torch.save({'dims': dict(model.dims.__dict__), 'tensors': tensors, 'sparse': sparse}, temp_path)
+    os.replace(temp_path, path)
+    print(f"Converted {model_name} model for memory-mapped loading: {path}")
+    return model
+
+
+def _set_tensor(model, name, tensor):
+    import torch
+    module_path, _, attribute = name.rpartition('.')
+    module = model.get_submodule(module_path)
+    if attribute in module._parameters:
+        # No copy: the parameter shares the mapped storage
+        module._parameters[attribute] = torch.nn.Parameter(tensor, requires_grad=False)
+    else:
+        module._buffers[attribute] = tensor
+
+
+@contextmanager
+def _meta_construction():
+    """Build modules on the meta device in this thread: weights get shapes but no memory or random values.
+
+    Every tensor is replaced by a mapped one before the model is used.
+    """
+    import torch
+    from torch.overrides import TorchFunctionMode
+
+    class DenseOnMeta(TorchFunctionMode):
+        # Meta tensors cannot be made sparse; Whisper's alignment heads are replaced like the rest
+        def __torch_function__(self, func, types, args=(), kwargs=None):
+            if func is torch.Tensor.to_sparse and args[0].is_meta:
+                return args[0]
+            return func(*args, **(kwargs or {}))
+
+    # Both modes only apply to the calling thread
+    with torch.device("meta"), DenseOnMeta():
+        yield
+
+
+def load_mmap_checkpoint(path):
+    """Build a CPU Whisper model whose weights are pages of the mapped file.
+
+    The model is built on the meta device and every tensor is then pointed
+    at the file. Pages are read on first use and, being clean
+    file pages, are shared by every process that maps the same file.
+    """
+    import torch
+    from whisper.model import ModelDimensions, Whisper
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", UserWarning)
+        checkpoint = torch.load(path, map_location="cpu", mmap=True, weights_only=True)
+    with _meta_construction():
+        model = Whisper(ModelDimensions(**checkpoint['dims']))
+    for name, tensor in checkpoint['tensors'].items():
+        _set_tensor(model, name, tensor.to_sparse() if name in checkpoint['sparse'] else tensor)
+    expected = {name for name, _ in model.named_parameters()} | {name for name, _ in model.named_buffers()}
+    missing = sorted(expected - set(checkpoint['tensors']))
+    if missing:
+        raise ValueError(f"{path} is missing tensors: {', '.join(missing)}")
+    return model.eval()
+
+
+def load_mmap_model(model_name, cache_dir=None):
+    """Return a CPU float32 model mapped from its converted checkpoint, converting it on first use"""
+    path = mmap_checkpoint_path(model_name, cache_dir)
+    if os.path.exists(path):
+        try:
+            return load_mmap_checkpoint(path)
+        except Exception as e:
+            print(f"Ignoring unreadable converted checkpoint {path}: {e}")
+    try:
+        model = convert_checkpoint(model_name, path)
+    except OSError as e:
+        # Out of disk space or a read-only cache: run from the regular checkpoint
+        print(f"Could not convert {model_name} for memory-mapped loading: {e}")
+        import whisper
+        return whisper.load_model(model_name, device="cpu")
+    # Drop the converted-from copy and map the new file so this process shares pages too
+    del model
+    return load_mmap_checkpoint(path)
+
+
+def mmap_checkpoint_exists(model_name, cache_dir=None):
+    return os.path.exists(mmap_checkpoint_path(model_name, cache_dir))
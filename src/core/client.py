@@ -0,0 +1,129 @@
+import json
+import os
+import secrets
+import time
+import urllib.error
+import urllib.request
+
+# The service only ever listens on the loopback interface
+DEFAULT_SERVICE_HOST = "127.0.0.1"
+DEFAULT_SERVICE_PORT = 8765
+# Shared secret every request must carry. The service writes it to TOKEN_FILE (readable by
+# this user only) at startup, unless one is given with TOKEN_ENV or --token.
+TOKEN_ENV = "WHISPER_SERVICE_TOKEN"
+TOKEN_HEADER = "X-Whisper-Token"
+TOKEN_FILE = os.path.join(os.path.expanduser("~"), ".cache", "whisper-transcriber", "service-token")
+
+# Job states reported by the service
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATES = (DONE, FAILED, CANCELLED)
+
+
+def generate_token():
+    return secrets.token_urlsafe(32)
+
+
+def write_token_file(token, path=TOKEN_FILE):
+    """Store the service token where this user's clients find it, readable by this user only"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, 'w', encoding='ascii') as f:
+        f.write(token)
+    # The mode passed to open only applies to new files
+    os.chmod(path, 0o600)
+    return path
+
+
+def read_token_file(path=TOKEN_FILE):
+    """Token written by a running service, or None"""
+    try:
+        with open(path, 'r', encoding='ascii') as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+class ServiceError(Exception):
+    """The transcription service rejected a request or could not be reached"""
+
+
+class ServiceClient:
+    """Small JSON client for the local transcription service (see core.service)"""
+
+    def __init__(self, url=None, token=None, timeout=10):
+        self.url = (url or f"http://{DEFAULT_SERVICE_HOST}:{DEFAULT_SERVICE_PORT}").rstrip('/')
+        if token is None:
+            token = os.environ.get(TOKEN_ENV) or read_token_file()
+        self.token = token
+        self.timeout = timeout
+
+    def _request(self, method, path, body=None, timeout=None):
+        data = json.dumps(body).encode('utf-8') if body is not None else None
+        request = urllib.request.Request(self.url + path, data=data, method=method)
+        request.add_header("Content-Type", "application/json")
+        if self.token:
+            request.add_header(TOKEN_HEADER, self.token)
+        try:
+            with urllib.request.urlopen(request, timeout=timeout or self.timeout) as response:
+                return json.loads(response.read().decode('utf-8'))
+        except urllib.error.HTTPError as e:
+            try:
+                message = json.loads(e.read().decode('utf-8')).get('error', str(e))
+            except ValueError:
+                message = str(e)
+            raise ServiceError(message) from e
+        except (urllib.error.URLError, OSError) as e:
+            raise ServiceError(f"Transcription service not reachable at {self.url}: {e}") from e
+
+    def available(self, timeout=1):
+        """True if a service answers at this URL within timeout seconds"""
+        try:
+            self._request("GET", "/health", timeout=timeout)
+            return True
+        except ServiceError:
+            return False
+
+    def health(self):
+        return self._request("GET", "/health")
+
+    def submit(self, audio_file, model_name, format_options=None, use_gpu=None, long_form=False, vad=False,
+               use_cache=True, int8=False, align_words=False):
+        """Queue a job and return its id; audio_file must be readable by the service"""
+        job = self._request("POST", "/jobs", {
+            'audio_file': os.path.abspath(audio_file),
+            'model': model_name,
+            'format_options': format_options or {},
+            'use_gpu': use_gpu,
+            'long_form': long_form,
+            'vad': vad,
+            'use_cache': use_cache,
+            'int8': int8,
+            'align_words': align_words
+        })
+        return job['id']
+
+    def status(self, job_id):
+        return self._request("GET", f"/jobs/{job_id}")
+
+    def result(self, job_id):
+        return self._request("GET", f"/jobs/{job_id}/result")
+
+    def cancel(self, job_id):
+        return self._request("POST", f"/jobs/{job_id}/cancel")
+
+    def wait(self, job_id, poll_interval=0.5, on_status=None):
+        """Poll until the job finishes and return its result, raising ServiceError if it did not succeed"""
+        while True:
+            status = self.status(job_id)
+            if on_status:
+                on_status(status)
+            if status['state'] in FINISHED_STATES:
+                break
+            time.sleep(poll_interval)
+        if status['state'] != DONE:
+            raise ServiceError(status.get('error') or f"Job {status['state']}")
+        return self.result(job_id)
@@ -0,0 +1,275 @@
+import io
+import json
+import os
+from collections.abc import Mapping
+
+from .instrumentation import stage, timed_writes
+from .transcript import as_dict
+
+# Dictionary of transcription format options. Word timings are not requested from
+# Whisper's transcribe loop; formats that show them set "align_words" and get a
+# separate alignment pass (pipeline.align_words) after the segments are ready.
+TRANSCRIPTION_FORMATS = {
+    "Text Only": {
+        "description": "Simple text without timestamps or special formatting",
+        "options": {"word_timestamps": False, "verbose": False},
+        "output_format": "text"  # Plain text output
+    },
+    "SRT Subtitles": {
+        "description": "Standard subtitle format with timestamps",
+        "options": {"word_timestamps": False, "verbose": True},
+        "output_format": "srt"  # SRT format
+    },
+    "Word Timestamps": {
+        "description": "Text with timestamps for each word",
+        "options": {"word_timestamps": False, "verbose": False},
+        "align_words": True,
+        "output_format": "word_timestamps"  # Word-level timestamps
+    },
+    "JSON Output": {
+        "description": "Complete data in JSON format for developers",
+        "options": {"word_timestamps": False, "verbose": True},
+        "output_format": "json"  # Raw JSON output
+    },
+    "VTT Subtitles": {
+        "description": "WebVTT subtitle format for web videos",
+        "options": {"word_timestamps": False, "verbose": True},
+        "output_format": "vtt"  # VTT subtitle format
+    },
+    "Binary Transcript": {
+        "description": "Compact, time-indexed binary file for archiving (convert with the command line)",
+        "options": {"word_timestamps": False, "verbose": False},
+        "output_format": "binary"  # .wtr file, see core.binary_transcript
+    }
+}
+
+def format_timestamp(seconds, always_include_hours=False, decimal_marker='.'):
+    """Convert seconds to HH:MM:SS.MS format"""
+    hours = int(seconds / 3600)
+    seconds = seconds - (hours * 3600)
+    minutes = int(seconds / 60)
+    seconds = seconds - (minutes * 60)
+    
+    if always_include_hours or hours > 0:
+        text = f"{hours:02d}:{minutes:02d}:{seconds:06.3f}"
+    else:
+        text = f"{minutes:02d}:{seconds:06.3f}"
+    # Called for every segment and word, so skip the replace in the common case
+    return text if decimal_marker == '.' else text.replace('.', decimal_marker)
+
+class SegmentWriter:
+    """Incrementally write transcription segments to any text sink (file, socket wrapper, StringIO).
+
+    Segments can be written as soon as they are produced; nothing is
+    accumulated in memory, so the cost is linear in the output size.
+    """
+
+    def __init__(self, sink):
+        self.sink = sink
+        self.count = 0
+
+    def begin(self):
+        """Write any header; called once before the first segment"""
+
+    def write_segment(self, segment):
+        self.count += 1
+
+    def end(self):
+        """Write any trailer; called once after the last segment"""
+
+    def write_segments(self, segments):
+        self.begin()
+        for segment in segments:
+            self.write_segment(segment)
+        self.end()
+
+
+class SrtWriter(SegmentWriter):
+    def write_segment(self, segment):
+        super().write_segment(segment)
+        # Format: sequential number, timestamp range, text content, blank line
+        start = format_timestamp(segment['start'], always_include_hours=True, decimal_marker=',')
+        end = format_timestamp(segment['end'], always_include_hours=True, decimal_marker=',')
+        self.sink.write(f"{self.count}\n{start} --> {end}\n{segment['text'].strip()}\n\n")
+
+
+class VttWriter(SegmentWriter):
+    def begin(self):
+        self.sink.write("WEBVTT\n\n")
+
+    def write_segment(self, segment):
+        super().write_segment(segment)
+        start = format_timestamp(segment['start'], always_include_hours=True)
+        end = format_timestamp(segment['end'], always_include_hours=True)
+        self.sink.write(f"{start} --> {end}\n{segment['text'].strip()}\n\n")
+
+
+class WordTimestampWriter(SegmentWriter):
+    def write_segment(self, segment):
+        super().write_segment(segment)
+        if 'words' in segment:
+            write = self.sink.write
+            for word in segment['words']:
+                write(f"[{format_timestamp(word['start'])}] {word['word']} ")
+            write("\n")
+        else:
+            # Fallback if word timestamps aren't available
+            start = format_timestamp(segment['start'])
+            self.sink.write(f"[{start}] {segment['text'].strip()}\n")
+
+
+class TextWriter(SegmentWriter):
+    def write_segment(self, segment):
+        super().write_segment(segment)
+        self.sink.write(segment['text'])
+
+
+# Streaming writer for each segment-based output format
+SEGMENT_WRITERS = {
+    "text": TextWriter,
+    "srt": SrtWriter,
+    "vtt": VttWriter,
+    "word_timestamps": WordTimestampWriter
+}
+
+def write_result(result, output_format, sink):
+    """Stream a complete result to a text sink in the given output format"""
+    if output_format == "json":
+        # json.dump encodes in chunks rather than building one large string
+        json.dump(as_dict(result), sink, indent=2)
+    elif output_format == "text" or output_format not in SEGMENT_WRITERS:
+        sink.write(result.get("text", "No text output available"))
+    elif output_format == "word_timestamps" and not result.get('segments'):
+        sink.write("No word timestamps available in results.")
+    else:
+        SEGMENT_WRITERS[output_format](sink).write_segments(result.get('segments', []))
+
+def _format_to_string(writer_class, segments):
+    buffer = io.StringIO()
+    writer_class(buffer).write_segments(segments)
+    return buffer.getvalue()
+
+def format_srt(segments):
+    """Format segments as SRT subtitle format"""
+    return _format_to_string(SrtWriter, segments)
+
+def format_vtt(segments):
+    """Format segments as WebVTT subtitle format"""
+    return _format_to_string(VttWriter, segments)
+
+def format_word_timestamps(result):
+    """Format result with word-level timestamps"""
+    if not result.get('segments'):
+        return "No word timestamps available in results."
+    return _format_to_string(WordTimestampWriter, result['segments'])
+
+# File extension used when a result is written to disk for each output format
+OUTPUT_EXTENSIONS = {
+    "text": ".txt",
+    "srt": ".srt",
+    "vtt": ".vtt",
+    "word_timestamps": ".words.txt",
+    "json": ".json",
+    "binary": ".wtr"
+}
+
+def format_result(result, output_format):
+    """Format a transcription result dict for the given output format"""
+    # Ensure result is a dictionary (or a compact Transcript)
+    if not isinstance(result, Mapping):
+        return str(result)
+    
+    if output_format == "srt" and 'segments' in result:
+        try:
+            return format_srt(result['segments'])
+        except Exception as e:
+            return f"Error formatting SRT: {str(e)}\n\n{result['text']}"
+    
+    elif output_format == "vtt" and 'segments' in result:
+        try:
+            return format_vtt(result['segments'])
+        except Exception as e:
+            return f"Error formatting VTT: {str(e)}\n\n{result['text']}"
+    
+    elif output_format == "word_timestamps":
+        try:
+            return format_word_timestamps(result)
+        except Exception as e:
+            return f"Error formatting word timestamps: {str(e)}\n\n{result['text']}"
+    
+    elif output_format == "json":
+        try:
+            return json.dumps(as_dict(result), indent=2)
+        except Exception as e:
+            return f"Error formatting JSON: {str(e)}"
+    
+    # Default to plain text
+    return result.get("text", "No text output available")
+
+def output_format_for_path(path):
+    """Output format implied by a file name's extension, or None if it has none of ours"""
+    name = path.lower()
+    # Longest extension first, so ".words.txt" is not taken for plain ".txt"
+    for output_format, extension in sorted(OUTPUT_EXTENSIONS.items(), key=lambda item: -len(item[1])):
+        if name.endswith(extension):
+            return output_format
+    return None
+
+def output_file_for(source_file, output_format, output_dir=None):
+    """Path of a result beside its source file (or in output_dir), with the output format's extension"""
+    output_file = os.path.splitext(source_file)[0] + OUTPUT_EXTENSIONS.get(output_format, ".txt")
+    if output_dir:
+        output_file = os.path.join(output_dir, os.path.basename(output_file))
+    return output_file
+
+def write_result_files(result, outputs):
+    """Write one result to several files in one pass; outputs maps output file -> output format.
+
+    The segment formats (SRT, VTT, word timestamps) share a single loop over
+    the segments, each writer streaming to its own file, so nothing is
+    formatted twice or held in memory whole. Plain text, JSON and binary
+    output are written from the result directly. Returns the output files.
+    """
+    files = []
+    writers = []
+    try:
+        # Stream straight to disk instead of building the whole document in memory
+        with stage("format"):
+            for output_file, output_format in outputs.items():
+                if output_format == "binary":
+                    from .binary_transcript import write_transcript
+                    with stage("save"):
+                        write_transcript(result, output_file)
+                    continue
+                f = open(output_file, 'w', encoding='utf-8')
+                files.append(f)
+                # Time spent inside the file writes is reported as "save"
+                sink = timed_writes(f)
+                if not isinstance(result, Mapping):
+                    sink.write(str(result))
+                elif output_format in SEGMENT_WRITERS and output_format != "text" and result.get('segments'):
+                    writers.append(SEGMENT_WRITERS[output_format](sink))
+                else:
+                    write_result(result, output_format, sink)
+            for writer in writers:
+                writer.begin()
+            if writers:
+                for segment in result['segments']:
+                    for writer in writers:
+                        writer.write_segment(segment)
+            for writer in writers:
+                writer.end()
+    finally:
+        for f in files:
+            f.close()
+    return list(outputs)
+
+def write_results_next_to_source(result, audio_file, output_formats, output_dir=None):
+    """Write a result beside its audio file (or into output_dir) in every output format; returns the paths"""
+    output_files = [output_file_for(audio_file, output_format, output_dir) for output_format in output_formats]
+    write_result_files(result, dict(zip(output_files, output_formats)))
+    return output_files
+
+def write_result_next_to_source(result, audio_file, output_format, output_dir=None):
+    """Write a formatted result beside its audio file (or into output_dir) and return the output path"""
+    return write_results_next_to_source(result, audio_file, [output_format], output_dir)[0]
@@ -0,0 +1,230 @@
+"""Shared hardware probe for CUDA/nvidia-smi details.
+
+Probing is memoized for the process and persisted to a small cache file
+that is invalidated when the NVIDIA driver or the installed torch version
+changes. This module only uses the standard library so that
+cuda_detector.py can load it before any dependencies are installed.
+"""
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import threading
+
+CACHE_FILE = os.path.join(os.path.expanduser("~"), ".cache", "whisper-transcriber", "hardware.json")
+NVIDIA_SMI_TIMEOUT = 5  # seconds
+
+# nvidia-smi status values, matching what cuda_detector.py has always printed
+STATUS_OK = "OK"
+STATUS_NOT_FOUND = "NOT_FOUND"  # nvidia-smi works but the CUDA version could not be extracted
+STATUS_COMMAND_FAILED = "COMMAND_FAILED"  # nvidia-smi is missing or failed
+
+_lock = threading.Lock()
+_nvidia_smi_info = None
+_hardware_info = None
+
+
+def find_nvidia_smi():
+    """Return the path of nvidia-smi from PATH or the usual Windows install locations"""
+    nvidia_smi_path = shutil.which("nvidia-smi")
+    if nvidia_smi_path:
+        return nvidia_smi_path
+    possible_paths = [
+        os.path.join(os.environ.get("ProgramFiles", "C:\\Program Files"), "NVIDIA Corporation\\NVSMI\\nvidia-smi.exe"),
+        os.path.join(os.environ.get("ProgramW6432", "C:\\Program Files"), "NVIDIA Corporation\\NVSMI\\nvidia-smi.exe")
+    ]
+    for possible_path in possible_paths:
+        if os.path.exists(possible_path):
+            return possible_path
+    return None
+
+
+def _driver_fingerprint(nvidia_smi_path):
+    """Cheap identifier of the installed driver that does not run nvidia-smi"""
+    parts = [nvidia_smi_path or "no-nvidia-smi"]
+    if nvidia_smi_path:
+        try:
+            # nvidia-smi is replaced with every driver install
+            stat = os.stat(nvidia_smi_path)
+            parts.append(f"{stat.st_size}:{stat.st_mtime_ns}")
+        except OSError:
+            pass
+    try:
+        with open("/proc/driver/nvidia/version", "r") as f:
+            parts.append(f.read())
+    except OSError:
+        pass
+    return hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()
+
+
+def _torch_fingerprint():
+    """Installed torch version plus the GPU visibility settings torch honours"""
+    return f"{_torch_version()}|{os.environ.get('CUDA_VISIBLE_DEVICES')}"
+
+
+def _torch_version():
+    """Installed torch version, read from package metadata without importing torch"""
+    try:
+        from importlib.metadata import version, PackageNotFoundError
+    except ImportError:
+        return None
+    try:
+        return version("torch")
+    except PackageNotFoundError:
+        return None
+
+
+def _read_cache():
+    try:
+        with open(CACHE_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_cache(section, fingerprint, info):
+    cache = _read_cache()
+    cache[section] = {"fingerprint": fingerprint, "info": info}
+    try:
+        os.makedirs(os.path.dirname(CACHE_FILE), exist_ok=True)
+        temp_file = f"{CACHE_FILE}.{os.getpid()}.tmp"
+        with open(temp_file, "w", encoding="utf-8") as f:
+            json.dump(cache, f, indent=2)
+        os.replace(temp_file, CACHE_FILE)
+    except OSError as e:
+        print(f"Could not write hardware cache: {e}")
+
+
+def _cached(section, fingerprint):
+    entry = _read_cache().get(section)
+    if isinstance(entry, dict) and entry.get("fingerprint") == fingerprint:
+        return entry.get("info")
+    return None
+
+
+def _run_nvidia_smi(nvidia_smi_path):
+    """Run nvidia-smi once and parse the CUDA and driver versions from its header"""
+    info = {
+        "nvidia_smi_path": nvidia_smi_path,
+        "status": STATUS_COMMAND_FAILED,
+        "cuda_version": None,
+        "driver_version": None
+    }
+    if not nvidia_smi_path:
+        return info
+    try:
+        result = subprocess.run([nvidia_smi_path], capture_output=True, text=True, timeout=NVIDIA_SMI_TIMEOUT)
+    except (OSError, subprocess.SubprocessError) as e:
+        print(f"Error running nvidia-smi: {e}")
+        return info
+    if result.returncode != 0:
+        print(f"nvidia-smi call failed with error: {result.stderr.strip()}")
+        return info
+
+    version_match = re.search(r"CUDA Version:\s+(\d+\.\d+)", result.stdout)
+    driver_match = re.search(r"Driver Version:\s+([\d.]+)", result.stdout)
+    info["driver_version"] = driver_match.group(1) if driver_match else None
+    if version_match:
+        info["cuda_version"] = version_match.group(1)
+        info["status"] = STATUS_OK
+    else:
+        info["status"] = STATUS_NOT_FOUND
+    return info
+
+
+def get_nvidia_smi_info(use_cache=True):
+    """nvidia-smi details (path, status, CUDA and driver versions) without importing torch"""
+    global _nvidia_smi_info
+    with _lock:
+        if _nvidia_smi_info is not None:
+            return _nvidia_smi_info
+
+        nvidia_smi_path = find_nvidia_smi()
+        fingerprint = _driver_fingerprint(nvidia_smi_path)
+        info = _cached("nvidia_smi", fingerprint) if use_cache else None
+        if info is None:
+            info = _run_nvidia_smi(nvidia_smi_path)
+            if use_cache:
+                _write_cache("nvidia_smi", fingerprint, info)
+        _nvidia_smi_info = info
+        return info
+
+
+def _probe_torch():
+    """CUDA details as seen by PyTorch"""
+    info = {
+        "torch_version": None,
+        "available": False,
+        "device_count": 0,
+        "device_name": None,
+        "compute_capability": None,
+        "memory_gb": None
+    }
+    try:
+        import torch
+    except ImportError as e:
+        print(f"PyTorch is not available: {e}")
+        return info
+
+    info["torch_version"] = torch.__version__
+    try:
+        info["available"] = torch.cuda.is_available()
+        if info["available"]:
+            info["device_count"] = torch.cuda.device_count()
+            if info["device_count"] > 0:
+                info["device_name"] = torch.cuda.get_device_name(0)
+                props = torch.cuda.get_device_properties(0)
+                info["compute_capability"] = f"{props.major}.{props.minor}"
+                info["memory_gb"] = round(props.total_memory / (1024**3), 1)
+    except Exception as e:
+        print(f"Error getting CUDA information from PyTorch: {e}")
+    return info
+
+
+def get_hardware_info(use_cache=True):
+    """Combined nvidia-smi and PyTorch CUDA details, probed at most once per process.
+
+    The result is cached on disk until the driver or the torch version
+    changes, so later starts skip both nvidia-smi and the torch CUDA probe.
+    """
+    global _hardware_info
+    nvidia_smi_info = get_nvidia_smi_info(use_cache)
+    with _lock:
+        if _hardware_info is not None:
+            return _hardware_info
+
+        fingerprint = f"{_driver_fingerprint(nvidia_smi_info['nvidia_smi_path'])}|{_torch_fingerprint()}"
+        torch_info = _cached("torch", fingerprint) if use_cache else None
+        if torch_info is None:
+            torch_info = _probe_torch()
+            if use_cache:
+                _write_cache("torch", fingerprint, torch_info)
+
+        info = dict(torch_info)
+        info["version"] = nvidia_smi_info["cuda_version"]
+        info["driver_version"] = nvidia_smi_info["driver_version"]
+        info["nvidia_smi_path"] = nvidia_smi_info["nvidia_smi_path"]
+        info["nvidia_smi_status"] = nvidia_smi_info["status"]
+        _hardware_info = info
+        return info
+
+
+def probe_hardware_async(callback=None):
+    """Probe in a daemon thread and pass the result to callback; returns the thread"""
+    def run():
+        info = get_hardware_info()
+        if callback is not None:
+            callback(info)
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
+
+
+def clear_memoized():
+    """Forget the in-process results (the cache file is left alone)"""
+    global _nvidia_smi_info, _hardware_info
+    with _lock:
+        _nvidia_smi_info = None
+        _hardware_info = None
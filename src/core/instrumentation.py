@@ -0,0 +1,314 @@
+import importlib
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+# Stages a job can spend time in. Times are exclusive: "transcribe" is the part
+# of Whisper's loop not already counted as mel, encoder or decoder time.
+STAGES = ("load", "decode", "vad", "mel", "encoder", "decoder", "transcribe", "align", "format", "save")
+
+_local = threading.local()
+_install_lock = threading.Lock()
+_installed = False
+
+
+# Resident memory is sampled at most this often while a job's stages end
+RSS_SAMPLE_SECONDS = 0.05
+
+
+def _windows_memory_counters():
+    import ctypes
+    from ctypes import wintypes
+
+    class ProcessMemoryCounters(ctypes.Structure):
+        _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD)] + [
+            (name, ctypes.c_size_t) for name in (
+                "PeakWorkingSetSize", "WorkingSetSize", "QuotaPeakPagedPoolUsage", "QuotaPagedPoolUsage",
+                "QuotaPeakNonPagedPoolUsage", "QuotaNonPagedPoolUsage", "PagefileUsage", "PeakPagefileUsage")]
+
+    counters = ProcessMemoryCounters()
+    counters.cb = ctypes.sizeof(counters)
+    kernel32 = ctypes.windll.kernel32
+    kernel32.GetCurrentProcess.restype = wintypes.HANDLE
+    psapi = ctypes.windll.psapi
+    psapi.GetProcessMemoryInfo.argtypes = [wintypes.HANDLE, ctypes.c_void_p, wintypes.DWORD]
+    if psapi.GetProcessMemoryInfo(kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb):
+        return counters
+    return None
+
+
+def peak_rss_mb():
+    """Peak resident memory over this process's whole lifetime in MB, or None where it cannot be read"""
+    if sys.platform == "win32":
+        counters = _windows_memory_counters()
+        return counters.PeakWorkingSetSize / (1024 * 1024) if counters else None
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Bytes on macOS, kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def current_rss_mb():
+    """Resident memory of this process right now in MB, or None where it cannot be read"""
+    if sys.platform == "win32":
+        counters = _windows_memory_counters()
+        return counters.WorkingSetSize / (1024 * 1024) if counters else None
+    try:
+        with open("/proc/self/statm", encoding='ascii') as f:
+            pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+
+def peak_gpu_mb(device):
+    """Peak CUDA memory allocated by torch in this process, or None off the GPU"""
+    if not str(device).startswith("cuda") or "torch" not in sys.modules:
+        return None
+    import torch
+    return torch.cuda.max_memory_allocated() / (1024 * 1024)
+
+
+def reset_peak_gpu(device):
+    """Start a new CUDA peak for peak_gpu_mb, so a job does not report an earlier job's peak"""
+    if not str(device).startswith("cuda") or "torch" not in sys.modules:
+        return
+    import torch
+    if torch.cuda.is_available():
+        torch.cuda.reset_peak_memory_stats()
+
+
+class JobMetrics:
+    """Stage timings and resource figures for one transcription job.
+
+    Stages are recorded with stage() while the job is the thread's current
+    metrics (see collect_metrics). The real-time factor is processing time,
+    the sum of all stages, per second of audio.
+
+    peak_rss_mb is the highest resident memory sampled while the job's
+    stages ran, so a job does not report the peak of an earlier, larger one
+    in a long-running GUI or service. Where current memory cannot be read
+    (macOS) it falls back to the process-lifetime peak. peak_gpu_mb is
+    measured from the first time the job is collected (see collect_metrics).
+    """
+
+    def __init__(self, audio_file=None, model_name=None, device=None, dtype="float32", event="transcription"):
+        self.event = event
+        self.audio_file = audio_file
+        self.model_name = model_name
+        self.device = device
+        self.dtype = dtype
+        self.audio_seconds = None
+        self.cached = False
+        self.error = None
+        self.stages = {}
+        self.started = None  # Set by the first stage, so time spent queued is not counted
+        self.finished = None
+        self.peak_rss_mb = None
+        self.peak_gpu_mb = None
+        self._last_rss_sample = 0.0
+        self._gpu_peak_reset = False
+        self._lock = threading.Lock()
+
+    def add(self, stage_name, seconds):
+        with self._lock:
+            self.stages[stage_name] = self.stages.get(stage_name, 0.0) + seconds
+
+    def add_audio(self, seconds):
+        with self._lock:
+            self.audio_seconds = (self.audio_seconds or 0.0) + seconds
+
+    def sample_memory(self, force=False):
+        """Raise peak_rss_mb to the current resident memory, at most every RSS_SAMPLE_SECONDS"""
+        now = time.perf_counter()
+        if not force and now - self._last_rss_sample < RSS_SAMPLE_SECONDS:
+            return
+        self._last_rss_sample = now
+        rss = current_rss_mb()
+        if rss is not None:
+            with self._lock:
+                self.peak_rss_mb = max(self.peak_rss_mb or 0.0, rss)
+
+    @property
+    def processing_seconds(self):
+        return sum(self.stages.values())
+
+    @property
+    def real_time_factor(self):
+        if not self.audio_seconds:
+            return None
+        return self.processing_seconds / self.audio_seconds
+
+    def finish(self, error=None):
+        """Stamp the end time and memory peaks; called once the job's output is saved"""
+        self.finished = time.time()
+        if error:
+            self.error = str(error)
+        self.sample_memory(force=True)
+        if self.peak_rss_mb is None:
+            self.peak_rss_mb = peak_rss_mb()
+        self.peak_gpu_mb = peak_gpu_mb(self.device)
+        return self
+
+    def reset_gpu_peak(self):
+        """Start the job's GPU peak here; later calls keep the peak reached so far"""
+        if not self._gpu_peak_reset:
+            self._gpu_peak_reset = True
+            reset_peak_gpu(self.device)
+
+    def to_dict(self):
+        rtf = self.real_time_factor
+        return {
+            'event': self.event,
+            'timestamp': self.finished or time.time(),
+            'audio_file': self.audio_file,
+            'model': self.model_name,
+            'device': self.device,
+            'dtype': self.dtype,
+            'cached': self.cached,
+            'audio_seconds': round(self.audio_seconds, 3) if self.audio_seconds is not None else None,
+            'stages': {name: round(seconds, 4) for name, seconds in self.stages.items()},
+            'processing_seconds': round(self.processing_seconds, 4),
+            'wall_seconds': round((self.finished or time.time()) - self.started, 4) if self.started else 0.0,
+            'real_time_factor': round(rtf, 4) if rtf is not None else None,
+            'peak_rss_mb': round(self.peak_rss_mb, 1) if self.peak_rss_mb is not None else None,
+            'peak_gpu_mb': round(self.peak_gpu_mb, 1) if self.peak_gpu_mb is not None else None,
+            'error': self.error
+        }
+
+
+class MetricsLog:
+    """Append finished jobs as JSON lines to a file, or to stderr for "-" """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def write(self, metrics):
+        line = json.dumps(metrics.to_dict() if isinstance(metrics, JobMetrics) else metrics) + "\n"
+        with self._lock:
+            if self.path == "-":
+                sys.stderr.write(line)
+                sys.stderr.flush()
+                return
+            try:
+                directory = os.path.dirname(os.path.abspath(self.path))
+                os.makedirs(directory, exist_ok=True)
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(line)
+            except OSError as e:
+                print(f"Could not write metrics to {self.path}: {e}")
+
+
+def current_metrics():
+    """The JobMetrics that stages on this thread are recorded into, or None"""
+    return getattr(_local, 'metrics', None)
+
+
+@contextmanager
+def collect_metrics(metrics):
+    """Record the stages run by this thread into metrics while the block runs (None records nothing)"""
+    previous = (getattr(_local, 'metrics', None), getattr(_local, 'stack', None))
+    if metrics is not None:
+        metrics.reset_gpu_peak()
+    _local.metrics = metrics
+    _local.stack = []
+    try:
+        yield metrics
+    finally:
+        _local.metrics, _local.stack = previous
+
+
+def _begin():
+    metrics = getattr(_local, 'metrics', None)
+    if metrics is None:
+        return
+    if metrics.started is None:
+        metrics.started = time.time()
+    # Each open stage counts the time its nested stages took, to report exclusive times
+    _local.stack.append([time.perf_counter(), 0.0])
+
+
+def _end(stage_name):
+    metrics = getattr(_local, 'metrics', None)
+    if metrics is None or not _local.stack:
+        return
+    start, nested = _local.stack.pop()
+    elapsed = time.perf_counter() - start
+    metrics.add(stage_name, elapsed - nested)
+    metrics.sample_memory()
+    if _local.stack:
+        _local.stack[-1][1] += elapsed
+
+
+@contextmanager
+def stage(stage_name):
+    """Time the block as stage_name in the thread's current metrics, if any"""
+    _begin()
+    try:
+        yield
+    finally:
+        _end(stage_name)
+
+
+class TimedWriter:
+    """File wrapper that counts the time spent in write() as the "save" stage"""
+
+    def __init__(self, sink):
+        self.sink = sink
+
+    def write(self, text):
+        with stage("save"):
+            return self.sink.write(text)
+
+
+def timed_writes(sink):
+    return TimedWriter(sink) if current_metrics() is not None else sink
+
+
+def _timed_log_mel_spectrogram(function):
+    def log_mel_spectrogram(*args, **kwargs):
+        with stage("mel"):
+            return function(*args, **kwargs)
+    log_mel_spectrogram.__wrapped__ = function
+    return log_mel_spectrogram
+
+
+def _install():
+    global _installed
+    with _install_lock:
+        if not _installed:
+            # Same approach as the progress shim: wrap the name whisper.transcribe calls
+            transcribe_module = importlib.import_module('whisper.transcribe')
+            transcribe_module.log_mel_spectrogram = _timed_log_mel_spectrogram(transcribe_module.log_mel_spectrogram)
+            _installed = True
+
+
+def instrument_model(model):
+    """Time the model's encoder and decoder passes as stages (idempotent)"""
+    _install()
+    if getattr(model, '_stage_hooks', False):
+        return model
+    for stage_name in ("encoder", "decoder"):
+        module = getattr(model, stage_name, None)
+        if module is None:
+            continue
+        module.register_forward_pre_hook(lambda module, inputs: _begin())
+
+        def finished(module, inputs, output, stage_name=stage_name):
+            if current_metrics() is not None and getattr(output, 'is_cuda', False):
+                # CUDA runs asynchronously; wait so the time lands in this stage
+                import torch
+                torch.cuda.synchronize(output.device)
+            _end(stage_name)
+
+        # always_call: a forward that raises still closes its stage, keeping the stage stack balanced
+        module.register_forward_hook(finished, always_call=True)
+    model._stage_hooks = True
+    return model
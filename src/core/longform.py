@@ -0,0 +1,156 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+import numpy as np
+
+from .audio import SAMPLE_RATE
+
+# Target chunk length for parallel transcription; actual splits move to the quietest nearby point
+DEFAULT_CHUNK_SECONDS = 300
+# How far either side of a target split point to search for silence
+SPLIT_SEARCH_SECONDS = 15
+# Energy frame length used when looking for silence
+FRAME_SECONDS = 0.03
+
+# Model loaded once per worker process by _init_worker
+_worker_model = None
+_worker_fp16 = False
+
+
+def frame_energy(audio, frame_samples):
+    """Mean squared amplitude of consecutive non-overlapping frames"""
+    frame_count = len(audio) // frame_samples
+    if frame_count == 0:
+        return np.zeros(0, dtype=np.float32)
+    frames = audio[:frame_count * frame_samples].reshape(frame_count, frame_samples)
+    return np.einsum('ij,ij->i', frames, frames) / frame_samples
+
+
+def find_silence_splits(audio, chunk_seconds=DEFAULT_CHUNK_SECONDS, search_seconds=SPLIT_SEARCH_SECONDS):
+    """Return (start, end) sample ranges of roughly chunk_seconds, split at the quietest frames"""
+    total = len(audio)
+    chunk_samples = int(chunk_seconds * SAMPLE_RATE)
+    if total <= chunk_samples * 1.5:
+        return [(0, total)]
+
+    frame_samples = int(FRAME_SECONDS * SAMPLE_RATE)
+    energy = frame_energy(audio, frame_samples)
+    search_frames = int(search_seconds / FRAME_SECONDS)
+
+    splits = []
+    start = 0
+    while total - start > chunk_samples * 1.5:
+        target_frame = (start + chunk_samples) // frame_samples
+        low = max(target_frame - search_frames, start // frame_samples + 1)
+        high = min(target_frame + search_frames, len(energy))
+        # Split in the middle of the quietest frame within the search window
+        quietest = low + int(np.argmin(energy[low:high]))
+        split = quietest * frame_samples + frame_samples // 2
+        splits.append((start, split))
+        start = split
+    splits.append((start, total))
+    return splits
+
+
+def default_worker_count():
+    return max(1, min(os.cpu_count() or 1, 8))
+
+
+def _init_worker(model_name, threads_per_worker, fp16, dtype="float32"):
+    """Load one model per worker process and pin its thread pools"""
+    global _worker_model, _worker_fp16
+    import torch
+    torch.set_num_threads(threads_per_worker)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        pass  # Already set in this process
+    from .model_cache import get_model_cache
+    _worker_model, _ = get_model_cache().get(model_name, "cpu", dtype)
+    _worker_fp16 = fp16
+
+
+def _transcribe_chunk(audio_chunk, offset, options):
+    """Transcribe one chunk in a worker process and shift its timestamps to the global timeline"""
+    result = _worker_model.transcribe(audio_chunk, fp16=_worker_fp16, **options)
+    return offset_result(result, offset)
+
+
+def offset_result(result, offset):
+    """Shift every segment and word timestamp of a result by offset seconds"""
+    seek_offset = int(round(offset * SAMPLE_RATE / 160))  # Whisper seeks in 10 ms mel frames
+    for segment in result.get('segments', []):
+        segment['start'] += offset
+        segment['end'] += offset
+        if 'seek' in segment:
+            segment['seek'] += seek_offset
+        for word in segment.get('words', []):
+            word['start'] += offset
+            word['end'] += offset
+    return result
+
+
+def stitch_results(results):
+    """Merge chunk results, already on the global timeline, into one Whisper-style result"""
+    segments = []
+    for result in results:
+        for segment in result.get('segments', []):
+            segment['id'] = len(segments)
+            segments.append(segment)
+    language = results[0].get('language') if results else None
+    return {
+        'text': "".join(result.get('text', '') for result in results),
+        'segments': segments,
+        'language': language
+    }
+
+
+def transcribe_long_form(audio, model_name, workers=None, chunk_seconds=DEFAULT_CHUNK_SECONDS,
+                         fp16=False, on_chunk_done=None, dtype="float32", **options):
+    """Transcribe long CPU audio by splitting it at silences and fanning chunks out to processes.
+
+    Each worker process holds its own model with its thread count pinned so
+    the workers do not oversubscribe the CPU. on_chunk_done(done, total) is
+    called as chunks complete; new chunks are only handed out after it returns.
+    """
+    chunks = find_silence_splits(audio, chunk_seconds)
+    workers = min(workers or default_worker_count(), len(chunks))
+    threads_per_worker = max(1, (os.cpu_count() or 1) // workers)
+    print(f"Long-form mode: {len(chunks)} chunks on {workers} worker processes ({threads_per_worker} threads each)")
+
+    # Spawn rather than fork: forking a process that already runs torch threads can deadlock
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=context,
+        initializer=_init_worker,
+        initargs=(model_name, threads_per_worker, fp16, dtype)
+    ) as executor:
+        # Keep only one chunk per worker in flight so a paused or cancelled job
+        # (on_chunk_done blocking or raising) stops handing out new work
+        def submit(index):
+            start, end = chunks[index]
+            return executor.submit(_transcribe_chunk, audio[start:end], start / SAMPLE_RATE, options)
+
+        in_flight = {submit(index): index for index in range(workers)}
+        next_chunk = workers
+        results = [None] * len(chunks)
+        try:
+            for done in range(1, len(chunks) + 1):
+                if not any(future.done() for future in in_flight):
+                    wait(in_flight, return_when=FIRST_COMPLETED)
+                future = next(future for future in in_flight if future.done())
+                results[in_flight.pop(future)] = future.result()
+                if on_chunk_done:
+                    on_chunk_done(done, len(chunks))
+                if next_chunk < len(chunks):
+                    in_flight[submit(next_chunk)] = next_chunk
+                    next_chunk += 1
+        except BaseException:
+            # Failed or cancelled: do not wait for the chunks that have not started
+            for future in in_flight:
+                future.cancel()
+            raise
+
+    return stitch_results(results)
@@ -0,0 +1,42 @@
+import re
+import unicodedata
+
+
+def normalize_text(text):
+    """Lowercase, strip punctuation and collapse whitespace so only the words are compared"""
+    text = unicodedata.normalize("NFKC", text).lower()
+    # Keep apostrophes inside words ("don't") but drop all other punctuation
+    text = re.sub(r"[^\w\s']|'(?!\w)|(?<!\w)'", " ", text)
+    return text.split()
+
+
+def word_errors(reference, hypothesis):
+    """Word-level edit distance (substitutions + deletions + insertions) between two texts"""
+    ref = normalize_text(reference)
+    hyp = normalize_text(hypothesis)
+    if not ref:
+        return len(hyp)
+    # One row of the Levenshtein table at a time
+    previous = list(range(len(hyp) + 1))
+    for i, word in enumerate(ref, start=1):
+        current = [i]
+        for j, hyp_word in enumerate(hyp, start=1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (word != hyp_word)))
+        previous = current
+    return previous[-1]
+
+
+def word_error_rate(reference, hypothesis):
+    """Word error rate of a hypothesis against a reference transcript"""
+    reference_words = len(normalize_text(reference))
+    errors = word_errors(reference, hypothesis)
+    if reference_words == 0:
+        return 0.0 if errors == 0 else 1.0
+    return errors / reference_words
+
+
+def corpus_word_error_rate(pairs):
+    """WER over (reference, hypothesis) pairs, weighted by reference length"""
+    errors = sum(word_errors(reference, hypothesis) for reference, hypothesis in pairs)
+    words = sum(len(normalize_text(reference)) for reference, _ in pairs)
+    return errors / words if words else 0.0
@@ -0,0 +1,146 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# Default memory budget for resident models, overridable with WHISPER_MODEL_CACHE_MB
+DEFAULT_MEMORY_BUDGET_MB = 4096
+
+
+def _default_budget_mb():
+    """Read the memory budget from the environment, falling back to the default"""
+    try:
+        return int(os.environ.get("WHISPER_MODEL_CACHE_MB", DEFAULT_MEMORY_BUDGET_MB))
+    except ValueError:
+        return DEFAULT_MEMORY_BUDGET_MB
+
+
+def _load_whisper_model(model_name, device, dtype):
+    """Load a Whisper model from disk and move it to the requested device"""
+    if dtype == "int8":
+        # Dynamic int8 quantization only has CPU kernels
+        if str(device) != "cpu":
+            raise ValueError("int8 models can only run on the CPU")
+        from .quantize import load_quantized_model
+        return load_quantized_model(model_name)
+    # Imported here so that importing the cache does not pull in the ML stack
+    from .checkpoints import load_mmap_model
+    # Weights stay in the page cache, shared with other processes using the same model
+    model = load_mmap_model(model_name)
+    if dtype == "float16":
+        model = model.half()
+    return model.to(device)
+
+
+def model_size_mb(model):
+    """Approximate resident size of a model's parameters and buffers in MB"""
+    total = 0
+    for tensor in list(model.parameters()) + list(model.buffers()):
+        total += tensor.numel() * tensor.element_size()
+    # Quantized layers keep their int8 weights in packed params rather than parameters
+    for name, value in model.state_dict().items():
+        if name.endswith("_packed_params._packed_params"):
+            total += sum(t.numel() * t.element_size() for t in value if t is not None)
+    return total / (1024 * 1024)
+
+
+class ModelCache:
+    """Process-wide registry of loaded models keyed by (model name, device, dtype).
+
+    Models outlive the workers that use them. When the total size of resident
+    models exceeds the memory budget, the least recently used ones are evicted.
+    The most recently used model is always kept, even if it alone exceeds the budget.
+    """
+
+    def __init__(self, memory_budget_mb=None, loader=None):
+        self.memory_budget_mb = memory_budget_mb if memory_budget_mb is not None else _default_budget_mb()
+        self._loader = loader or _load_whisper_model
+        self._models = OrderedDict()  # key -> (model, size_mb)
+        self._lock = threading.Lock()
+        self._load_locks = {}
+
+    def get(self, model_name, device="cpu", dtype="float32"):
+        """Return (model, was_cached), loading the model only if it is not resident"""
+        key = (model_name, str(device), dtype)
+
+        with self._lock:
+            if key in self._models:
+                self._models.move_to_end(key)
+                return self._models[key][0], True
+            # One lock per key so two workers never load the same model twice
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        with load_lock:
+            with self._lock:
+                if key in self._models:
+                    self._models.move_to_end(key)
+                    return self._models[key][0], True
+
+            start_time = time.time()
+            model = self._loader(model_name, device, dtype)
+            size_mb = model_size_mb(model)
+            print(f"Loaded {model_name} model on {device} ({size_mb:.0f} MB) in {time.time() - start_time:.1f}s")
+
+            with self._lock:
+                self._models[key] = (model, size_mb)
+                self._models.move_to_end(key)
+                self._evict()
+            return model, False
+
+    def contains(self, model_name, device="cpu", dtype="float32"):
+        """Check whether a model is already resident"""
+        with self._lock:
+            return (model_name, str(device), dtype) in self._models
+
+    def resident_models(self):
+        """(model_name, device, dtype) keys of the resident models, least recently used first"""
+        with self._lock:
+            return list(self._models)
+
+    def set_memory_budget(self, memory_budget_mb):
+        """Change the memory budget and evict models that no longer fit"""
+        with self._lock:
+            self.memory_budget_mb = memory_budget_mb
+            self._evict()
+
+    def total_size_mb(self):
+        with self._lock:
+            return sum(size_mb for _, size_mb in self._models.values())
+
+    def clear(self):
+        """Drop every resident model"""
+        with self._lock:
+            devices = {key[1] for key in self._models}
+            self._models.clear()
+        self._release_device_memory(devices)
+
+    def _evict(self):
+        # Caller must hold self._lock
+        evicted_devices = set()
+        total = sum(size_mb for _, size_mb in self._models.values())
+        while total > self.memory_budget_mb and len(self._models) > 1:
+            key, (_, size_mb) = self._models.popitem(last=False)
+            total -= size_mb
+            evicted_devices.add(key[1])
+            print(f"Evicted {key[0]} model ({key[1]}, {key[2]}) from model cache")
+        self._release_device_memory(evicted_devices)
+
+    @staticmethod
+    def _release_device_memory(devices):
+        if any(device.startswith("cuda") for device in devices):
+            import torch
+            if torch.cuda.is_available():
+                torch.cuda.empty_cache()
+
+
+_model_cache = None
+_model_cache_lock = threading.Lock()
+
+
+def get_model_cache():
+    """Return the process-wide model cache, creating it on first use"""
+    global _model_cache
+    with _model_cache_lock:
+        if _model_cache is None:
+            _model_cache = ModelCache()
+        return _model_cache
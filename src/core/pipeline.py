@@ -0,0 +1,409 @@
+import gc
+import os
+import pathlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .alignment import align_segments, transcript_digest, unaligned_segments
+from .audio import DecoderGroup, load_audio, ffmpeg_available, SAMPLE_RATE
+from .batching import BatchDecoder, DEFAULT_BATCH_SIZE
+from .checkpoints import mmap_checkpoint_exists
+from .formatters import write_results_next_to_source
+from .instrumentation import collect_metrics, current_metrics, instrument_model, stage
+from .longform import transcribe_long_form, DEFAULT_CHUNK_SECONDS
+from .model_cache import get_model_cache
+from .progress import decoder_progress
+from .result_cache import get_result_cache
+from .vad import detect_speech, compact_audio, remap_result, skipped_fraction
+
+# Files decoded ahead of the one being transcribed; bounds the memory held by decoded audio
+DEFAULT_PREFETCH_DEPTH = 2
+# Concurrent FFmpeg decodes feeding the prefetch queue
+DEFAULT_DECODE_WORKERS = 2
+
+
+def gpu_available():
+    """Check for CUDA, importing torch only when first asked"""
+    import torch
+    return torch.cuda.is_available()
+
+
+def select_device(use_gpu=None):
+    """Use CUDA only if it is both requested (default: when available) and available"""
+    available = gpu_available()
+    use_gpu = use_gpu if use_gpu is not None else available
+    return "cuda" if use_gpu and available else "cpu"
+
+
+def release_memory(device):
+    """Free audio and activation memory left behind by an aborted job; resident models stay cached"""
+    gc.collect()
+    if device == "cuda":
+        import torch
+        torch.cuda.empty_cache()
+
+
+def model_dtype(device, int8=False):
+    """Weight type to run with: int8 only applies on the CPU, where it has kernels"""
+    return "int8" if int8 and device == "cpu" else "float32"
+
+
+def load_model(model_name, device, dtype="float32"):
+    """Return (model, load_time, was_cached) using the process-wide model cache"""
+    start_time = time.time()
+    with stage("load"):
+        model, was_cached = get_model_cache().get(model_name, device, dtype)
+    # Encoder and decoder passes show up as stages in the job metrics
+    instrument_model(model)
+    return model, time.time() - start_time, was_cached
+
+
+def check_model_exists(model_name):
+    """Check if the model already exists in the cache directory"""
+    if os.path.isfile(model_name) or mmap_checkpoint_exists(model_name):
+        return True
+    # Get the cache directory path for whisper models
+    cache_dir = pathlib.Path.home() / '.cache' / 'whisper'
+    # Model filename follows pattern: <model_name>.pt
+    return (cache_dir / f"{model_name}.pt").exists()
+
+
+def decode_audio(audio_file, group=None):
+    """Stream the file through FFmpeg into a float32 numpy array, or None to let Whisper load it"""
+    try:
+        # Check if FFmpeg is available
+        if not ffmpeg_available():
+            print("Warning: FFmpeg not found in PATH, will rely on Whisper's internal audio loading")
+            return None  # Let whisper handle it
+        
+        # Decode block by block into a preallocated buffer instead of buffering all of stdout
+        print("Running FFmpeg command to load audio data")
+        with stage("decode"):
+            audio_data = load_audio(audio_file, group=group)
+        print(f"Successfully loaded audio data: {len(audio_data)} samples")
+        metrics = current_metrics()
+        if metrics is not None:
+            metrics.audio_seconds = len(audio_data) / SAMPLE_RATE
+        return audio_data
+    except Exception as e:
+        print(f"Error in custom audio loader: {e}")
+        return None  # Let whisper handle it
+
+
+# Transcribe options that only change what is printed, not the result
+DISPLAY_OPTIONS = ("verbose",)
+
+
+def _cache_options(format_options, long_form, vad=False, batched=False, dtype="float32"):
+    """Transcribe options that identify a cached result"""
+    options = {name: value for name, value in (format_options or {}).items() if name not in DISPLAY_OPTIONS}
+    if dtype != "float32":
+        options['dtype'] = dtype
+    if long_form:
+        options['long_form'] = True
+    if vad:
+        options['vad'] = True
+    if batched:
+        options['batched'] = True
+    return options
+
+
+def lookup_cached_result(audio_file, model_name, format_options=None, long_form=False, vad=False, batched=False,
+                         dtype="float32"):
+    """Return a previously stored result for this audio, model and options, or None"""
+    if not os.path.exists(audio_file):
+        return None
+    result = get_result_cache().get(audio_file, model_name,
+                                    _cache_options(format_options, long_form, vad, batched, dtype))
+    if result is not None:
+        print(f"Result cache hit for {audio_file}")
+    return result
+
+
+def _word_cache_options(result, dtype):
+    options = {'word_alignment': transcript_digest(result)}
+    if dtype != "float32":
+        options['dtype'] = dtype
+    return options
+
+
+def cached_words(audio_file, result, model_name, dtype="float32"):
+    """Fill in word timings stored by earlier align_words calls for this transcript; returns result"""
+    if not unaligned_segments(result) or not os.path.exists(audio_file):
+        return result
+    stored = get_result_cache().get(audio_file, model_name, _word_cache_options(result, dtype)) or {}
+    for index, segment in enumerate(result.get('segments', [])):
+        if 'words' not in segment and str(index) in stored:
+            segment['words'] = stored[str(index)]
+    return result
+
+
+def align_words(model, audio_file, result, model_name, start=None, end=None, audio_data=None, use_cache=True,
+                dtype="float32"):
+    """Add word timings to the result's segments between start and end seconds (None: to that end of the file).
+
+    Word alignment is a separate pass over a finished segment-level result, so
+    it is only paid for when word timings are shown or saved, and only for the
+    requested range. Segments that already have words are skipped, and new
+    alignments are stored in the result cache against the transcript, so any
+    later request for the same range is free. Modifies and returns result.
+    """
+    if use_cache:
+        cached_words(audio_file, result, model_name, dtype)
+    indexes = unaligned_segments(result, start, end)
+    if not indexes:
+        return result
+
+    if audio_data is None:
+        audio_data = decode_audio(audio_file)
+    if audio_data is None:
+        import whisper
+        audio_data = whisper.load_audio(audio_file)
+    print(f"Aligning words for {len(indexes)} segments of {os.path.basename(audio_file)}")
+    # The alignment pass runs the encoder and decoder too; count all of it as "align"
+    with stage("align"), collect_metrics(None):
+        align_segments(model, audio_data, result, indexes)
+    if use_cache and os.path.exists(audio_file):
+        # Store every aligned segment, including ones aligned by earlier calls
+        stored = {str(index): segment['words'] for index, segment in enumerate(result['segments'])
+                  if 'words' in segment}
+        get_result_cache().put(audio_file, model_name, _word_cache_options(result, dtype), stored)
+    return result
+
+
+def transcribe_file(model, audio_file, model_name, device="cpu", format_options=None, long_form=False,
+                    use_cache=True, progress_callback=None, vad=False, audio_data=None, dtype="float32",
+                    segment_callback=None):
+    """Decode and transcribe one file with an already loaded model and return the result dict.
+
+    This is the load -> decode -> (VAD) -> transcribe pipeline shared by the
+    GUI workers and the headless command line. Results are stored in the
+    result cache unless use_cache is False. progress_callback(processed_seconds,
+    total_seconds) follows the decoder through the audio. With vad, only the
+    detected speech is transcribed and result['vad'] reports how much was skipped.
+    audio_data may hold audio already decoded by prefetch_audio. dtype
+    names the model's weight type ("int8" for a quantized CPU model).
+    segment_callback(segments) receives each decoded window's segments as
+    they are produced, on the original timeline; long-form chunks run in
+    worker processes and only appear in the returned result.
+    """
+    format_options = format_options or {}
+
+    # Double check that file exists before transcribing
+    if not os.path.exists(audio_file):
+        raise FileNotFoundError(f"File not found: {audio_file}")
+
+    result = _run_transcription(model, audio_file, model_name, device, format_options, long_form,
+                                progress_callback, vad, audio_data, dtype, segment_callback)
+    if use_cache:
+        get_result_cache().put(audio_file, model_name, _cache_options(format_options, long_form, vad, dtype=dtype),
+                               result)
+    return result
+
+
+def _run_transcription(model, audio_file, model_name, device, format_options, long_form, progress_callback,
+                       vad=False, audio_data=None, dtype="float32", segment_callback=None):
+    # Log what we're about to do
+    print(f"Using audio file path: {audio_file}")
+
+    # Try to pre-load the audio unless a prefetch stage already did
+    if audio_data is None:
+        audio_data = decode_audio(audio_file)
+    metrics = current_metrics()
+    if metrics is not None and audio_data is not None:
+        metrics.audio_seconds = len(audio_data) / SAMPLE_RATE
+
+    if vad and audio_data is not None:
+        # Drop silence and holds, transcribe only the speech, then restore the original timestamps
+        with stage("vad"):
+            spans = detect_speech(audio_data)
+        skipped = skipped_fraction(spans, len(audio_data))
+        print(f"Voice activity detection: {len(spans)} speech spans, skipping {skipped:.0%} of the audio")
+        speech_audio, timeline = compact_audio(audio_data, spans)
+        if len(speech_audio) == 0:
+            result = {'text': "", 'segments': [], 'language': None}
+        else:
+            def stream_remapped(segments):
+                # Stream copies moved onto the original timeline; the result itself is remapped below
+                copies = [dict(segment, words=[dict(word) for word in segment['words']])
+                          if 'words' in segment else dict(segment) for segment in segments]
+                segment_callback(remap_result({'segments': copies}, timeline)['segments'])
+            result = remap_result(_transcribe_audio(model, speech_audio, model_name, device, format_options,
+                                                    long_form, progress_callback, dtype=dtype,
+                                                    segment_callback=stream_remapped if segment_callback else None),
+                                  timeline)
+        result['vad'] = {
+            'skipped_fraction': skipped,
+            'speech_spans': [[start / SAMPLE_RATE, end / SAMPLE_RATE] for start, end in spans]
+        }
+        return result
+
+    if vad:
+        print("Voice activity detection needs FFmpeg-decoded audio; transcribing the whole file")
+    return _transcribe_audio(model, audio_data, model_name, device, format_options, long_form, progress_callback,
+                             audio_file, dtype, segment_callback)
+
+
+def _transcribe_audio(model, audio_data, model_name, device, format_options, long_form, progress_callback,
+                      audio_file=None, dtype="float32", segment_callback=None):
+    # Run the actual transcription
+    if (long_form and device == "cpu" and audio_data is not None
+            and len(audio_data) > 2 * DEFAULT_CHUNK_SECONDS * SAMPLE_RATE):
+        # Long CPU job: transcribe silence-separated chunks in parallel worker processes
+        print("Using parallel long-form transcription")
+        duration = len(audio_data) / SAMPLE_RATE
+        on_chunk_done = None
+        if progress_callback:
+            on_chunk_done = lambda done, total: progress_callback(duration * done / total, duration)
+        # The chunks run in worker processes, so only the total is timed
+        with stage("transcribe"):
+            return transcribe_long_form(audio_data, model_name, on_chunk_done=on_chunk_done, dtype=dtype,
+                                        **format_options)
+
+    if audio_data is None:
+        # Fall back to the standard approach if our custom loader failed
+        print("Falling back to Whisper's audio loading")
+        # Use pathlib for safer path handling
+        audio_path = pathlib.Path(audio_file).resolve()
+        print(f"Resolved path: {audio_path}")
+        audio_input = str(audio_path)  # Ensure it's a string
+    else:
+        # If we successfully loaded the audio, use it directly
+        print("Using pre-loaded audio data for transcription")
+        audio_input = audio_data
+
+    with decoder_progress(progress_callback, segment_callback), stage("transcribe"):
+        return model.transcribe(
+            audio_input,
+            fp16=(device == "cuda"),
+            **format_options  # Pass the format options to the transcribe method
+        )
+
+
+def prefetch_audio(audio_files, lookup=None, depth=DEFAULT_PREFETCH_DEPTH, workers=DEFAULT_DECODE_WORKERS,
+                   metrics=None):
+    """Decode upcoming files in background threads while the caller transcribes the current one.
+
+    Yields (index, audio_file, cached_result, audio_data, error) in queue
+    order. lookup(audio_file) may return a cached result, in which case the
+    file is not decoded. At most depth files are decoded ahead of the one
+    being consumed, which caps the memory held by the queue. audio_data is
+    None when FFmpeg could not decode the file and Whisper should load it.
+    metrics, if given, holds a JobMetrics per file that receives its decode time.
+    """
+    def produce(index):
+        audio_file = audio_files[index]
+        if not os.path.exists(audio_file):
+            return None, None, f"File not found: {audio_file}"
+        cached = lookup(audio_file) if lookup else None
+        if cached is not None:
+            return cached, None, None
+        with collect_metrics(metrics[index] if metrics else None):
+            return None, decode_audio(audio_file, decoders), None
+
+    # FFmpeg runs in its own process, so threads are enough to overlap it with inference
+    pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="audio-prefetch")
+    decoders = DecoderGroup()
+    try:
+        pending = {}
+        next_index = 0
+        for index, audio_file in enumerate(audio_files):
+            # Keep the window of decoded-or-decoding files bounded
+            while next_index < len(audio_files) and next_index <= index + depth:
+                pending[next_index] = pool.submit(produce, next_index)
+                next_index += 1
+            try:
+                cached, audio_data, error = pending.pop(index).result()
+            except Exception as e:
+                cached, audio_data, error = None, None, str(e)
+            yield index, audio_file, cached, audio_data, error
+    finally:
+        # A consumer that stops early (cancel, error) must not wait for decodes it will never use
+        pool.shutdown(wait=False, cancel_futures=True)
+        decoders.stop()
+
+
+class BackgroundWriter:
+    """Format and write results on a separate thread so the model can start on the next file.
+
+    on_written(index, audio_file, result, output_files, error) runs on the
+    writer thread after each file. close() waits for every queued write.
+    Formatting and save times go into the JobMetrics passed to submit().
+    """
+
+    def __init__(self, on_written=None, max_pending=DEFAULT_PREFETCH_DEPTH):
+        self.on_written = on_written
+        self.pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="result-writer")
+        # Results waiting to be written also hold memory, so bound them too
+        self.slots = threading.BoundedSemaphore(max(1, max_pending))
+
+    def submit(self, index, audio_file, result, output_formats, output_dir=None, metrics=None):
+        self.slots.acquire()
+        self.pool.submit(self._write, index, audio_file, result, output_formats, output_dir, metrics)
+
+    def _write(self, index, audio_file, result, output_formats, output_dir, metrics=None):
+        output_files = []
+        error = None
+        try:
+            with collect_metrics(metrics):
+                # All formats of a file are written in one pass over its segments
+                output_files = write_results_next_to_source(result, audio_file, output_formats, output_dir)
+        except Exception as e:
+            error = str(e)
+        finally:
+            self.slots.release()
+        if self.on_written:
+            self.on_written(index, audio_file, result, output_files, error)
+
+    def close(self):
+        self.pool.shutdown(wait=True)
+
+
+def transcribe_files_batched(model, audio_files, model_name, device="cpu", format_options=None,
+                             batch_size=DEFAULT_BATCH_SIZE, use_cache=True, control=None, dtype="float32",
+                             metrics=None, file_started=None):
+    """Transcribe many short files by packing their 30-second windows into shared decoder batches.
+
+    Yields (index, audio_file, result, audio_data, error) as each file
+    completes, which is not necessarily queue order. audio_data is the
+    decoded audio, so word alignment need not decode the file again. Upcoming files are decoded by
+    prefetch_audio while the current batch runs, so memory stays bounded by
+    the batch plus the prefetch depth. control (a JobControl) is checked
+    before each file is queued and before every decoder step, so pausing
+    or cancelling takes effect within a batch. metrics (a JobMetrics per
+    file) receive decode times; the shared model passes are recorded in
+    the caller's current metrics.
+    file_started(index, audio_file), if given, is called as each file is
+    queued for decoding, before any of its windows are decoded.
+    """
+    format_options = format_options or {}
+    decoder = BatchDecoder(model, batch_size, fp16=(device == "cuda"), control=control, **format_options)
+
+    # The decoder's windows are views of this audio, so holding it until the file finishes costs nothing
+    decoded = {}
+
+    def finish(finished):
+        for index, result in finished:
+            audio_file = audio_files[index]
+            if use_cache:
+                get_result_cache().put(audio_file, model_name,
+                                       _cache_options(format_options, False, batched=True, dtype=dtype), result)
+            yield index, audio_file, result, decoded.pop(index), None
+
+    batch_metrics = current_metrics()
+    for index, audio_file, _, audio_data, error in prefetch_audio(audio_files, metrics=metrics):
+        if control:
+            control.check()
+        if file_started:
+            file_started(index, audio_file)
+        if error is None and audio_data is None:
+            error = f"Could not decode audio: {audio_file}"
+        if error:
+            yield index, audio_file, None, None, error
+            continue
+        if batch_metrics is not None:
+            batch_metrics.add_audio(len(audio_data) / SAMPLE_RATE)
+        decoded[index] = audio_data
+        yield from finish(decoder.add(index, audio_data))
+    yield from finish(decoder.flush())
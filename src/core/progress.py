@@ -0,0 +1,197 @@
+import importlib
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+import tqdm
+
+# Whisper advances its progress bar in mel frames of 10 ms
+SECONDS_PER_FRAME = 0.01
+
+_local = threading.local()
+_install_lock = threading.Lock()
+_installed = False
+# Set once whisper.transcribe turns out not to keep its segments where the shim looks for them
+_streaming_unavailable = False
+
+
+class TranscriptionCancelled(Exception):
+    """Raised from a progress callback to stop the transcription it reports on"""
+
+
+class JobControl:
+    """Cancel and pause flags that a running transcription polls at window boundaries.
+
+    The transcribing thread calls check() between units of work (each
+    30-second decoder window, long-form chunk or batched decoder step); it
+    blocks while paused and raises TranscriptionCancelled once cancel() was
+    called.
+    """
+
+    def __init__(self):
+        self._cancelled = threading.Event()
+        self._running = threading.Event()
+        self._running.set()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    @property
+    def paused(self):
+        return not self._running.is_set()
+
+    def cancel(self):
+        self._cancelled.set()
+        # Wake a paused job so it can notice the cancellation
+        self._running.set()
+
+    def pause(self):
+        if not self.cancelled:
+            self._running.clear()
+
+    def resume(self):
+        self._running.set()
+
+    def check(self):
+        self._running.wait()
+        if self._cancelled.is_set():
+            raise TranscriptionCancelled()
+
+
+class _DecoderProgressBar(tqdm.tqdm):
+    """tqdm replacement that forwards Whisper's decoding position to the calling thread's callbacks"""
+
+    def __init__(self, *args, **kwargs):
+        # Bind to the callbacks of the thread that started this transcription
+        self._callback = getattr(_local, 'callback', None)
+        self._segment_callback = getattr(_local, 'segment_callback', None)
+        self._segments_sent = 0
+        self._total_frames = kwargs.get('total') or 0
+        self._frames = 0
+        super().__init__(*args, **kwargs)
+
+    def _send_segments(self, frame):
+        global _streaming_unavailable
+        # whisper.transcribe updates the bar right after adding a window's segments to its all_segments list
+        segments = frame.f_locals.get('all_segments') if frame is not None else None
+        if not isinstance(segments, list):
+            # A whisper release that renamed the list or moved the update; without this the
+            # segments would just stop arriving early, with nothing to say why
+            self._segment_callback = None
+            if not _streaming_unavailable:
+                _streaming_unavailable = True
+                print("WARNING: Could not find the decoded segments in whisper.transcribe; "
+                      "segments will only be shown once each file is finished")
+            return
+        if len(segments) <= self._segments_sent:
+            return
+        new_segments = segments[self._segments_sent:]
+        self._segments_sent = len(segments)
+        try:
+            self._segment_callback(new_segments)
+        except Exception as e:
+            print(f"Error in segment callback: {e}")
+
+    def update(self, n=1):
+        if self._segment_callback is not None:
+            self._send_segments(sys._getframe(1))
+        if self._callback is not None and n:
+            self._frames = max(0, min(self._total_frames, self._frames + n))
+            try:
+                self._callback(self._frames * SECONDS_PER_FRAME, self._total_frames * SECONDS_PER_FRAME)
+            except TranscriptionCancelled:
+                raise
+            except Exception as e:
+                print(f"Error in progress callback: {e}")
+        return super().update(n)
+
+
+class _TqdmModule:
+    """Stands in for the tqdm module inside whisper.transcribe"""
+    tqdm = _DecoderProgressBar
+
+
+def _install():
+    global _installed
+    with _install_lock:
+        if not _installed:
+            importlib.import_module('whisper.transcribe').tqdm = _TqdmModule
+            _installed = True
+
+
+@contextmanager
+def decoder_progress(callback, segment_callback=None):
+    """Report Whisper's real decoding position while the block runs.
+
+    callback(processed_seconds, total_seconds) is called from the
+    transcribing thread each time Whisper moves its seek offset. It may
+    raise TranscriptionCancelled to abort the transcription.
+    segment_callback(segments) receives the segments of each decoded window
+    as soon as the window is done, before the rest of the file is decoded.
+    If the installed whisper does not expose them, a warning is printed and
+    they only arrive with the finished result.
+    """
+    _install()
+    previous = (getattr(_local, 'callback', None), getattr(_local, 'segment_callback', None))
+    _local.callback = callback
+    _local.segment_callback = segment_callback
+    try:
+        yield
+    finally:
+        _local.callback, _local.segment_callback = previous
+
+
+class ProgressEstimate:
+    """Speed and ETA derived from audio processed against wall-clock time"""
+
+    def __init__(self, start_time=None):
+        self.start_time = start_time if start_time is not None else time.time()
+        self.processed_seconds = 0.0
+        self.total_seconds = 0.0
+
+    def update(self, processed_seconds, total_seconds):
+        self.processed_seconds = processed_seconds
+        self.total_seconds = total_seconds
+
+    @property
+    def elapsed(self):
+        return time.time() - self.start_time
+
+    @property
+    def fraction(self):
+        if self.total_seconds <= 0:
+            return 0.0
+        return min(1.0, self.processed_seconds / self.total_seconds)
+
+    @property
+    def real_time_factor(self):
+        """Processing time per second of audio (below 1.0 is faster than real time)"""
+        if self.processed_seconds <= 0:
+            return None
+        return self.elapsed / self.processed_seconds
+
+    @property
+    def eta(self):
+        """Seconds remaining at the speed measured so far"""
+        rtf = self.real_time_factor
+        if rtf is None:
+            return None
+        return max(0.0, (self.total_seconds - self.processed_seconds) * rtf)
+
+    def describe(self):
+        rtf = self.real_time_factor
+        if rtf is None:
+            return f"{int(self.fraction * 100)}%"
+        return f"{int(self.fraction * 100)}% | RTF {rtf:.2f} | ETA {format_duration(self.eta)}"
+
+
+def format_duration(seconds):
+    """Format a duration in seconds as e.g. 1h02m, 3m05s or 42s"""
+    seconds = int(round(seconds))
+    if seconds >= 3600:
+        return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m{seconds % 60:02d}s"
+    return f"{seconds}s"
@@ -0,0 +1,98 @@
+import os
+import warnings
+
+from .checkpoints import _meta_construction, _set_tensor, cache_file_path
+
+# Quantized weights are saved here so quantization only happens once per model and torch version
+QUANTIZED_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "whisper-transcriber", "quantized")
+QUANTIZED_FORMAT_VERSION = 2
+
+
+def quantized_cache_path(model_name, cache_dir=None):
+    """Disk location of the int8 version of a model name or checkpoint path"""
+    import torch
+    # Packed int8 weights are only readable by the torch version that wrote them
+    return cache_file_path(model_name, "int8", cache_dir or QUANTIZED_CACHE_DIR,
+                           f"v{QUANTIZED_FORMAT_VERSION}|{torch.__version__}")
+
+
+def quantize_model(model):
+    """Apply dynamic int8 quantization to the Linear layers of a CPU float32 Whisper model (in place)"""
+    import torch
+    from whisper.model import Linear
+    # Whisper's Linear only adds a dtype cast to forward, which is a no-op in float32 on CPU;
+    # quantize_dynamic matches exact types, so present those layers as plain nn.Linear
+    for module in model.modules():
+        if type(module) is Linear:
+            module.__class__ = torch.nn.Linear
+    with warnings.catch_warnings():
+        # Eager-mode quantization is deprecated upstream but remains the portable CPU int8 path
+        warnings.simplefilter("ignore", DeprecationWarning)
+        warnings.simplefilter("ignore", UserWarning)
+        return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+
+
+def save_quantized_model(model, path):
+    """Write a quantized Whisper model's weights (not the pickled module) to path"""
+    import torch
+    state = model.state_dict()
+    # Non-persistent buffers (causal mask, alignment heads) are not in the state dict
+    buffers = {name: tensor for name, tensor in model.named_buffers() if name not in state}
+    sparse = [name for name, tensor in buffers.items() if tensor.is_sparse]
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    torch.save({
+        'dims': dict(model.dims.__dict__),
+        'state_dict': state,
+        'buffers': {name: tensor.to_dense() for name, tensor in buffers.items()},
+        'sparse': sparse
+    }, temp_path)
+    os.replace(temp_path, path)
+
+
+def load_quantized_checkpoint(path):
+    """Rebuild a quantized Whisper model from weights written by save_quantized_model.
+
+    The file is read with weights_only, so it cannot run code. The model is
+    built on the meta device, its Linear layers are swapped for empty
+    dynamic int8 ones (the layout quantize_model produces) and every tensor
+    is then assigned from the file.
+    """
+    import torch
+    from whisper.model import ModelDimensions, Whisper
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", UserWarning)
+        checkpoint = torch.load(path, map_location="cpu", weights_only=True)
+    with _meta_construction():
+        model = Whisper(ModelDimensions(**checkpoint['dims']))
+    for name, module in list(model.named_modules()):
+        if isinstance(module, torch.nn.Linear):
+            parent, _, attribute = name.rpartition('.')
+            setattr(model.get_submodule(parent), attribute, torch.ao.nn.quantized.dynamic.Linear(
+                module.in_features, module.out_features, bias_=module.bias is not None, dtype=torch.qint8))
+    model.load_state_dict(checkpoint['state_dict'], assign=True)
+    for name, tensor in checkpoint['buffers'].items():
+        _set_tensor(model, name, tensor.to_sparse() if name in checkpoint['sparse'] else tensor)
+    missing = sorted(name for name, tensor in [*model.named_parameters(), *model.named_buffers()] if tensor.is_meta)
+    if missing:
+        raise ValueError(f"{path} is missing tensors: {', '.join(missing)}")
+    return model.eval()
+
+
+def load_quantized_model(model_name, cache_dir=None):
+    """Return an int8 CPU model, quantizing and caching its weights on disk on first use"""
+    import whisper
+    path = quantized_cache_path(model_name, cache_dir)
+    if os.path.exists(path):
+        try:
+            return load_quantized_checkpoint(path)
+        except Exception as e:
+            print(f"Ignoring unreadable quantized model {path}: {e}")
+
+    model = quantize_model(whisper.load_model(model_name, device="cpu"))
+    try:
+        save_quantized_model(model, path)
+        print(f"Saved quantized {model_name} model to {path}")
+    except OSError as e:
+        print(f"Could not cache quantized model: {e}")
+    return model
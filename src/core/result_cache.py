@@ -0,0 +1,176 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+
+# Default size limit of the on-disk result cache, overridable with WHISPER_RESULT_CACHE_MB
+DEFAULT_RESULT_CACHE_MB = 512
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "whisper-transcriber", "results")
+
+# Bytes hashed per read when fingerprinting a file
+HASH_BLOCK_SIZE = 1024 * 1024
+# Path/mtime aliases kept before the oldest are pruned
+MAX_ALIASES = 10000
+
+
+def file_digest(audio_file):
+    """Hash the raw bytes of a file"""
+    digest = hashlib.blake2b(digest_size=20)
+    with open(audio_file, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """Persistent content-addressed cache of raw transcription results.
+
+    Entries are keyed by a hash of the audio file's bytes, the model name and
+    the transcribe options, and stored as gzip-compressed compact JSON. A
+    (path, size, mtime) alias avoids rehashing files that have not changed.
+    Entry mtimes track last use, and the least recently used entries are
+    removed once the cache grows past its size limit.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_size_mb=None):
+        self.cache_dir = cache_dir
+        if max_size_mb is None:
+            try:
+                max_size_mb = int(os.environ.get("WHISPER_RESULT_CACHE_MB", DEFAULT_RESULT_CACHE_MB))
+            except ValueError:
+                max_size_mb = DEFAULT_RESULT_CACHE_MB
+        self.max_size_mb = max_size_mb
+        self._lock = threading.Lock()
+
+    def _entries_dir(self):
+        return os.path.join(self.cache_dir, "entries")
+
+    def _aliases_dir(self):
+        return os.path.join(self.cache_dir, "aliases")
+
+    def content_digest(self, audio_file):
+        """Hash of the file contents, reusing the last hash if path, size and mtime are unchanged"""
+        stat = os.stat(audio_file)
+        alias_key = hashlib.blake2b(
+            f"{os.path.abspath(audio_file)}|{stat.st_size}|{stat.st_mtime_ns}".encode('utf-8'),
+            digest_size=20
+        ).hexdigest()
+        alias_path = os.path.join(self._aliases_dir(), alias_key)
+        try:
+            with open(alias_path, 'r', encoding='ascii') as f:
+                return f.read().strip()
+        except OSError:
+            pass
+
+        digest = file_digest(audio_file)
+        try:
+            os.makedirs(self._aliases_dir(), exist_ok=True)
+            with open(alias_path, 'w', encoding='ascii') as f:
+                f.write(digest)
+        except OSError as e:
+            print(f"Could not write result cache alias: {e}")
+        return digest
+
+    def key(self, audio_file, model_name, format_options=None):
+        options = json.dumps(format_options or {}, sort_keys=True)
+        material = f"{self.content_digest(audio_file)}|{model_name}|{options}"
+        return hashlib.blake2b(material.encode('utf-8'), digest_size=20).hexdigest()
+
+    def _entry_path(self, key):
+        return os.path.join(self._entries_dir(), f"{key}.json.gz")
+
+    def get(self, audio_file, model_name, format_options=None):
+        """Return the cached result dict, or None on a miss"""
+        try:
+            path = self._entry_path(self.key(audio_file, model_name, format_options))
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                result = json.load(f)
+            os.utime(path)  # Mark as recently used
+            return result
+        except (OSError, ValueError):
+            return None
+
+    def put(self, audio_file, model_name, format_options, result):
+        """Store a result and evict old entries if the cache is over its size limit"""
+        try:
+            path = self._entry_path(self.key(audio_file, model_name, format_options))
+            os.makedirs(self._entries_dir(), exist_ok=True)
+            # Write to a temporary file first so readers never see a partial entry
+            temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            try:
+                with gzip.open(temp_path, 'wt', encoding='utf-8', compresslevel=6) as f:
+                    json.dump(result, f, separators=(',', ':'), ensure_ascii=False)
+                os.replace(temp_path, path)
+            finally:
+                # Left behind only when writing failed part way
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+        except (OSError, TypeError, ValueError) as e:
+            print(f"Could not store result in cache: {e}")
+            return
+        self.evict()
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits in max_size_mb"""
+        with self._lock:
+            try:
+                entries = []
+                with os.scandir(self._entries_dir()) as it:
+                    for entry in it:
+                        if entry.is_file():
+                            stat = entry.stat()
+                            entries.append((stat.st_mtime, stat.st_size, entry.path))
+            except OSError:
+                return
+
+            total = sum(size for _, size, _ in entries)
+            limit = self.max_size_mb * 1024 * 1024
+            for _, size, path in sorted(entries):
+                if total <= limit:
+                    break
+                try:
+                    os.remove(path)
+                    total -= size
+                except OSError:
+                    pass
+
+            self._prune_aliases()
+
+    def _prune_aliases(self):
+        # Aliases are tiny, but one is written per distinct file version seen
+        try:
+            aliases = [entry.path for entry in os.scandir(self._aliases_dir())]
+        except OSError:
+            return
+        if len(aliases) <= MAX_ALIASES:
+            return
+        aliases.sort(key=lambda path: os.path.getmtime(path) if os.path.exists(path) else 0)
+        for path in aliases[:len(aliases) - MAX_ALIASES // 2]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def clear(self):
+        for directory in (self._entries_dir(), self._aliases_dir()):
+            if not os.path.isdir(directory):
+                continue
+            for name in os.listdir(directory):
+                try:
+                    os.remove(os.path.join(directory, name))
+                except OSError:
+                    pass
+
+
+_result_cache = None
+_result_cache_lock = threading.Lock()
+
+
+def get_result_cache():
+    """Return the process-wide result cache, creating it on first use"""
+    global _result_cache
+    with _result_cache_lock:
+        if _result_cache is None:
+            _result_cache = ResultCache()
+        return _result_cache
@@ -0,0 +1,303 @@
+import hmac
+import itertools
+import json
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .client import (
+    DEFAULT_SERVICE_HOST, DEFAULT_SERVICE_PORT, TOKEN_HEADER,
+    QUEUED, RUNNING, DONE, FAILED, CANCELLED, FINISHED_STATES
+)
+from .model_cache import get_model_cache
+from .alignment import unaligned_segments
+from .transcript import Transcript, as_dict
+from .pipeline import (
+    select_device, model_dtype, load_model, transcribe_file, lookup_cached_result, release_memory, align_words,
+    cached_words, decode_audio
+)
+from .instrumentation import JobMetrics, collect_metrics
+from .progress import ProgressEstimate, TranscriptionCancelled, JobControl
+
+# Finished jobs kept for status and result requests before the oldest are dropped
+MAX_FINISHED_JOBS = 200
+
+
+class Job:
+    def __init__(self, job_id, request):
+        self.id = job_id
+        self.audio_file = request['audio_file']
+        self.model_name = request.get('model') or "tiny"
+        self.format_options = request.get('format_options') or {}
+        self.use_gpu = request.get('use_gpu')
+        self.long_form = bool(request.get('long_form'))
+        self.vad = bool(request.get('vad'))
+        self.use_cache = request.get('use_cache', True)
+        self.int8 = bool(request.get('int8'))
+        self.align_words = bool(request.get('align_words'))
+        self.state = QUEUED
+        self.progress = 0
+        self.message = "Queued"
+        self.error = None
+        self.result = None
+        self.control = JobControl()
+        self.device = None
+        self.metrics = None
+        self.submitted = time.time()
+        self.finished = None
+
+    def status(self):
+        return {
+            'id': self.id,
+            'state': self.state,
+            'audio_file': self.audio_file,
+            'model': self.model_name,
+            'progress': self.progress,
+            'message': self.message,
+            'error': self.error,
+            'submitted': self.submitted,
+            'finished': self.finished,
+            'metrics': self.metrics.to_dict() if self.metrics and self.finished else None
+        }
+
+
+class TranscriptionService:
+    """Run submitted jobs one at a time on a worker thread, keeping models resident between jobs.
+
+    Several GUI instances and scripts can share one warm model through the
+    HTTP API in make_server() instead of each loading their own.
+    """
+
+    def __init__(self, metrics_log=None):
+        self.metrics_log = metrics_log  # MetricsLog receiving every finished job
+        self.jobs = OrderedDict()
+        self.lock = threading.Lock()
+        self.pending = queue.Queue()
+        self.ids = itertools.count(1)
+        self.worker = threading.Thread(target=self._run, name="transcription-service", daemon=True)
+        self.worker.start()
+
+    def submit(self, request):
+        audio_file = request.get('audio_file')
+        if not audio_file or not os.path.isabs(audio_file):
+            raise ValueError("audio_file must be an absolute path")
+        if not os.path.exists(audio_file):
+            raise ValueError(f"File not found: {audio_file}")
+        with self.lock:
+            job = Job(str(next(self.ids)), request)
+            self.jobs[job.id] = job
+            self._forget_old_jobs()
+        self.pending.put(job.id)
+        return job
+
+    def get(self, job_id):
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def cancel(self, job_id):
+        """Cancel a queued job at once; a running one stops at its next progress update"""
+        job = self.get(job_id)
+        if job is None:
+            return None
+        with self.lock:
+            if job.state in FINISHED_STATES:
+                return job
+            job.control.cancel()
+            # Decided under the lock so a worker cannot start the job in between
+            queued = job.state == QUEUED
+            if queued:
+                job.state = CANCELLED
+        if queued:
+            self._finish(job, CANCELLED, message="Cancelled")
+        return job
+
+    def health(self):
+        with self.lock:
+            states = [job.state for job in self.jobs.values()]
+        return {
+            'status': "ok",
+            'models': [list(key) for key in get_model_cache().resident_models()],
+            'queued': states.count(QUEUED),
+            'running': states.count(RUNNING)
+        }
+
+    def _forget_old_jobs(self):
+        finished = [job_id for job_id, job in self.jobs.items() if job.state in FINISHED_STATES]
+        for job_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self.jobs[job_id]
+
+    def _finish(self, job, state, message=None, error=None, result=None):
+        job.state = state
+        job.message = message or state.capitalize()
+        job.error = error
+        # Finished results are kept until the job is dropped, so hold them in columns
+        job.result = Transcript.from_result(result)
+        if job.metrics is not None:
+            job.metrics.finish(error)
+            if self.metrics_log:
+                self.metrics_log.write(job.metrics)
+        job.finished = time.time()
+
+    def _run(self):
+        while True:
+            job = self.get(self.pending.get())
+            if job is None:
+                continue  # Forgotten while waiting
+            with self.lock:
+                started = job.state == QUEUED
+                if started:
+                    job.state = RUNNING
+            if not started:
+                continue  # Cancelled while waiting
+            job.metrics = JobMetrics(job.audio_file, job.model_name)
+            try:
+                with collect_metrics(job.metrics):
+                    result = self._transcribe(job)
+            except TranscriptionCancelled:
+                self._finish(job, CANCELLED, message="Cancelled")
+                release_memory(job.device)
+            except Exception as e:
+                print(f"Service job {job.id} failed: {e}")
+                self._finish(job, FAILED, error=str(e))
+            else:
+                job.progress = 100
+                self._finish(job, DONE, message="Transcription completed", result=result)
+
+    def _transcribe(self, job):
+        device = job.device = job.metrics.device = select_device(job.use_gpu)
+        dtype = job.metrics.dtype = model_dtype(device, job.int8)
+        result = None
+        if job.use_cache:
+            result = lookup_cached_result(job.audio_file, job.model_name, job.format_options, job.long_form, job.vad,
+                                          dtype=dtype)
+            if result is not None:
+                job.metrics.cached = True
+                if not job.align_words or not unaligned_segments(cached_words(job.audio_file, result,
+                                                                                job.model_name, dtype)):
+                    return result
+
+        job.message = f"Loading {job.model_name} model on {device}"
+        model, _, _ = load_model(job.model_name, device, dtype)
+        audio_data = None  # Decoded once and shared with word alignment
+        if result is None:
+            estimate = ProgressEstimate()
+
+            def progress(processed_seconds, total_seconds):
+                job.control.check()
+                estimate.update(processed_seconds, total_seconds)
+                job.progress = int(estimate.fraction * 100)
+                job.message = f"Transcribing... {estimate.describe()}"
+
+            job.message = "Transcribing..."
+            audio_data = decode_audio(job.audio_file)
+            result = transcribe_file(
+                model,
+                job.audio_file,
+                job.model_name,
+                device=device,
+                format_options=job.format_options,
+                long_form=job.long_form,
+                use_cache=job.use_cache,
+                progress_callback=progress,
+                vad=job.vad,
+                audio_data=audio_data,
+                dtype=dtype
+            )
+        if job.align_words:
+            job.control.check()
+            job.message = "Aligning word timestamps..."
+            align_words(model, job.audio_file, result, job.model_name, audio_data=audio_data, use_cache=job.use_cache,
+                        dtype=dtype)
+        return result
+
+
+class ServiceRequestHandler(BaseHTTPRequestHandler):
+    """JSON API: POST /jobs, GET /jobs/<id>, GET /jobs/<id>/result, POST /jobs/<id>/cancel, GET /health"""
+
+    def _send(self, status, body):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _authorized(self):
+        sent = self.headers.get(TOKEN_HEADER) or ""
+        if not hmac.compare_digest(sent.encode('utf-8'), self.server.token.encode('utf-8')):
+            self._send(401, {'error': "Missing or wrong service token"})
+            return False
+        return True
+
+    def _job(self, job_id):
+        job = self.server.service.get(job_id)
+        if job is None:
+            self._send(404, {'error': f"Unknown job {job_id}"})
+        return job
+
+    def do_GET(self):
+        if not self._authorized():
+            return
+        parts = self.path.strip('/').split('/')
+        if parts == ["health"]:
+            self._send(200, self.server.service.health())
+        elif len(parts) == 2 and parts[0] == "jobs":
+            job = self._job(parts[1])
+            if job:
+                self._send(200, job.status())
+        elif len(parts) == 3 and parts[0] == "jobs" and parts[2] == "result":
+            job = self._job(parts[1])
+            if job and job.state == DONE:
+                self._send(200, as_dict(job.result))
+            elif job:
+                self._send(409, {'error': f"Job {job.id} is {job.state}"})
+        else:
+            self._send(404, {'error': f"Unknown path {self.path}"})
+
+    def do_POST(self):
+        if not self._authorized():
+            return
+        # Browsers only send cross-site POSTs without a CORS preflight for form content types
+        if self.headers.get_content_type() != "application/json":
+            self._send(415, {'error': "Requests must be application/json"})
+            return
+        parts = self.path.strip('/').split('/')
+        if parts == ["jobs"]:
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(length).decode('utf-8') or "{}")
+                job = self.server.service.submit(request)
+            except ValueError as e:
+                self._send(400, {'error': str(e)})
+                return
+            self._send(202, job.status())
+        elif len(parts) == 3 and parts[0] == "jobs" and parts[2] == "cancel":
+            job = self.server.service.cancel(parts[1])
+            if job is None:
+                self._send(404, {'error': f"Unknown job {parts[1]}"})
+            else:
+                self._send(200, job.status())
+        else:
+            self._send(404, {'error': f"Unknown path {self.path}"})
+
+    def log_message(self, format, *args):
+        # Status polling would flood the terminal; only log job submissions and errors
+        if self.command == "POST" or (len(args) > 1 and not str(args[1]).startswith("2")):
+            super().log_message(format, *args)
+
+
+def make_server(service=None, host=DEFAULT_SERVICE_HOST, port=DEFAULT_SERVICE_PORT, token=None):
+    """Create (but do not start) the HTTP server for a TranscriptionService.
+
+    Jobs read any file the service can, so every request must carry token.
+    """
+    if not token:
+        raise ValueError("The transcription service needs a token")
+    server = ThreadingHTTPServer((host, port), ServiceRequestHandler)
+    server.daemon_threads = True
+    server.service = service or TranscriptionService()
+    server.token = token
+    return server
@@ -0,0 +1,223 @@
+from collections.abc import Mapping, Sequence
+
+import numpy as np
+
+# Per-segment fields of a Whisper result stored as columns, with their dtypes.
+# Floats stay float64 so values read back (and JSON output) are exactly Whisper's.
+SEGMENT_COLUMNS = {
+    'id': np.int32,
+    'seek': np.int32,
+    'start': np.float64,
+    'end': np.float64,
+    'temperature': np.float64,
+    'avg_logprob': np.float64,
+    'compression_ratio': np.float64,
+    'no_speech_prob': np.float64
+}
+WORD_COLUMNS = {
+    'start': np.float64,
+    'end': np.float64,
+    'probability': np.float64
+}
+
+
+def _text_buffer(texts):
+    """Join texts into one string and return it with the offsets of each piece"""
+    offsets = np.zeros(len(texts) + 1, dtype=np.int64)
+    np.cumsum([len(text) for text in texts], out=offsets[1:])
+    return "".join(texts), offsets
+
+
+def _column(values, dtype):
+    """Column of values, or None when a field is missing from any segment"""
+    if any(value is None for value in values):
+        return None
+    if values and all(type(value) is int for value in values):
+        # e.g. temperature=0 passed as an int: read back as an int like the original
+        dtype = np.int64
+    return np.asarray(values, dtype=dtype)
+
+
+class Segment(Mapping):
+    """Read-only view of one segment of a Transcript, usable wherever a segment dict is read"""
+    __slots__ = ('transcript', 'row')
+
+    def __init__(self, transcript, row):
+        self.transcript = transcript
+        self.row = row
+
+    def __getitem__(self, key):
+        return self.transcript.segment_value(self.row, key)
+
+    def __iter__(self):
+        return iter(self.transcript.segment_keys(self.row))
+
+    def __len__(self):
+        return len(self.transcript.segment_keys(self.row))
+
+    def __repr__(self):
+        return f"Segment({dict(self)!r})"
+
+
+class SegmentList(Sequence):
+    """The segments of a Transcript as a sequence of Segment views"""
+    __slots__ = ('transcript',)
+
+    def __init__(self, transcript):
+        self.transcript = transcript
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [Segment(self.transcript, row) for row in range(len(self))[index]]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("segment index out of range")
+        return Segment(self.transcript, index)
+
+    def __len__(self):
+        return len(self.transcript.starts)
+
+
+class Transcript(Mapping):
+    """Transcription result held in NumPy columns instead of a dict per segment and word.
+
+    Segment timings and scores are arrays, tokens are one int32 array with
+    offsets, and segment and word texts are slices of one string buffer
+    each. Reading it like the result dict (result['segments'][i]['start'],
+    segment['words'], result.get('language')) builds the requested values on
+    demand, so the formatters work on it unchanged. to_dict() rebuilds the
+    legacy dict, which is only needed for JSON.
+    """
+
+    def __init__(self, result):
+        segments = result.get('segments', [])
+        self.text = result.get('text', "")
+        # The language and extras such as the VAD summary are small and kept as they are
+        self.extra = {key: value for key, value in result.items() if key not in ('text', 'segments')}
+
+        self.columns = {}
+        for key, dtype in SEGMENT_COLUMNS.items():
+            column = _column([segment.get(key) for segment in segments], dtype)
+            if column is not None:
+                self.columns[key] = column
+        self.starts = self.columns.get('start', np.zeros(len(segments)))
+        self.ends = self.columns.get('end', np.zeros(len(segments)))
+        self.texts, self.text_offsets = _text_buffer([segment['text'] for segment in segments])
+
+        self.has_tokens = all('tokens' in segment for segment in segments)
+        tokens = [segment['tokens'] for segment in segments] if self.has_tokens else []
+        self.token_offsets = np.zeros(len(tokens) + 1, dtype=np.int64)
+        np.cumsum([len(segment_tokens) for segment_tokens in tokens], out=self.token_offsets[1:])
+        self.tokens = np.fromiter((token for segment_tokens in tokens for token in segment_tokens),
+                                  dtype=np.int32, count=int(self.token_offsets[-1]))
+
+        # Segments without a 'words' key (not aligned) are told apart from ones with no words
+        self.has_words = np.array(['words' in segment for segment in segments], dtype=bool)
+        words = [segment.get('words') or [] for segment in segments]
+        self.word_offsets = np.zeros(len(words) + 1, dtype=np.int64)
+        np.cumsum([len(segment_words) for segment_words in words], out=self.word_offsets[1:])
+        flat_words = [word for segment_words in words for word in segment_words]
+        self.word_columns = {}
+        for key, dtype in WORD_COLUMNS.items():
+            column = _column([word.get(key) for word in flat_words], dtype)
+            if column is not None:
+                self.word_columns[key] = column
+        self.word_texts, self.word_text_offsets = _text_buffer([word['word'] for word in flat_words])
+
+        # Segment keys in Whisper's order, so JSON output is unchanged
+        stored = ['text'] + list(self.columns) + (['tokens'] if self.has_tokens else [])
+        order = list(segments[0]) if segments else []
+        self.segment_fields = sorted(stored, key=lambda key: order.index(key) if key in order else len(order))
+
+    @classmethod
+    def from_columns(cls, text, extra, segment_fields, columns, texts, text_offsets, tokens=None, token_offsets=None,
+                     has_words=None, word_offsets=None, word_columns=None, word_texts="", word_text_offsets=None):
+        """Transcript over existing arrays, e.g. read back from a binary transcript file"""
+        count = len(text_offsets) - 1
+        transcript = cls.__new__(cls)
+        transcript.text = text
+        transcript.extra = extra
+        transcript.segment_fields = list(segment_fields)
+        transcript.columns = columns
+        transcript.starts = columns.get('start', np.zeros(count))
+        transcript.ends = columns.get('end', np.zeros(count))
+        transcript.texts = texts
+        transcript.text_offsets = text_offsets
+        transcript.has_tokens = tokens is not None
+        transcript.tokens = tokens if tokens is not None else np.zeros(0, dtype=np.int32)
+        transcript.token_offsets = token_offsets if tokens is not None else np.zeros(1, dtype=np.int64)
+        transcript.has_words = has_words if has_words is not None else np.zeros(count, dtype=bool)
+        transcript.word_offsets = word_offsets if word_offsets is not None else np.zeros(count + 1, dtype=np.int64)
+        transcript.word_columns = word_columns or {}
+        transcript.word_texts = word_texts
+        transcript.word_text_offsets = (word_text_offsets if word_text_offsets is not None
+                                        else np.zeros(1, dtype=np.int64))
+        return transcript
+
+    @classmethod
+    def from_result(cls, result):
+        """Compact result, or result itself if it already is a Transcript or is not a result dict"""
+        if isinstance(result, Transcript) or not isinstance(result, dict):
+            return result
+        return cls(result)
+
+    @property
+    def nbytes(self):
+        """Approximate memory held by the columns and text buffers"""
+        arrays = [*self.columns.values(), *self.word_columns.values(), self.text_offsets, self.tokens,
+                  self.token_offsets, self.has_words, self.word_offsets, self.word_text_offsets]
+        return sum(array.nbytes for array in arrays) + len(self.texts) + len(self.word_texts)
+
+    def segment_keys(self, row):
+        return self.segment_fields + ['words'] if self.has_words[row] else self.segment_fields
+
+    def segment_text(self, row):
+        return self.texts[self.text_offsets[row]:self.text_offsets[row + 1]]
+
+    def segment_words(self, row):
+        words = []
+        for i in range(self.word_offsets[row], self.word_offsets[row + 1]):
+            word = {'word': self.word_texts[self.word_text_offsets[i]:self.word_text_offsets[i + 1]]}
+            for key, column in self.word_columns.items():
+                word[key] = column[i].item()
+            words.append(word)
+        return words
+
+    def segment_value(self, row, key):
+        if key == 'text':
+            return self.segment_text(row)
+        if key in self.columns:
+            return self.columns[key][row].item()
+        if key == 'tokens' and self.has_tokens:
+            return self.tokens[self.token_offsets[row]:self.token_offsets[row + 1]].tolist()
+        if key == 'words' and self.has_words[row]:
+            return self.segment_words(row)
+        raise KeyError(key)
+
+    def _fields(self):
+        return {'text': self.text, 'segments': SegmentList(self), **self.extra}
+
+    def __getitem__(self, key):
+        if key == 'text':
+            return self.text
+        if key == 'segments':
+            return SegmentList(self)
+        return self.extra[key]
+
+    def __iter__(self):
+        return iter(self._fields())
+
+    def __len__(self):
+        return len(self._fields())
+
+    def to_dict(self):
+        """The legacy result dict, with a dict per segment and word"""
+        result = self._fields()
+        result['segments'] = [dict(segment) for segment in result['segments']]
+        return result
+
+
+def as_dict(result):
+    """Plain result dict for JSON encoding, converting a Transcript if needed"""
+    return result.to_dict() if isinstance(result, Transcript) else result
@@ -0,0 +1,119 @@
+import numpy as np
+
+from .audio import SAMPLE_RATE
+
+# Analysis frame length for the energy and spectral features
+FRAME_SECONDS = 0.03
+# A frame is speech when its energy is this far above the estimated noise floor
+ENERGY_MARGIN_DB = 10.0
+# Frames quieter than this are never speech, even in a recording with no noise floor
+MIN_ENERGY_DB = -60.0
+# Broadband noise (hiss, hum-free static) has a flat spectrum; voiced speech does not
+MAX_SPECTRAL_FLATNESS = 0.45
+# Gaps shorter than this are bridged so words and short pauses stay together
+MIN_SILENCE_SECONDS = 0.8
+# Isolated bursts shorter than this (clicks, bumps) are dropped
+MIN_SPEECH_SECONDS = 0.25
+# Context kept either side of each speech span so word onsets are not clipped
+PADDING_SECONDS = 0.3
+# Frames analysed per pass, so the temporary spectra stay small however long the recording is
+CHUNK_FRAMES = 100_000
+
+
+def frame_features(audio, frame_samples, chunk_frames=CHUNK_FRAMES):
+    """Per-frame energy in dB and spectral flatness, computed chunk_frames frames at a time"""
+    frame_count = len(audio) // frame_samples
+    energy_db = np.empty(frame_count, dtype=np.float32)
+    flatness = np.empty(frame_count, dtype=np.float32)
+    window = np.hanning(frame_samples).astype(np.float32)
+    for first in range(0, frame_count, chunk_frames):
+        last = min(first + chunk_frames, frame_count)
+        frames = audio[first * frame_samples:last * frame_samples].reshape(last - first, frame_samples)
+        energy = np.einsum('ij,ij->i', frames, frames) / frame_samples
+        energy_db[first:last] = 10 * np.log10(energy + 1e-10)
+
+        # Spectral flatness: geometric over arithmetic mean of the power spectrum
+        power = np.abs(np.fft.rfft(frames * window, axis=1)) ** 2 + 1e-10
+        flatness[first:last] = np.exp(np.mean(np.log(power), axis=1)) / np.mean(power, axis=1)
+    return energy_db, flatness
+
+
+def _runs(mask):
+    """(start, end) index pairs of the True runs in a boolean array"""
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    return list(zip(np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)))
+
+
+def detect_speech(audio, frame_seconds=FRAME_SECONDS, min_silence_seconds=MIN_SILENCE_SECONDS,
+                  min_speech_seconds=MIN_SPEECH_SECONDS, padding_seconds=PADDING_SECONDS):
+    """Return (start, end) sample ranges of the speech in a 16 kHz mono float32 array"""
+    frame_samples = int(frame_seconds * SAMPLE_RATE)
+    energy_db, flatness = frame_features(audio, frame_samples)
+    if len(energy_db) == 0:
+        return []
+
+    # The quietest tenth of the recording approximates the noise floor and the
+    # loudest percent the speech level; staying below the latter keeps recordings
+    # without any pauses from being dropped entirely
+    noise_floor, speech_level = np.percentile(energy_db, [10, 99])
+    threshold = max(min(noise_floor + ENERGY_MARGIN_DB, speech_level - ENERGY_MARGIN_DB), MIN_ENERGY_DB)
+    speech = (energy_db > threshold) & (flatness < MAX_SPECTRAL_FLATNESS)
+
+    # Bridge short pauses, then drop bursts too short to be words
+    min_silence = int(min_silence_seconds / frame_seconds)
+    for start, end in _runs(~speech):
+        if start > 0 and end < len(speech) and end - start < min_silence:
+            speech[start:end] = True
+    min_speech = max(1, int(min_speech_seconds / frame_seconds))
+
+    padding = int(padding_seconds * SAMPLE_RATE)
+    spans = []
+    for start, end in _runs(speech):
+        if end - start < min_speech:
+            continue
+        start = max(0, int(start) * frame_samples - padding)
+        end = min(len(audio), int(end) * frame_samples + padding)
+        if spans and start <= spans[-1][1]:
+            # Padding made two spans touch; merge them
+            spans[-1] = (spans[-1][0], end)
+        else:
+            spans.append((start, end))
+    return spans
+
+
+def compact_audio(audio, spans):
+    """Concatenate the speech spans and return (audio, timeline) for remap_result"""
+    if not spans:
+        return np.zeros(0, dtype=audio.dtype), np.zeros((0, 2))
+    compact = np.concatenate([audio[start:end] for start, end in spans])
+    # For each span: where it starts in the compacted audio and in the original, in seconds
+    lengths = np.array([end - start for start, end in spans])
+    compact_starts = np.concatenate(([0], np.cumsum(lengths)[:-1])) / SAMPLE_RATE
+    original_starts = np.array([start for start, _ in spans]) / SAMPLE_RATE
+    return compact, np.stack([compact_starts, original_starts], axis=1)
+
+
+def _to_original(seconds, timeline, side='right'):
+    # An end time exactly on a join belongs to the span before it, a start time to the one after
+    index = max(0, int(np.searchsorted(timeline[:, 0], seconds, side=side)) - 1)
+    return float(seconds - timeline[index, 0] + timeline[index, 1])
+
+
+def remap_result(result, timeline):
+    """Move segment and word timestamps from the compacted audio back onto the original timeline"""
+    if len(timeline) == 0:
+        return result
+    for segment in result.get('segments', []):
+        segment['start'] = _to_original(segment['start'], timeline)
+        segment['end'] = _to_original(segment['end'], timeline, side='left')
+        for word in segment.get('words', []):
+            word['start'] = _to_original(word['start'], timeline)
+            word['end'] = _to_original(word['end'], timeline, side='left')
+    return result
+
+
+def skipped_fraction(spans, total_samples):
+    """Fraction of the audio that the speech spans leave out"""
+    if total_samples == 0:
+        return 0.0
+    return 1.0 - sum(end - start for start, end in spans) / total_samples
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""Local transcription service.
+
+Keeps Whisper models loaded and runs jobs submitted over a small HTTP API
+on 127.0.0.1, so several GUI windows and scripts share one warm model:
+
+    python -m src.daemon --port 8765 --preload base
+"""
+import argparse
+import os
+import sys
+
+# Make the core package importable whether run as a module or a script, as run.py does
+current_dir = os.path.dirname(os.path.abspath(__file__))
+if current_dir not in sys.path:
+    sys.path.insert(0, current_dir)
+
+from core.client import DEFAULT_SERVICE_HOST, DEFAULT_SERVICE_PORT, TOKEN_ENV, generate_token, write_token_file
+from core.instrumentation import MetricsLog
+from core.pipeline import select_device, load_model
+from core.service import TranscriptionService, make_server
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run the local Whisper transcription service.")
+    parser.add_argument("--port", type=int, default=DEFAULT_SERVICE_PORT, help="port to listen on")
+    parser.add_argument("--preload", action="append", default=[], metavar="MODEL",
+                        help="load this model at startup, may be repeated")
+    parser.add_argument("--device", choices=["auto", "cpu", "cuda"], default="auto",
+                        help="device for preloaded models")
+    parser.add_argument("--token", default=os.environ.get(TOKEN_ENV),
+                        help=f"token clients must send (default: ${TOKEN_ENV}, or a new random token)")
+    parser.add_argument("--metrics", metavar="FILE",
+                        help="append each job's stage timings, real-time factor and peak memory as JSON lines")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    device = select_device(None if args.device == "auto" else args.device == "cuda")
+    for model_name in args.preload:
+        _, load_time, _ = load_model(model_name, device)
+        print(f"Preloaded {model_name} on {device} in {load_time:.1f}s")
+
+    # Clients of this user read the token from the file; nobody else can
+    token = args.token or generate_token()
+    try:
+        token_file = write_token_file(token)
+    except OSError as e:
+        print(f"Could not write the service token file: {e}", file=sys.stderr)
+        return 1
+    print(f"Service token written to {token_file}")
+
+    service = TranscriptionService(MetricsLog(args.metrics) if args.metrics else None)
+    server = make_server(service, host=DEFAULT_SERVICE_HOST, port=args.port, token=token)
+    print(f"Transcription service listening on http://{DEFAULT_SERVICE_HOST}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("Shutting down")
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
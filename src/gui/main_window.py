@@ -2,24 +2,48 @@ from PyQt6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QPushButton,
     QComboBox, QFileDialog, QProgressBar, QTextEdit,
     QListWidget, QLabel, QMessageBox, QStatusBar,
-    QHBoxLayout, QGroupBox, QCheckBox
+    QHBoxLayout, QGroupBox, QCheckBox, QStackedWidget
 )
-from PyQt6.QtCore import Qt, QThread, pyqtSignal, QDir
-import whisper
+from PyQt6.QtCore import QThread, QTimer, pyqtSignal
+from PyQt6.QtGui import QTextCursor
 import os
 import warnings
-import torch
 import time
-import pathlib
-import threading
-import sys
-import json
-from datetime import timedelta
 import configparser
+from collections.abc import Mapping
+from core.model_cache import get_model_cache, DEFAULT_MEMORY_BUDGET_MB
+from core.longform import DEFAULT_CHUNK_SECONDS
+from core.result_cache import get_result_cache, DEFAULT_RESULT_CACHE_MB
+from core.progress import ProgressEstimate, format_duration, JobControl, TranscriptionCancelled
+from core.instrumentation import JobMetrics, MetricsLog, collect_metrics
+from core.hardware import get_hardware_info
+from core.pipeline import (
+    select_device, model_dtype, gpu_available, load_model, check_model_exists, transcribe_file, lookup_cached_result,
+    transcribe_files_batched, prefetch_audio, BackgroundWriter, release_memory, align_words, cached_words,
+    decode_audio
+)
+from core.alignment import unaligned_segments
+from core.transcript import Transcript, as_dict
+from core.batching import batching_supported
+from core.client import ServiceClient, ServiceError, FINISHED_STATES
+from core.formatters import (
+    TRANSCRIPTION_FORMATS, OUTPUT_EXTENSIONS, format_timestamp, format_result, output_format_for_path,
+    output_file_for, write_result_files
+)
+from .transcript_view import TranscriptModel, TranscriptView
 
 # Filter out specific Whisper warnings about Triton kernels
 warnings.filterwarnings("ignore", message="Failed to launch Triton kernels")
 
+# Save dialog filters and the output format each one saves; a typed extension of ours takes precedence
+SAVE_FILTERS = {f"{name} (*{OUTPUT_EXTENSIONS[fmt['output_format']]})": fmt['output_format']
+                for name, fmt in TRANSCRIPTION_FORMATS.items()}
+ALL_FORMATS_FILTER = "All formats, one file each (*)"
+# How long closing the window waits for a cancelled transcription before hiding instead
+CLOSE_WAIT_MS = 500
+# Word timings are aligned for the rows in view once scrolling has paused this long
+ALIGN_DELAY_MS = 200
+
 # App settings
 CONFIG_FILE = os.path.join(os.path.expanduser("~"), ".whisper_transcriber_settings.ini")
 
@@ -38,8 +62,18 @@ def save_settings(settings_dict):
 
 def load_settings():
     """Load application settings from config file"""
+    # GPU use is only honoured when CUDA turns out to be available, so default to on
+    # rather than importing torch here just to check
     default_settings = {
-        'use_gpu': 'True' if torch.cuda.is_available() else 'False'
+        'use_gpu': 'True',
+        'model_cache_mb': str(DEFAULT_MEMORY_BUDGET_MB),
+        'long_form': 'False',
+        'cpu_int8': 'False',
+        'vad': 'False',
+        'batch_size': '1',  # Windows decoded together across queued files; e.g. 8 batches short clips
+        'service_url': '',  # e.g. http://127.0.0.1:8765 to use a running transcription service
+        'metrics_log': '',  # JSON lines file receiving per-job stage timings; empty disables it
+        'result_cache_mb': str(DEFAULT_RESULT_CACHE_MB)
     }
     
     if not os.path.exists(CONFIG_FILE):
@@ -53,192 +87,40 @@ def load_settings():
         # Validate settings
         if 'use_gpu' not in settings:
             settings['use_gpu'] = default_settings['use_gpu']
+        if 'model_cache_mb' not in settings:
+            settings['model_cache_mb'] = default_settings['model_cache_mb']
+        if 'long_form' not in settings:
+            settings['long_form'] = default_settings['long_form']
+        if 'cpu_int8' not in settings:
+            settings['cpu_int8'] = default_settings['cpu_int8']
+        if 'vad' not in settings:
+            settings['vad'] = default_settings['vad']
+        if 'batch_size' not in settings:
+            settings['batch_size'] = default_settings['batch_size']
+        if 'service_url' not in settings:
+            settings['service_url'] = default_settings['service_url']
+        if 'metrics_log' not in settings:
+            settings['metrics_log'] = default_settings['metrics_log']
+        if 'result_cache_mb' not in settings:
+            settings['result_cache_mb'] = default_settings['result_cache_mb']
             
         return settings
     except Exception as e:
         print(f"Error loading settings: {e}")
         return default_settings
 
-# Dictionary of transcription format options
-TRANSCRIPTION_FORMATS = {
-    "Text Only": {
-        "description": "Simple text without timestamps or special formatting",
-        "options": {"word_timestamps": False, "verbose": False},
-        "output_format": "text"  # Plain text output
-    },
-    "SRT Subtitles": {
-        "description": "Standard subtitle format with timestamps",
-        "options": {"word_timestamps": False, "verbose": True},
-        "output_format": "srt"  # SRT format
-    },
-    "Word Timestamps": {
-        "description": "Text with timestamps for each word",
-        "options": {"word_timestamps": True, "verbose": False},
-        "output_format": "word_timestamps"  # Word-level timestamps
-    },
-    "JSON Output": {
-        "description": "Complete data in JSON format for developers",
-        "options": {"word_timestamps": True, "verbose": True},
-        "output_format": "json"  # Raw JSON output
-    },
-    "VTT Subtitles": {
-        "description": "WebVTT subtitle format for web videos",
-        "options": {"word_timestamps": False, "verbose": True},
-        "output_format": "vtt"  # VTT subtitle format
-    }
-}
-
-def format_timestamp(seconds, always_include_hours=False, decimal_marker='.'):
-    """Convert seconds to HH:MM:SS.MS format"""
-    hours = int(seconds / 3600)
-    seconds = seconds - (hours * 3600)
-    minutes = int(seconds / 60)
-    seconds = seconds - (minutes * 60)
-    
-    if always_include_hours or hours > 0:
-        return f"{hours:02d}:{minutes:02d}:{seconds:06.3f}".replace('.', decimal_marker)
-    else:
-        return f"{minutes:02d}:{seconds:06.3f}".replace('.', decimal_marker)
-
-def format_srt(segments):
-    """Format segments as SRT subtitle format"""
-    srt_content = ""
-    for i, segment in enumerate(segments, start=1):
-        # Format: sequential number, timestamp range, text content, blank line
-        start = format_timestamp(segment['start'], always_include_hours=True, decimal_marker=',')
-        end = format_timestamp(segment['end'], always_include_hours=True, decimal_marker=',')
-        srt_content += f"{i}\n{start} --> {end}\n{segment['text'].strip()}\n\n"
-    return srt_content
-
-def format_vtt(segments):
-    """Format segments as WebVTT subtitle format"""
-    vtt_content = "WEBVTT\n\n"
-    for i, segment in enumerate(segments, start=1):
-        start = format_timestamp(segment['start'], always_include_hours=True)
-        end = format_timestamp(segment['end'], always_include_hours=True)
-        vtt_content += f"{start} --> {end}\n{segment['text'].strip()}\n\n"
-    return vtt_content
-
-def format_word_timestamps(result):
-    """Format result with word-level timestamps"""
-    if not result.get('segments'):
-        return "No word timestamps available in results."
-    
-    formatted_text = ""
-    for segment in result['segments']:
-        if 'words' in segment:
-            for word in segment['words']:
-                timestamp = format_timestamp(word['start'])
-                formatted_text += f"[{timestamp}] {word['word']} "
-            formatted_text += "\n"
-        else:
-            # Fallback if word timestamps aren't available
-            start = format_timestamp(segment['start'])
-            formatted_text += f"[{start}] {segment['text'].strip()}\n"
-    
-    return formatted_text
-
 def get_cuda_details():
     """Get detailed CUDA capabilities information if available"""
+    # Shared, memoized probe - nvidia-smi and torch are only queried once per driver/torch version
+    hardware_info = get_hardware_info()
     cuda_info = {
-        'available': False,
-        'version': None,
-        'device_count': 0,
-        'device_name': None,
-        'compute_capability': None,
-        'memory_gb': None
+        'available': hardware_info['available'],
+        'version': hardware_info['version'],
+        'device_count': hardware_info['device_count'],
+        'device_name': hardware_info['device_name'],
+        'compute_capability': hardware_info['compute_capability'],
+        'memory_gb': hardware_info['memory_gb']
     }
-    
-    # Try to get CUDA info from PyTorch first
-    try:
-        cuda_info['available'] = torch.cuda.is_available()
-        
-        if cuda_info['available']:
-            cuda_info['device_count'] = torch.cuda.device_count()
-            
-            if cuda_info['device_count'] > 0:
-                cuda_info['device_name'] = torch.cuda.get_device_name(0)
-                
-                # Get compute capability and other detailed info
-                try:
-                    props = torch.cuda.get_device_properties(0)
-                    cuda_info['compute_capability'] = f"{props.major}.{props.minor}"
-                    cuda_info['memory_gb'] = round(props.total_memory / (1024**3), 1)
-                except Exception as e:
-                    print(f"Could not get detailed GPU properties from PyTorch: {e}")
-    except Exception as e:
-        print(f"Error getting CUDA information from PyTorch: {e}")
-    
-    # Try to get CUDA version using a simpler approach with nvidia-smi
-    try:
-        import subprocess
-        import re
-        import os
-        import shutil
-        
-        # Check if nvidia-smi is available using shutil.which
-        nvidia_smi_path = shutil.which("nvidia-smi")
-        if nvidia_smi_path:
-            print(f"Found nvidia-smi at: {nvidia_smi_path}")
-            
-            # First try a simple call with no arguments to verify it works
-            try:
-                result = subprocess.run([nvidia_smi_path], capture_output=True, text=True, timeout=5)
-                if result.returncode == 0:
-                    print("Basic nvidia-smi call succeeded")
-                    
-                    # Extract CUDA version from the direct output (which contains a header with the version)
-                    version_match = re.search(r"CUDA Version: (\d+\.\d+)", result.stdout)
-                    if version_match:
-                        cuda_info['version'] = version_match.group(1)
-                        print(f"Extracted CUDA version from nvidia-smi output: {cuda_info['version']}")
-                    else:
-                        # Fallback to the query approach if version not found in basic output
-                        try:
-                            # Try with explicit arguments
-                            query_result = subprocess.run(
-                                [nvidia_smi_path, "--query-gpu=cuda_version", "--format=csv,noheader"],
-                                capture_output=True, text=True, timeout=5
-                            )
-                            if query_result.returncode == 0 and query_result.stdout.strip():
-                                cuda_info['version'] = query_result.stdout.strip()
-                                print(f"Got CUDA version via query: {cuda_info['version']}")
-                        except Exception as e:
-                            print(f"Query attempt failed: {e}")
-                else:
-                    print(f"Basic nvidia-smi call failed with error: {result.stderr}")
-            except subprocess.TimeoutExpired:
-                print("nvidia-smi command timed out")
-            except Exception as e:
-                print(f"Error running basic nvidia-smi: {e}")
-        else:
-            print("nvidia-smi not found in PATH")
-            
-            # Try looking for it manually in common locations
-            possible_paths = [
-                os.path.join(os.environ.get('ProgramFiles', 'C:\\Program Files'), 'NVIDIA Corporation\\NVSMI\\nvidia-smi.exe'),
-                os.path.join(os.environ.get('ProgramW6432', 'C:\\Program Files'), 'NVIDIA Corporation\\NVSMI\\nvidia-smi.exe')
-            ]
-            
-            for possible_path in possible_paths:
-                if os.path.exists(possible_path):
-                    print(f"Found nvidia-smi at: {possible_path}")
-                    try:
-                        result = subprocess.run([possible_path], capture_output=True, text=True, timeout=5)
-                        if result.returncode == 0:
-                            print("nvidia-smi call succeeded")
-                            
-                            # Extract CUDA version from output
-                            version_match = re.search(r"CUDA Version: (\d+\.\d+)", result.stdout)
-                            if version_match:
-                                cuda_info['version'] = version_match.group(1)
-                                print(f"Extracted CUDA version from nvidia-smi output: {cuda_info['version']}")
-                                break
-                    except Exception as e:
-                        print(f"Error running nvidia-smi from {possible_path}: {e}")
-    except Exception as e:
-        print(f"Error in nvidia-smi detection: {e}")
-        
     print(f"CUDA detection summary: Available={cuda_info['available']}, Version={cuda_info['version']}, Device={cuda_info['device_name']}")
     return cuda_info
 
@@ -254,7 +136,7 @@ class TerminalProgressBar:
         self.last_update_time = 0
         self.update_interval = 0.1  # Update terminal every 0.1 seconds to avoid flickering
 
-    def update(self, current):
+    def update(self, current, suffix=""):
         # Limit terminal updates to avoid flickering
         current_time = time.time()
         if current_time - self.last_update_time < self.update_interval:
@@ -274,6 +156,9 @@ class TerminalProgressBar:
             
         if self.show_time:
             line += f" [{elapsed:.1f}s]"
+        
+        if suffix:
+            line += f" {suffix}"
             
         # Print the progress bar with carriage return to stay on the same line
         print(line, end='', flush=True)
@@ -287,6 +172,10 @@ class TranscriptionWorker(QThread):
     status_update = pyqtSignal(str)
     finished = pyqtSignal(object)  # Changed to return the complete result object
     error = pyqtSignal(str)
+    cancelled = pyqtSignal()
+    metrics_ready = pyqtSignal(dict)  # Stage timings, RTF and peak memory of each finished job
+    segments_ready = pyqtSignal(object)  # Segment-level result, sent before words are aligned
+    segments_decoded = pyqtSignal(list)  # Segments of each window as soon as it is decoded
 
     def __init__(self, model_name, audio_file, use_gpu=None, show_terminal_progress=True):
         super().__init__()
@@ -299,33 +188,150 @@ class TranscriptionWorker(QThread):
         print(f"File exists: {os.path.exists(self.audio_file)}")
         
         # Determine device to use based on user preference and availability
-        self.use_gpu = use_gpu if use_gpu is not None else torch.cuda.is_available()
-        self.gpu_available = torch.cuda.is_available()
+        self.gpu_available = gpu_available()
+        self.use_gpu = use_gpu if use_gpu is not None else self.gpu_available
         
         # Only use GPU if both requested and available
-        if self.use_gpu and self.gpu_available:
-            self.device = "cuda"
-        else:
-            self.device = "cpu"
+        self.device = select_device(self.use_gpu)
             
         self.is_running = True
         self.show_terminal_progress = show_terminal_progress
         self.terminal_progress_bar = None
         self.format_options = {}  # Initialize format options with default empty dict
         self.output_format = "text"  # Default output format
+        self.align_words = False  # Add word timings in a separate pass once the segments are ready
+        self.long_form = False  # Split long CPU jobs across worker processes
+        self.vad = False  # Transcribe only the detected speech
+        self.int8 = False  # Run a dynamically quantized model when on CPU
+        self.use_result_cache = True  # Reuse stored results for identical audio, model and options
+        self.control = JobControl()  # Cancel/pause, honoured at decoder window boundaries
+        self.supports_pause = True
+        self.metrics_log = None  # MetricsLog receiving each job's metrics as a JSON line
+
+    def cancel(self):
+        """Stop at the next window boundary; the worker then emits cancelled"""
+        self.control.cancel()
+        self.status_update.emit("Cancelling after the current window...")
+
+    def pause(self):
+        self.control.pause()
+        self.status_update.emit("Pausing after the current window...")
+
+    def resume(self):
+        self.control.resume()
+        self.status_update.emit("Resuming transcription...")
+
+    @property
+    def dtype(self):
+        """Weight type of the model this worker runs"""
+        return model_dtype(self.device, self.int8)
+
+    def new_metrics(self, audio_file, event="transcription"):
+        return JobMetrics(audio_file, self.model_name, self.device, self.dtype, event=event)
+
+    def report_metrics(self, metrics, error=None):
+        """Finish a job's metrics, log them if a metrics log is set and emit them"""
+        record = metrics.finish(error).to_dict()
+        if self.metrics_log:
+            self.metrics_log.write(record)
+        self.metrics_ready.emit(record)
 
     def check_model_exists(self):
         """Check if the model already exists in the cache directory"""
-        # Get the cache directory path for whisper models
-        home_dir = pathlib.Path.home()
-        cache_dir = home_dir / '.cache' / 'whisper'
-        # Model filename follows pattern: <model_name>.pt
-        model_path = cache_dir / f"{self.model_name}.pt"
-        return model_path.exists()
+        return check_model_exists(self.model_name)
+
+    def decoder_progress(self, estimate, processed_seconds, total_seconds):
+        """Turn Whisper's decoding position into progress, speed and ETA updates"""
+        # Called between decoder windows: block here while paused, raise here once cancelled
+        if self.control.paused:
+            self.status_update.emit("Paused")
+        self.control.check()
+        estimate.update(processed_seconds, total_seconds)
+        # Transcription covers the 50-95% span of the progress bar
+        progress_percent = 50 + int(estimate.fraction * 45)
+        self.report_progress(progress_percent)
+        self.status_update.emit(f"Transcribing... {estimate.describe()}")
+        
+        # Update terminal progress bar if enabled
+        if self.show_terminal_progress and self.terminal_progress_bar:
+            self.terminal_progress_bar.update(int(estimate.fraction * 100), suffix=estimate.describe())
+
+    def report_progress(self, percent):
+        """Emit transcription progress (0-100) for the current file"""
+        self.progress.emit(percent)
+
+    def stream_segments(self, segments):
+        """Hand a decoded window's segments to the UI while the rest of the file is transcribed"""
+        self.segments_decoded.emit([dict(segment) for segment in segments])
+
+    def cached_result(self):
+        """Return a stored result for the current file if one exists"""
+        if not self.use_result_cache:
+            return None
+        result = lookup_cached_result(self.audio_file, self.model_name, self.format_options, self.long_form,
+                                      self.vad, dtype=self.dtype)
+        if result is not None:
+            self.status_update.emit("Loaded previous transcription from cache")
+        return result
+
+    def load_model(self):
+        """Load the selected model through the process-wide cache"""
+        # Terminal output for initialization
+        if self.show_terminal_progress:
+            print("\n=== Whisper Transcriber ===")
+            print(f"Initializing {self.model_name} model...")
+        
+        # Reuse a resident model if a previous job already loaded it
+        model_cache = get_model_cache()
+        if model_cache.contains(self.model_name, self.device, self.dtype):
+            loading_msg = f"Using cached {self.model_name} model..."
+            self.status_update.emit(loading_msg)
+            if self.show_terminal_progress:
+                print(f"\n{loading_msg}")
+            self.report_progress(10)
+        elif not self.check_model_exists():
+            download_msg = f"Downloading {self.model_name} model (this may take a while)..."
+            self.status_update.emit(download_msg)
+            if self.show_terminal_progress:
+                print(f"\n{download_msg}")
+            self.report_progress(10)
+        elif self.dtype == "int8":
+            loading_msg = f"Loading quantized {self.model_name} model (the first use quantizes it)..."
+            self.status_update.emit(loading_msg)
+            if self.show_terminal_progress:
+                print(f"\n{loading_msg}")
+            self.report_progress(10)
+        else:
+            loading_msg = f"Loading {self.model_name} model..."
+            self.status_update.emit(loading_msg)
+            if self.show_terminal_progress:
+                print(f"\n{loading_msg}")
+            self.report_progress(10)
+        
+        # Load model through the process-wide cache - this will download it if not available
+        model, load_time, _ = load_model(self.model_name, self.device, self.dtype)
+        
+        loaded_msg = f"Model loaded in {load_time:.1f}s. Preparing audio..."
+        self.status_update.emit(loaded_msg)
+        if self.show_terminal_progress:
+            print(loaded_msg)
+        self.report_progress(30)
+        return model
 
-    def progress_monitor(self, start_time, estimated_duration):
-        """Run progress updates in the background"""
-        last_progress = 0
+    def transcribe_audio(self, model, audio_data=None):
+        """Transcribe self.audio_file with an already loaded model and return the result dict"""
+        # Audio loading indication
+        audio_msg = "Processing audio file..."
+        self.status_update.emit(audio_msg)
+        if self.show_terminal_progress:
+            print(audio_msg)
+        self.report_progress(40)
+        
+        begin_msg = "Beginning transcription..."
+        self.status_update.emit(begin_msg)
+        if self.show_terminal_progress:
+            print(begin_msg)
+        self.report_progress(50)
         
         # Create terminal progress bar if enabled
         if self.show_terminal_progress:
@@ -337,244 +343,602 @@ class TranscriptionWorker(QThread):
                 show_time=True
             )
             print(f"\nProcessing file: {os.path.basename(self.audio_file)}")
-            print(f"Model: {self.model_name} | Device: {self.device}")
+            print(f"Model: {self.model_name} ({self.dtype}) | Device: {self.device}")
+        
+        # Start the transcription; progress follows Whisper's seek position through the audio
+        start_time = time.time()
+        estimate = ProgressEstimate(start_time)
+        
+        try:
+            result = transcribe_file(
+                model,
+                self.audio_file,
+                self.model_name,
+                device=self.device,
+                format_options=self.format_options,
+                long_form=self.long_form,
+                use_cache=self.use_result_cache,
+                vad=self.vad,
+                audio_data=audio_data,
+                dtype=self.dtype,
+                progress_callback=lambda processed, total: self.decoder_progress(estimate, processed, total),
+                segment_callback=self.stream_segments
+            )
+        
+        except TranscriptionCancelled:
+            raise
+        except Exception as e:
+            print(f"ERROR: Transcription failed: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            raise RuntimeError(f"Transcription failed: {str(e)}") from e
+        
+        # Finalize
+        transcribe_time = time.time() - start_time
+        complete_msg = f"Transcription completed in {transcribe_time:.1f}s"
+        if estimate.total_seconds > 0:
+            # Measured real-time factor over the whole file
+            complete_msg += f" for {format_duration(estimate.total_seconds)} of audio (RTF {transcribe_time / estimate.total_seconds:.2f})"
+        if 'vad' in result:
+            complete_msg += f", {result['vad']['skipped_fraction']:.0%} silence skipped"
+        complete_msg += ". Finalizing..."
+        self.report_progress(95)
+        self.status_update.emit(complete_msg)
+        
+        # Update terminal with completion status
+        if self.show_terminal_progress:
+            if self.terminal_progress_bar:
+                self.terminal_progress_bar.update(100)  # Complete the progress bar
+            print(f"\n{complete_msg}")
             
-        while self.is_running and last_progress < 90:
-            elapsed = time.time() - start_time
-            # Map the elapsed time to a percentage between 50-90%
-            if elapsed < estimated_duration:
-                progress_percent = min(int(50 + (elapsed / estimated_duration) * 40), 90)
-                self.progress.emit(progress_percent)
-                est_percent = min(int((elapsed / estimated_duration) * 100), 99)
-                status_msg = f"Transcribing... (estimated {est_percent}% complete)"
-                self.status_update.emit(status_msg)
+            # If verbose mode, print some segments in the terminal
+            if self.format_options.get('verbose', False) and 'segments' in result:
+                print("\nSample output (first few segments):")
+                # Get up to 3 segments to display as samples
+                sample_segments = result['segments'][:3] if isinstance(result['segments'], list) else []
                 
-                # Update terminal progress bar if enabled
-                if self.show_terminal_progress and self.terminal_progress_bar:
-                    self.terminal_progress_bar.update(progress_percent)
+                for i, segment in enumerate(sample_segments):
+                    # Check if segment is a dictionary before attempting to access keys
+                    if isinstance(segment, Mapping):
+                        # Use safe dictionary access
+                        start = format_timestamp(segment.get('start', 0))
+                        end = format_timestamp(segment.get('end', 0))
+                        text = segment.get('text', '').strip()
+                        print(f"[{start} --> {end}]  {text}")
+                    elif isinstance(segment, str):
+                        # Handle case where segment is a string
+                        print(f"Segment {i+1}: {segment}")
+                    else:
+                        # Handle any other type
+                        print(f"Segment {i+1}: {str(segment)}")
+                print("...\n")
+            
+            # Safely get text length
+            text_length = 0
+            if isinstance(result, Mapping) and 'text' in result:
+                if isinstance(result['text'], str):
+                    text_length = len(result['text'])
                 
-                last_progress = progress_percent
-            time.sleep(0.5)  # Update every half second
+            print(f"Output length: {text_length} characters")
+            print("=" * 40)
+        
+        return result
+
+    def add_word_timings(self, model, result, audio_data=None):
+        """Align words when the output shows them; returns the model, loaded here if only alignment needs it"""
+        if not self.align_words:
+            return model
+        if self.use_result_cache:
+            cached_words(self.audio_file, result, self.model_name, self.dtype)
+        if not unaligned_segments(result):
+            return model
+        # The segments can be shown while the words are aligned; send a copy since alignment adds to them
+        self.segments_ready.emit(dict(result, segments=[dict(segment) for segment in result['segments']]))
+        if model is None:
+            model = self.load_model()
+        self.control.check()
+        self.status_update.emit("Aligning word timestamps...")
+        align_words(model, self.audio_file, result, self.model_name, audio_data=audio_data,
+                    use_cache=self.use_result_cache, dtype=self.dtype)
+        return model
 
     def run(self):
+        metrics = self.new_metrics(self.audio_file)
         try:
             self.is_running = True
             self.status_update.emit("Initializing transcription...")
-            self.progress.emit(5)
-            
-            # Terminal output for initialization
-            if self.show_terminal_progress:
-                print(f"\n=== Whisper Transcriber ===")
-                print(f"Initializing {self.model_name} model...")
-            
-            # Check if model exists or needs to be downloaded
-            model_exists = self.check_model_exists()
-            if not model_exists:
-                download_msg = f"Downloading {self.model_name} model (this may take a while)..."
-                self.status_update.emit(download_msg)
-                if self.show_terminal_progress:
-                    print(f"\n{download_msg}")
-                self.progress.emit(10)
-            else:
-                loading_msg = f"Loading {self.model_name} model..."
-                self.status_update.emit(loading_msg)
-                if self.show_terminal_progress:
-                    print(f"\n{loading_msg}")
-                self.progress.emit(10)
+            self.report_progress(5)
             
-            # Load model - this will download it if not available
-            start_time = time.time()
-            model = whisper.load_model(self.model_name).to(self.device)
-            load_time = time.time() - start_time
+            # Identical re-submissions return straight from the result cache
+            with collect_metrics(metrics):
+                result = self.cached_result()
+                audio_data = None  # Decoded once and shared with word alignment
+                if result is None:
+                    model = self.load_model()
+                    self.control.check()
+                    audio_data = decode_audio(self.audio_file)
+                    result = self.transcribe_audio(model, audio_data)
+                else:
+                    metrics.cached = True
+                    model = None
+                self.add_word_timings(model, result, audio_data)
+            self.is_running = False
+            self.report_metrics(metrics)
             
-            loaded_msg = f"Model loaded in {load_time:.1f}s. Preparing audio..."
-            self.status_update.emit(loaded_msg)
-            if self.show_terminal_progress:
-                print(loaded_msg)
-            self.progress.emit(30)
+            # Send the complete result to the UI, compacted into columns
+            self.finished.emit(Transcript.from_result(result))
+            self.report_progress(100)
             
-            # Audio loading indication
-            audio_msg = "Processing audio file..."
-            self.status_update.emit(audio_msg)
-            if self.show_terminal_progress:
-                print(audio_msg)
-            self.progress.emit(40)
+        except TranscriptionCancelled:
+            self.handle_cancelled()
+        except Exception as e:
+            self.is_running = False
+            error_msg = str(e)
+            self.report_metrics(metrics, error_msg)
+            self.error.emit(error_msg)
             
-            # Use manual time-based progress updates instead
-            begin_msg = "Beginning transcription..."
-            self.status_update.emit(begin_msg)
+            # Display error in terminal too
             if self.show_terminal_progress:
-                print(begin_msg)
-            self.progress.emit(50)
-            
-            # Start the transcription
-            start_time = time.time()
-            
-            # Estimate duration based on file size and model size
-            try:
-                file_size_mb = os.path.getsize(self.audio_file) / (1024 * 1024)
-                # Adjust based on model size (larger models are slower)
-                model_factor = {'tiny': 0.5, 'base': 1.0, 'small': 2.0, 'medium': 3.0, 'large': 5.0}
-                model_speed = model_factor.get(self.model_name, 1.0)
-                # Rough estimate: 10 seconds per MB * model factor, with minimum of 10 seconds
-                estimated_duration = max(10, file_size_mb * 10 * model_speed)
-            except:
-                # Default if we can't estimate
-                estimated_duration = 60  # seconds
-            
-            # Start a thread to monitor progress
-            monitor_thread = threading.Thread(
-                target=self.progress_monitor, 
-                args=(start_time, estimated_duration)
-            )
-            monitor_thread.daemon = True  # This ensures the thread exits when the main thread exits
-            monitor_thread.start()
-            
-            # Double check that file exists before transcribing
-            if not os.path.exists(self.audio_file):
-                raise FileNotFoundError(f"File not found: {self.audio_file}")
-            
-            # Wrap the file loading with a custom loader to handle paths more reliably
-            try:
-                # Try to preload the audio before passing to whisper
-                import numpy as np
-                import subprocess
-                
-                # Log what we're about to do
-                print(f"Using audio file path: {self.audio_file}")
-
-                # Create a custom audio data loader to bypass the potential path issues
-                def custom_audio_loader():
-                    """Custom function to load audio data from file and return as numpy array"""
-                    try:
-                        # Check if FFmpeg is available
-                        from shutil import which
-                        ffmpeg_path = which("ffmpeg")
-                        if not ffmpeg_path:
-                            print("Warning: FFmpeg not found in PATH, will rely on Whisper's internal audio loading")
-                            return None  # Let whisper handle it
-                            
-                        # Ensure absolute file path with proper slashes for Windows
-                        file_path = os.path.abspath(self.audio_file).replace('\\', '/')
-                        
-                        # Set up the FFmpeg command for proper audio conversion
-                        # Similar to what whisper.audio.load_audio does
-                        cmd = [
-                            "ffmpeg",
-                            "-nostdin",
-                            "-threads", "0",
-                            "-i", file_path,
-                            "-f", "s16le",
-                            "-ac", "1",
-                            "-acodec", "pcm_s16le",
-                            "-ar", "16000",
-                            "-"
-                        ]
-                        
-                        # Run FFmpeg and get the audio data
-                        print(f"Running FFmpeg command to load audio data")
-                        process = subprocess.run(cmd, capture_output=True, check=True)
-                        audio_data = np.frombuffer(process.stdout, np.int16).flatten().astype(np.float32) / 32768.0
-                        print(f"Successfully loaded audio data: {len(audio_data)} samples")
-                        return audio_data
-                    except Exception as e:
-                        print(f"Error in custom audio loader: {e}")
-                        return None  # Let whisper handle it
-                
-                # Try to pre-load the audio
-                audio_data = custom_audio_loader()
-                
-                # Run the actual transcription
-                if audio_data is not None:
-                    # If we successfully loaded the audio, use it directly
-                    print("Using pre-loaded audio data for transcription")
-                    result = model.transcribe(
-                        audio_data,  # Pass the pre-loaded audio numpy array
-                        fp16=(self.device == "cuda"),
-                        **self.format_options  # Pass the format options to the transcribe method
-                    )
-                else:
-                    # Fall back to the standard approach if our custom loader failed
-                    print("Falling back to Whisper's audio loading")
-                    # Use pathlib for safer path handling
-                    audio_path = pathlib.Path(self.audio_file).resolve()
-                    print(f"Resolved path: {audio_path}")
-                    
-                    result = model.transcribe(
-                        str(audio_path),  # Ensure it's a string
-                        fp16=(self.device == "cuda"),
-                        **self.format_options  # Pass the format options to the transcribe method
-                    )
-            
-            except Exception as e:
-                print(f"ERROR: Transcription failed: {str(e)}")
+                print(f"\nERROR: Transcription failed: {error_msg}")
+                # Print traceback for debugging in terminal
                 import traceback
-                traceback.print_exc()
-                self.is_running = False
-                self.error.emit(f"Transcription failed: {str(e)}")
+                print(traceback.format_exc())
+
+    def handle_cancelled(self):
+        """Drop what the aborted job held and tell the UI"""
+        self.is_running = False
+        release_memory(self.device)
+        if self.show_terminal_progress:
+            print("\nTranscription cancelled")
+        self.cancelled.emit()
+
+class BatchTranscriptionWorker(TranscriptionWorker):
+    """Drain a queue of audio files with one loaded model, saving each result next to its source"""
+    file_started = pyqtSignal(int, str)  # queue index, audio file
+    file_progress = pyqtSignal(int)  # progress of the current file (0-100)
+    file_finished = pyqtSignal(int, str, object, str)  # queue index, audio file, result, output file
+    file_failed = pyqtSignal(int, str, str)  # queue index, audio file, error message
+
+    def __init__(self, model_name, audio_files, use_gpu=None, show_terminal_progress=True):
+        super().__init__(model_name, audio_files[0], use_gpu=use_gpu, show_terminal_progress=show_terminal_progress)
+        self.audio_files = [os.path.abspath(os.path.normpath(f)) for f in audio_files]
+        self.current_index = 0
+        self.results = []  # (audio file, output file or None, error message or None)
+        self.batch_size = 1  # Windows decoded together across files; 1 transcribes one file at a time
+        self.job_metrics = {}  # queue index -> JobMetrics until the file is saved or fails
+
+    def report_progress(self, percent):
+        """Emit the current file's progress and map it onto the whole batch"""
+        self.file_progress.emit(percent)
+        overall = (self.current_index + percent / 100) / len(self.audio_files) * 100
+        self.progress.emit(int(overall))
+
+    def use_batched_decoding(self):
+        """Cross-file batching needs plain segment output without long-form splitting or VAD"""
+        return (self.batch_size > 1 and batching_supported(self.format_options)
+                and not self.long_form and not self.vad)
+    
+    def file_written(self, index, audio_file, result, output_files, error):
+        """Report a result once the writer thread has saved it next to its source"""
+        if error:
+            self.record_failure(index, audio_file, error)
+            return
+        metrics = self.job_metrics.pop(index, None)
+        if metrics is not None:
+            self.report_metrics(metrics)
+        self.results.append((audio_file, output_files[0], None))
+        self.file_finished.emit(index, audio_file, result, output_files[0])
+    
+    def record_failure(self, index, audio_file, error_message):
+        # A bad file must not stop the rest of the batch
+        print(f"ERROR: {audio_file}: {error_message}")
+        metrics = self.job_metrics.pop(index, None)
+        if metrics is not None:
+            self.report_metrics(metrics, error_message)
+        self.results.append((audio_file, None, error_message))
+        self.file_failed.emit(index, audio_file, error_message)
+    
+    def submit_result(self, writer, model, index, result, audio_data=None):
+        """Align words if the output shows them, then queue the result to be written"""
+        audio_file = self.audio_file = self.audio_files[index]
+        try:
+            with collect_metrics(self.job_metrics[index]):
+                self.add_word_timings(model, result, audio_data)
+        except TranscriptionCancelled:
+            raise
+        except Exception as e:
+            self.record_failure(index, audio_file, str(e))
+            return
+        writer.submit(index, audio_file, result, [self.output_format], metrics=self.job_metrics[index])
+
+    def run_batched(self):
+        """Serve cached files, then decode the rest with windows from several files per model pass"""
+        misses = []
+        unaligned = []  # Cached results still missing word timings, finished once the model is loaded
+        writer = BackgroundWriter(self.file_written)
+        try:
+            for index, audio_file in enumerate(self.audio_files):
+                self.audio_file = audio_file
+                metrics = self.job_metrics[index] = self.new_metrics(audio_file)
+                result = lookup_cached_result(audio_file, self.model_name, self.format_options, batched=True,
+                                              dtype=self.dtype) if self.use_result_cache else None
+                if result is None:
+                    misses.append(index)
+                    continue
+                metrics.cached = True
+                if self.align_words and unaligned_segments(cached_words(audio_file, result, self.model_name,
+                                                                        self.dtype)):
+                    unaligned.append((index, result))
+                else:
+                    writer.submit(index, audio_file, result, [self.output_format], metrics=metrics)
+            if not misses and not unaligned:
                 return
             
-            # Stop the progress monitor
-            self.is_running = False
+            # Model passes are shared by the batch, so they are reported as one "batch" record
+            batch_metrics = self.new_metrics(None, event="batch")
+            with collect_metrics(batch_metrics):
+                self.current_index = 0
+                model = self.load_model()
+                self.control.check()
+                for index, result in unaligned:
+                    self.submit_result(writer, model, index, result)
+                if misses:
+                    self.status_update.emit(
+                        f"Transcribing {len(misses)} files in batches of {self.batch_size} windows...")
+                for done, (miss, audio_file, result, audio_data, error) in enumerate(transcribe_files_batched(
+                        model,
+                        [self.audio_files[index] for index in misses],
+                        self.model_name,
+                        device=self.device,
+                        format_options=self.format_options,
+                        batch_size=self.batch_size,
+                        use_cache=self.use_result_cache,
+                        control=self.control,
+                        dtype=self.dtype,
+                        metrics=[self.job_metrics[index] for index in misses],
+                        file_started=lambda miss, audio_file: self.file_started.emit(misses[miss], audio_file)),
+                        start=1):
+                    index = misses[miss]
+                    if error:
+                        self.record_failure(index, audio_file, error)
+                    else:
+                        self.submit_result(writer, model, index, result, audio_data)
+                    self.progress.emit(
+                        int((len(self.audio_files) - len(misses) + done) / len(self.audio_files) * 100))
+                    self.status_update.emit(f"[{done}/{len(misses)}] {os.path.basename(audio_file)} done")
+            self.report_metrics(batch_metrics)
+        finally:
+            writer.close()
+    
+    def run(self):
+        try:
+            self.is_running = True
+            self.current_index = 0
+            self.status_update.emit(f"Initializing batch of {len(self.audio_files)} files...")
+            batch_start = time.time()
             
-            # Finalize
-            transcribe_time = time.time() - start_time
-            complete_msg = f"Transcription completed in {transcribe_time:.1f}s. Finalizing..."
-            self.progress.emit(95)
-            self.status_update.emit(complete_msg)
+            if self.use_batched_decoding():
+                self.run_batched()
+            else:
+                self.run_sequential()
             
-            # Update terminal with completion status
+            failed = sum(1 for _, _, error in self.results if error)
+            summary = (f"Batch completed in {time.time() - batch_start:.1f}s: "
+                       f"{len(self.results) - failed} succeeded, {failed} failed")
             if self.show_terminal_progress:
-                if self.terminal_progress_bar:
-                    self.terminal_progress_bar.update(100)  # Complete the progress bar
-                print(f"\n{complete_msg}")
-                
-                # If verbose mode, print some segments in the terminal
-                if self.format_options.get('verbose', False) and 'segments' in result:
-                    print("\nSample output (first few segments):")
-                    # Get up to 3 segments to display as samples
-                    sample_segments = result['segments'][:3] if isinstance(result['segments'], list) else []
-                    
-                    for i, segment in enumerate(sample_segments):
-                        # Check if segment is a dictionary before attempting to access keys
-                        if isinstance(segment, dict):
-                            # Use safe dictionary access
-                            start = format_timestamp(segment.get('start', 0))
-                            end = format_timestamp(segment.get('end', 0))
-                            text = segment.get('text', '').strip()
-                            print(f"[{start} --> {end}]  {text}")
-                        elif isinstance(segment, str):
-                            # Handle case where segment is a string
-                            print(f"Segment {i+1}: {segment}")
-                        else:
-                            # Handle any other type
-                            print(f"Segment {i+1}: {str(segment)}")
-                    print("...\n")
-                
-                # Safely get text length
-                text_length = 0
-                if isinstance(result, dict) and 'text' in result:
-                    if isinstance(result['text'], str):
-                        text_length = len(result['text'])
-                    
-                print(f"Output length: {text_length} characters")
-                print("=" * 40)
-            
-            # Send the complete result object to the UI
-            self.finished.emit(result)
+                print(f"\n{summary}")
+            self.current_index = len(self.audio_files)
             self.progress.emit(100)
+            self.status_update.emit(summary)
+            self.finished.emit(self.results)
             
+        except TranscriptionCancelled:
+            # Files finished before the cancel keep their saved results
+            self.handle_cancelled()
         except Exception as e:
             self.is_running = False
             error_msg = str(e)
             self.error.emit(error_msg)
             
-            # Display error in terminal too
             if self.show_terminal_progress:
-                print(f"\nERROR: Transcription failed: {error_msg}")
-                # Print traceback for debugging in terminal
+                print(f"\nERROR: Batch transcription failed: {error_msg}")
                 import traceback
                 print(traceback.format_exc())
+    
+    def run_sequential(self):
+        """Transcribe the queue one file at a time, decoding ahead and writing behind the model"""
+        def lookup(audio_file):
+            if not self.use_result_cache:
+                return None
+            return lookup_cached_result(audio_file, self.model_name, self.format_options, self.long_form, self.vad,
+                                        dtype=self.dtype)
+        
+        # Load the model once, on the first cache miss, and reuse it for every file in the batch
+        model = None
+        job_metrics = [self.new_metrics(audio_file) for audio_file in self.audio_files]
+        self.job_metrics.update(enumerate(job_metrics))
+        writer = BackgroundWriter(self.file_written)
+        try:
+            for index, audio_file, result, audio_data, error in prefetch_audio(self.audio_files, lookup,
+                                                                               metrics=job_metrics):
+                self.control.check()
+                self.current_index = index
+                self.audio_file = audio_file
+                self.terminal_progress_bar = None
+                self.file_started.emit(index, audio_file)
+                self.status_update.emit(f"[{index + 1}/{len(self.audio_files)}] {os.path.basename(audio_file)}")
+                
+                try:
+                    if error:
+                        raise RuntimeError(error)
+                    if result is None:
+                        with collect_metrics(job_metrics[index]):
+                            if model is None:
+                                model = self.load_model()
+                            result = self.transcribe_audio(model, audio_data)
+                    else:
+                        job_metrics[index].cached = True
+                        self.status_update.emit("Loaded previous transcription from cache")
+                    with collect_metrics(job_metrics[index]):
+                        model = self.add_word_timings(model, result, audio_data)
+                except TranscriptionCancelled:
+                    raise
+                except Exception as e:
+                    self.record_failure(index, audio_file, str(e))
+                    continue
+                # Formatting and the disk write overlap with the next file's transcription
+                writer.submit(index, audio_file, result, [self.output_format], metrics=job_metrics[index])
+        finally:
+            writer.close()
+
+class WordAlignmentWorker(TranscriptionWorker):
+    """Align the words of a finished result between start and end seconds, to show or save them"""
+
+    def __init__(self, model_name, audio_file, result, start=None, end=None, use_gpu=None):
+        super().__init__(model_name, audio_file, use_gpu=use_gpu, show_terminal_progress=False)
+        self.source = result
+        # Alignment adds words to the segments, so it works on copies
+        result = as_dict(result)
+        self.result = dict(result, segments=[dict(segment) for segment in result['segments']])
+        self.time_range = (start, end)
+
+    def run(self):
+        try:
+            model = self.load_model()
+            self.control.check()
+            self.status_update.emit("Aligning word timestamps...")
+            align_words(model, self.audio_file, self.result, self.model_name, *self.time_range,
+                        use_cache=self.use_result_cache, dtype=self.dtype)
+            self.finished.emit(Transcript.from_result(self.result))
+        except TranscriptionCancelled:
+            self.cancelled.emit()
+        except Exception as e:
+            print(f"ERROR: Word alignment failed: {e}")
+            self.error.emit(str(e))
+
+class RemoteTranscriptionWorker(QThread):
+    """Thin client: hand the file to the local transcription service and follow the job"""
+    progress = pyqtSignal(int)
+    status_update = pyqtSignal(str)
+    finished = pyqtSignal(object)
+    error = pyqtSignal(str)
+    cancelled = pyqtSignal()
+    metrics_ready = pyqtSignal(dict)
+
+    def __init__(self, client, model_name, audio_file, use_gpu=None):
+        super().__init__()
+        self.client = client
+        self.model_name = model_name
+        self.audio_file = os.path.abspath(os.path.normpath(audio_file))
+        self.use_gpu = use_gpu
+        self.device = "service"
+        self.format_options = {}
+        self.output_format = "text"
+        self.align_words = False
+        self.long_form = False
+        self.vad = False
+        self.int8 = False
+        self.use_result_cache = True
+        self.job_id = None
+        self.control = JobControl()
+        self.supports_pause = False  # The service API only cancels
+        self.metrics_log = None
+
+    def cancel(self):
+        self.control.cancel()
+        self.status_update.emit("Cancelling service job...")
+
+    def report_status(self, status):
+        if self.control.cancelled and status['state'] not in FINISHED_STATES:
+            self.client.cancel(self.job_id)
+        # The service reports 0-100 for the whole job
+        self.progress.emit(status.get('progress', 0))
+        self.status_update.emit(f"[service] {status.get('message', status['state'])}")
+        if status['state'] in FINISHED_STATES and status.get('metrics'):
+            # Measured by the service process, which did the work
+            if self.metrics_log:
+                self.metrics_log.write(status['metrics'])
+            self.metrics_ready.emit(status['metrics'])
+
+    def run(self):
+        try:
+            self.status_update.emit(f"Submitting to transcription service at {self.client.url}...")
+            self.job_id = self.client.submit(
+                self.audio_file,
+                self.model_name,
+                format_options=self.format_options,
+                use_gpu=self.use_gpu,
+                long_form=self.long_form,
+                vad=self.vad,
+                use_cache=self.use_result_cache,
+                int8=self.int8,
+                align_words=self.align_words
+            )
+            if self.control.cancelled:
+                self.client.cancel(self.job_id)
+            result = self.client.wait(self.job_id, on_status=self.report_status)
+            self.progress.emit(100)
+            self.finished.emit(Transcript.from_result(result))
+        except ServiceError as e:
+            if self.control.cancelled:
+                self.cancelled.emit()
+            else:
+                self.error.emit(str(e))
+        except Exception as e:
+            # e.g. a connection reset mid-response; the window must still get its controls back
+            self.error.emit(f"Transcription service error: {e}")
+
+class ServiceProbeWorker(QThread):
+    """Check whether the configured transcription service answers, off the UI thread"""
+    probed = pyqtSignal(object)  # ServiceClient, or None if the service is not reachable
+
+    def __init__(self, service_url):
+        super().__init__()
+        self.service_url = service_url
+
+    def run(self):
+        client = ServiceClient(self.service_url)
+        self.probed.emit(client if client.available() else None)
+
+class HardwareProbeWorker(QThread):
+    """Import the ML stack and probe CUDA off the UI thread once the window is up"""
+    probed = pyqtSignal(object)  # cuda_info dict from get_cuda_details
+
+    def run(self):
+        cuda_info = get_cuda_details()
+        try:
+            # Warm the whisper import so the first transcription does not pay for it
+            import whisper  # noqa: F401
+        except Exception as e:
+            print(f"Could not import whisper: {e}")
+        self.probed.emit(cuda_info)
+
+class LiveTranscript:
+    """Fill the output pane while a file is transcribed, without blocking the UI.
+
+    Segment-based formats are shown in a TranscriptView: streamed segments
+    are queued and appended as rows at most every FLUSH_INTERVAL_MS, and
+    only the visible rows are ever rendered, so multi-hour transcripts stay
+    responsive and editable. Other output (JSON) is appended to the text
+    edit in CHUNK_CHARS pieces, one per event loop pass.
+    """
+    FLUSH_INTERVAL_MS = 100
+    CHUNK_CHARS = 64 * 1024
+
+    def __init__(self, text_edit, view, stack):
+        self.text_edit = text_edit
+        self.view = view
+        self.model = view.model()
+        self.stack = stack
+        self.pending = []
+        self.chunks = []
+        self.streaming = False
+        self.output_format = "text"
+        self.flush_timer = QTimer()
+        self.flush_timer.setSingleShot(True)
+        self.flush_timer.setInterval(self.FLUSH_INTERVAL_MS)
+        self.flush_timer.timeout.connect(self.flush)
+        self.chunk_timer = QTimer()
+        self.chunk_timer.setInterval(0)
+        self.chunk_timer.timeout.connect(self.append_next_chunk)
+
+    @property
+    def segment_count(self):
+        return self.model.rowCount()
+
+    def showing_segments(self):
+        return self.stack.currentWidget() is self.view
+
+    def start(self, output_format):
+        """Clear the pane for a new transcript in output_format"""
+        self.clear()
+        self.output_format = output_format
+        # Formats that are not shown per segment (JSON) preview the plain text until the result is complete
+        self.model.set_output_format(output_format if output_format in TranscriptModel.FORMATS else "text")
+        self.stack.setCurrentWidget(self.view)
+        self.streaming = True
+
+    def clear(self):
+        self.flush_timer.stop()
+        self.chunk_timer.stop()
+        self.pending = []
+        self.chunks = []
+        self.streaming = False
+        self.model.clear()
+        self.text_edit.clear()
+
+    def add_segments(self, segments):
+        if not self.streaming:
+            return
+        self.pending.extend(segments)
+        if not self.flush_timer.isActive():
+            self.flush_timer.start()
+
+    def flush(self):
+        """Append the queued segments as rows in one model update"""
+        if not self.streaming or not self.pending:
+            return
+        follow = self.view.at_bottom()  # Keep following the end unless the user scrolled up
+        self.model.append_segments(self.pending)
+        self.pending = []
+        if follow:
+            self.view.scrollToBottom()
+
+    def show_result(self, result):
+        """End the stream and show the complete result in the current output format"""
+        self.flush()
+        self.streaming = False
+        if self.output_format in TranscriptModel.FORMATS and isinstance(result, Mapping) and 'segments' in result:
+            segments = result['segments']
+            # Rows already streamed are the result unless words were aligned since
+            if self.segment_count != len(segments) or self.output_format == "word_timestamps":
+                self.model.set_segments(segments)
+            self.stack.setCurrentWidget(self.view)
+        else:
+            self.show_text(format_result(result, self.output_format))
+
+    def show_text(self, text):
+        """Replace the pane with text, appended chunk by chunk between UI events"""
+        self.clear()
+        self.stack.setCurrentWidget(self.text_edit)
+        # Appended text is not something to undo, and the undo stack would double its memory
+        self.text_edit.setUndoRedoEnabled(False)
+        self.chunks = [text[i:i + self.CHUNK_CHARS] for i in range(0, len(text), self.CHUNK_CHARS)]
+        self.append_next_chunk()
+
+    def append_next_chunk(self):
+        if self.chunks:
+            cursor = QTextCursor(self.text_edit.document())
+            cursor.movePosition(QTextCursor.MoveOperation.End)
+            cursor.insertText(self.chunks.pop(0))
+        if not self.chunks:
+            self.chunk_timer.stop()
+            # Done appending: the user may edit the text now
+            self.text_edit.setUndoRedoEnabled(True)
+            self.text_edit.document().setModified(False)
+        elif not self.chunk_timer.isActive():
+            self.chunk_timer.start()
+
+    def apply_edits(self, result):
+        """result with the segment texts corrected in the view (itself if none were)"""
+        if not self.model.edits or not self.showing_segments():
+            return result
+        result = as_dict(result)
+        result = dict(result, segments=list(result['segments']))
+        for row, text in self.model.edits.items():
+            segment = dict(result['segments'][row], text=text)
+            # Word timings no longer match the corrected text, and are aligned again from the text itself
+            segment.pop('words', None)
+            segment.pop('tokens', None)
+            result['segments'][row] = segment
+        result['text'] = "".join(segment['text'] for segment in result['segments'])
+        return Transcript.from_result(result)
+
+    def edited_text(self):
+        """Text the user changed in the text pane (e.g. hand-edited JSON), or None"""
+        if self.showing_segments() or self.chunks or not self.text_edit.document().isModified():
+            return None
+        return self.text_edit.toPlainText()
 
 class MainWindow(QMainWindow):
     def __init__(self):
@@ -585,8 +949,25 @@ class MainWindow(QMainWindow):
         # Load user settings
         self.settings = load_settings()
         
-        # Get CUDA details
-        self.cuda_info = get_cuda_details()
+        # Apply the model cache memory budget from settings
+        try:
+            get_model_cache().set_memory_budget(int(self.settings.get('model_cache_mb', DEFAULT_MEMORY_BUDGET_MB)))
+        except ValueError:
+            print(f"Invalid model_cache_mb setting: {self.settings.get('model_cache_mb')}")
+        try:
+            get_result_cache().max_size_mb = int(self.settings.get('result_cache_mb', DEFAULT_RESULT_CACHE_MB))
+        except ValueError:
+            print(f"Invalid result_cache_mb setting: {self.settings.get('result_cache_mb')}")
+        
+        # CUDA details are probed in the background after the window is shown
+        self.cuda_info = None
+        
+        # Last finished result and its audio file; saving and format changes format from it
+        self.result = None
+        self.result_file = None
+        self.result_model = None  # Model that transcribed the result, which also aligns its words
+        self.align_worker = None
+        self.pending_save = None  # (outputs, saved files, file name) waiting for the whole file's words
         
         # Main widget and layout
         main_widget = QWidget()
@@ -626,6 +1007,16 @@ class MainWindow(QMainWindow):
         self.format_description.setStyleSheet("font-style: italic; color: #666;")
         settings_layout.addWidget(self.format_description)
         
+        # Voice activity detection sits with the format choice since it changes the output
+        self.vad_checkbox = QCheckBox("Skip silence (voice activity detection)")
+        self.vad_checkbox.setChecked(self.settings.get('vad', 'False').lower() == 'true')
+        self.vad_checkbox.setToolTip(
+            "Detect speech before transcribing and skip holds and silence; "
+            "timestamps still refer to the original recording"
+        )
+        self.vad_checkbox.stateChanged.connect(self.save_vad_setting)
+        settings_layout.addWidget(self.vad_checkbox)
+        
         # GPU Acceleration option
         self.use_gpu_checkbox = QCheckBox("Use GPU acceleration (CUDA)")
         
@@ -633,25 +1024,42 @@ class MainWindow(QMainWindow):
         try:
             use_gpu = self.settings.get('use_gpu', 'True').lower() == 'true'
         except:
-            use_gpu = torch.cuda.is_available()
+            use_gpu = True
             
         self.use_gpu_checkbox.setChecked(use_gpu)
         
-        # Disable checkbox if GPU is not available
-        if not torch.cuda.is_available():
-            self.use_gpu_checkbox.setEnabled(False)
-            self.use_gpu_checkbox.setToolTip("GPU acceleration is not available on this system")
-        else:
-            gpu_name = torch.cuda.get_device_name(0)
-            self.use_gpu_checkbox.setToolTip(f"Use GPU acceleration with {gpu_name}")
+        # Keep the checkbox disabled until the hardware probe reports back
+        self.use_gpu_checkbox.setEnabled(False)
+        self.use_gpu_checkbox.setToolTip("Detecting GPU...")
         
         # Connect checkbox state change to save settings
         self.use_gpu_checkbox.stateChanged.connect(self.save_gpu_setting)
         
         settings_layout.addWidget(self.use_gpu_checkbox)
         
+        # Parallel long-form option for CPU-only machines
+        self.long_form_checkbox = QCheckBox("Parallel long-form mode (CPU)")
+        self.long_form_checkbox.setChecked(self.settings.get('long_form', 'False').lower() == 'true')
+        self.long_form_checkbox.setToolTip(
+            f"Split recordings longer than {2 * DEFAULT_CHUNK_SECONDS // 60} minutes at silences "
+            "and transcribe the pieces in parallel processes when running on CPU"
+        )
+        self.long_form_checkbox.stateChanged.connect(self.save_long_form_setting)
+        settings_layout.addWidget(self.long_form_checkbox)
+        
+        # Dynamic int8 quantization trades a little accuracy for CPU speed
+        self.int8_checkbox = QCheckBox("Quantized int8 mode (CPU)")
+        self.int8_checkbox.setChecked(self.settings.get('cpu_int8', 'False').lower() == 'true')
+        self.int8_checkbox.setToolTip(
+            "Quantize the model's linear layers to int8 when running on CPU; faster and smaller, "
+            "usually slightly less accurate. The quantized model is cached on disk after first use"
+        )
+        self.int8_checkbox.stateChanged.connect(self.save_int8_setting)
+        settings_layout.addWidget(self.int8_checkbox)
+        
         # Connect format combo change to update description
         self.format_combo.currentTextChanged.connect(self.update_format_description)
+        self.format_combo.currentTextChanged.connect(self.show_result_in_format)
         
         # Add settings group to main layout
         layout.addWidget(settings_group)
@@ -660,16 +1068,12 @@ class MainWindow(QMainWindow):
         status_bar = QStatusBar()
         self.setStatusBar(status_bar)
         
-        # Show GPU status in status bar
-        if torch.cuda.is_available():
-            device_info = f"GPU available: {torch.cuda.get_device_name(0)}"
-            if use_gpu:
-                device_info += " (enabled 🚀)"
-            else:
-                device_info += " (disabled ⚠️)"
-        else:
-            device_info = "GPU not available, using CPU"
-        status_bar.showMessage(device_info)
+        # GPU status is filled in once the hardware probe finishes
+        status_bar.showMessage("Detecting hardware...")
+        
+        # Speed of the last finished job, with the stage breakdown in the tooltip
+        self.metrics_label = QLabel("")
+        status_bar.addPermanentWidget(self.metrics_label)
         
         # Progress tracking
         self.progress_bar = QProgressBar()
@@ -687,8 +1091,20 @@ class MainWindow(QMainWindow):
         
         # Transcription output
         layout.addWidget(QLabel("Transcription Output:"))
+        # Segments are listed in a virtualized view; output that is not per segment (JSON) goes to the text edit
         self.output_text = QTextEdit()
-        layout.addWidget(self.output_text)
+        self.transcript_view = TranscriptView()
+        self.output_stack = QStackedWidget()
+        self.output_stack.addWidget(self.transcript_view)
+        self.output_stack.addWidget(self.output_text)
+        layout.addWidget(self.output_stack)
+        self.live_transcript = LiveTranscript(self.output_text, self.transcript_view, self.output_stack)
+        # Word timestamps are aligned on demand, for the rows scrolled into view
+        self.align_timer = QTimer(self)
+        self.align_timer.setSingleShot(True)
+        self.align_timer.setInterval(ALIGN_DELAY_MS)
+        self.align_timer.timeout.connect(self.align_visible_words)
+        self.transcript_view.verticalScrollBar().valueChanged.connect(self.align_timer.start)
         
         # Controls
         button_layout = QHBoxLayout()
@@ -696,22 +1112,70 @@ class MainWindow(QMainWindow):
         self.transcribe_btn.clicked.connect(self.start_transcription)
         self.save_btn = QPushButton("Save Transcription")
         self.save_btn.clicked.connect(self.save_transcription)
+        self.pause_btn = QPushButton("Pause")
+        self.pause_btn.clicked.connect(self.toggle_pause)
+        self.cancel_btn = QPushButton("Cancel")
+        self.cancel_btn.clicked.connect(self.cancel_transcription)
         button_layout.addWidget(self.transcribe_btn)
+        button_layout.addWidget(self.pause_btn)
+        button_layout.addWidget(self.cancel_btn)
         button_layout.addWidget(self.save_btn)
         layout.addLayout(button_layout)
         
         self.save_btn.setEnabled(False)
-    
-    def save_gpu_setting(self):
-        """Save the GPU acceleration setting when changed"""
-        use_gpu = self.use_gpu_checkbox.isChecked()
-        self.settings['use_gpu'] = str(use_gpu)
-        save_settings(self.settings)
+        self.pause_btn.setEnabled(False)
+        self.cancel_btn.setEnabled(False)
         
-        # Update status bar (fix: use the class variable instead of method)
-        if torch.cuda.is_available():
-            device_info = f"GPU available: {torch.cuda.get_device_name(0)}"
-            if use_gpu:
+        # Load torch/whisper and probe the GPU once the event loop is running,
+        # so the window paints without waiting for the ML stack
+        self.hardware_probe = None
+        QTimer.singleShot(0, self.start_hardware_probe)
+        # Whether the transcription service is up is checked in the background, never when a job starts
+        self.service = None
+        self.service_probe = None
+        QTimer.singleShot(0, self.probe_service)
+    
+    def start_hardware_probe(self):
+        self.hardware_probe = HardwareProbeWorker()
+        self.hardware_probe.probed.connect(self.apply_cuda_info)
+        self.hardware_probe.start()
+    
+    def probe_service(self):
+        """Recheck the configured transcription service in the background"""
+        service_url = self.settings.get('service_url', '').strip()
+        if not service_url:
+            self.service = None
+            return
+        if self.service_probe is not None and self.service_probe.isRunning():
+            return
+        self.service_probe = ServiceProbeWorker(service_url)
+        self.service_probe.probed.connect(self.service_probed)
+        self.service_probe.start()
+    
+    def service_probed(self, client):
+        if client is None:
+            print(f"Transcription service at {self.service_probe.service_url} not reachable; transcribing locally")
+        self.service = client
+    
+    def apply_cuda_info(self, cuda_info):
+        """Fill in the GPU checkbox and status bar from the background probe"""
+        self.cuda_info = cuda_info
+        if not cuda_info['available']:
+            self.use_gpu_checkbox.setEnabled(False)
+            self.use_gpu_checkbox.setToolTip("GPU acceleration is not available on this system")
+        else:
+            # Leave the checkbox alone while a transcription is running
+            self.use_gpu_checkbox.setEnabled(self.transcribe_btn.isEnabled())
+            self.use_gpu_checkbox.setToolTip(f"Use GPU acceleration with {cuda_info['device_name']}")
+        self.update_device_status()
+    
+    def update_device_status(self):
+        """Show GPU/CPU info in the status bar"""
+        if self.cuda_info is None:
+            device_info = "Detecting hardware..."
+        elif self.cuda_info['available']:
+            device_info = f"GPU available: {self.cuda_info['device_name']}"
+            if self.use_gpu_checkbox.isChecked():
                 device_info += " (enabled 🚀)"
             else:
                 device_info += " (disabled ⚠️)"
@@ -719,12 +1183,125 @@ class MainWindow(QMainWindow):
             device_info = "GPU not available, using CPU"
         status_bar = self.statusBar()
         if status_bar is not None:
-            status_bar.showMessage(device_info)    
+            status_bar.showMessage(device_info)
+    
+    def closeEvent(self, event):
+        # Stop an in-flight transcription instead of leaving it to run on
+        worker = getattr(self, 'worker', None)
+        if worker is not None and worker.isRunning():
+            worker.cancel()
+        # Do not tear down a thread while it is still running. A probe cannot be
+        # interrupted and the worker may be finishing its current step, so
+        # rather than block, let them stop out of sight and close afterwards.
+        if self.align_worker is not None and self.align_worker.isRunning():
+            self.align_worker.cancel()
+        for thread in (self.hardware_probe, self.service_probe, worker, self.align_worker):
+            if thread is not None and thread.isRunning() and not thread.wait(CLOSE_WAIT_MS):
+                self.hide()
+                event.ignore()
+                QTimer.singleShot(CLOSE_WAIT_MS, self.close)
+                return
+        super().closeEvent(event)
+    
+    def save_gpu_setting(self):
+        """Save the GPU acceleration setting when changed"""
+        use_gpu = self.use_gpu_checkbox.isChecked()
+        self.settings['use_gpu'] = str(use_gpu)
+        save_settings(self.settings)
+        self.update_device_status()
+    
+    def save_long_form_setting(self):
+        """Save the parallel long-form setting when changed"""
+        self.settings['long_form'] = str(self.long_form_checkbox.isChecked())
+        save_settings(self.settings)
+    
+    def save_int8_setting(self):
+        """Save the quantized CPU mode setting when changed"""
+        self.settings['cpu_int8'] = str(self.int8_checkbox.isChecked())
+        save_settings(self.settings)
+    
+    def save_vad_setting(self):
+        """Save the voice activity detection setting when changed"""
+        self.settings['vad'] = str(self.vad_checkbox.isChecked())
+        save_settings(self.settings)
+    
     def update_format_description(self, format_name):
         """Update the description when the format selection changes"""
         if format_name in TRANSCRIPTION_FORMATS:
             self.format_description.setText(TRANSCRIPTION_FORMATS[format_name]["description"])
     
+    def show_result_in_format(self, format_name):
+        """Show the last result in a newly chosen format, without transcribing again"""
+        if self.result is None or format_name not in TRANSCRIPTION_FORMATS or not self.transcribe_btn.isEnabled():
+            return
+        self.result = self.live_transcript.apply_edits(self.result)
+        self.live_transcript.start(TRANSCRIPTION_FORMATS[format_name]["output_format"])
+        self.live_transcript.show_result(self.result)
+        self.align_visible_words()
+
+    def align_visible_words(self):
+        """Align the words of the rows in view while they are shown with word timestamps"""
+        live = self.live_transcript
+        if (self.result is None or live.output_format != "word_timestamps" or not live.showing_segments()
+                or not self.transcribe_btn.isEnabled()):
+            return
+        rows = self.transcript_view.visible_rows()
+        if rows is None:
+            return
+        first, last = rows
+        model = live.model
+        if all(model.has_words[first:last + 1]) and not any(row in model.edits for row in range(first, last + 1)):
+            return
+        self.align_result_words(model.starts[first], model.ends[last])
+
+    def align_result_words(self, start=None, end=None):
+        """Align the result's words between start and end seconds in the background; False if it cannot start"""
+        if self.align_worker is not None and self.align_worker.isRunning():
+            return False
+        if self.result is None or not self.result_file or not os.path.exists(self.result_file):
+            return False
+        self.result = self.live_transcript.apply_edits(self.result)
+        worker = self.align_worker = WordAlignmentWorker(self.result_model or self.model_combo.currentText(),
+                                                         self.result_file, self.result, start, end,
+                                                         use_gpu=self.use_gpu_checkbox.isChecked())
+        worker.int8 = self.int8_checkbox.isChecked()
+        worker.status_update.connect(self.update_status)
+        worker.finished.connect(self.words_aligned)
+        worker.error.connect(self.word_alignment_failed)
+        worker.start()
+        return True
+
+    def words_aligned(self, result):
+        worker = self.align_worker
+        # The slot can run before the thread has returned from run()
+        worker.wait(CLOSE_WAIT_MS)
+        if worker.source is not self.result:
+            # The result changed meanwhile (edited or transcribed again): align what is shown now
+            if not (self.pending_save and self.align_result_words()):
+                self.align_visible_words()
+            return
+        self.result = self.live_transcript.apply_edits(result)
+        live = self.live_transcript
+        if live.output_format == "word_timestamps" and live.showing_segments():
+            # Show the new words without losing the user's place
+            scroll_bar = self.transcript_view.verticalScrollBar()
+            position = scroll_bar.value()
+            live.show_result(self.result)
+            scroll_bar.setValue(position)
+        self.status_label.setText("Word timestamps aligned")
+        if self.pending_save is not None:
+            if unaligned_segments(as_dict(self.result)) and self.align_result_words():
+                return  # Only the rows in view were aligned; now the rest of the file
+            self.write_saved_outputs(*self.pending_save)
+        else:
+            self.align_visible_words()
+
+    def word_alignment_failed(self, message):
+        self.status_label.setText(f"Word alignment failed: {message}")
+        if self.pending_save is not None:
+            # Save anyway; rows without words fall back to their segment start times
+            self.write_saved_outputs(*self.pending_save)
+    
     def add_audio_files(self):
         files, _ = QFileDialog.getOpenFileNames(
             self,
@@ -741,28 +1318,38 @@ class MainWindow(QMainWindow):
             return
             
         self.transcribe_btn.setEnabled(False)
+        self.save_btn.setEnabled(False)
+        self.result = None
+        self.pending_save = None
         self.add_file_btn.setEnabled(False)
         self.model_combo.setEnabled(False)
         self.format_combo.setEnabled(False)
+        self.vad_checkbox.setEnabled(False)
         self.use_gpu_checkbox.setEnabled(False)
+        self.long_form_checkbox.setEnabled(False)
+        self.int8_checkbox.setEnabled(False)
         
-        first_item = self.file_list.item(0)
-        if (first_item is None):
+        # Collect every queued file, not just the first one
+        audio_files = []
+        for row in range(self.file_list.count()):
+            item = self.file_list.item(row)
+            if item is not None:
+                # Ensure we're using an absolute path
+                audio_files.append(os.path.abspath(item.text()))
+        
+        if not audio_files:
             QMessageBox.warning(self, "No Files", "Please add audio files first.")
             self.enable_controls()
             return
         
-        current_file = first_item.text()
-        
-        # Ensure we're using an absolute path and it exists
-        current_file = os.path.abspath(current_file)
-        if not os.path.exists(current_file):
-            QMessageBox.warning(self, "File Not Found", f"The file '{current_file}' does not exist or cannot be accessed.")
+        missing_files = [f for f in audio_files if not os.path.exists(f)]
+        if missing_files:
+            QMessageBox.warning(self, "File Not Found", "The following files do not exist or cannot be accessed:\n" + "\n".join(missing_files))
             self.enable_controls()
             return
             
-        # Debug: Print the file path to help with troubleshooting
-        print(f"Attempting to transcribe file: {current_file}")
+        # Debug: Print the file paths to help with troubleshooting
+        print(f"Attempting to transcribe {len(audio_files)} file(s): {audio_files}")
         
         model_name = self.model_combo.currentText()
         use_gpu = self.use_gpu_checkbox.isChecked()
@@ -773,24 +1360,105 @@ class MainWindow(QMainWindow):
         output_format = TRANSCRIPTION_FORMATS[format_name]["output_format"]
         
         # Create worker with format options and GPU preference
-        self.worker = TranscriptionWorker(model_name, current_file, use_gpu=use_gpu)
+        client = self.service_client()
+        if len(audio_files) == 1 and client is not None:
+            # A running service already has the model warm; just follow its job
+            self.worker = RemoteTranscriptionWorker(client, model_name, audio_files[0], use_gpu=use_gpu)
+            self.worker.finished.connect(self.transcription_finished)
+        elif len(audio_files) == 1:
+            self.worker = TranscriptionWorker(model_name, audio_files[0], use_gpu=use_gpu)
+            self.worker.segments_ready.connect(self.show_segments)
+            self.worker.segments_decoded.connect(self.live_transcript.add_segments)
+            self.worker.finished.connect(self.transcription_finished)
+        else:
+            # Several files: drain the whole queue with one model, saving results next to the sources
+            self.worker = BatchTranscriptionWorker(model_name, audio_files, use_gpu=use_gpu)
+            self.worker.file_started.connect(self.batch_file_started)
+            self.worker.segments_decoded.connect(self.live_transcript.add_segments)
+            self.worker.file_finished.connect(self.batch_file_finished)
+            self.worker.file_failed.connect(self.batch_file_failed)
+            self.worker.finished.connect(self.batch_finished)
         self.worker.progress.connect(self.update_progress)
         self.worker.status_update.connect(self.update_status)
-        self.worker.finished.connect(self.transcription_finished)
         self.worker.error.connect(self.transcription_error)
+        self.worker.cancelled.connect(self.transcription_cancelled)
+        self.worker.metrics_ready.connect(self.show_metrics)
+        if self.settings.get('metrics_log'):
+            self.worker.metrics_log = MetricsLog(self.settings['metrics_log'])
         
         # Store format options to use in the worker
         self.worker.format_options = format_options
         self.worker.output_format = output_format
+        self.live_transcript.start(output_format)
+        self.worker.align_words = TRANSCRIPTION_FORMATS[format_name].get("align_words", False)
+        self.worker.long_form = self.long_form_checkbox.isChecked()
+        self.worker.vad = self.vad_checkbox.isChecked()
+        self.worker.int8 = self.int8_checkbox.isChecked()
+        if len(audio_files) > 1:
+            # Decode windows from several queued files per model pass
+            try:
+                self.worker.batch_size = max(1, int(self.settings.get('batch_size', 1)))
+            except ValueError:
+                print(f"Invalid batch_size setting: {self.settings.get('batch_size')}")
         
         # Show device being used in status
-        device_msg = f"Using {'GPU' if use_gpu and torch.cuda.is_available() else 'CPU'} for processing"
+        if self.worker.device == "service":
+            device_msg = f"Using transcription service at {client.url}"
+        else:
+            device_msg = f"Using {'GPU' if self.worker.device == 'cuda' else 'CPU'} for processing"
+            if self.worker.dtype == "int8":
+                device_msg += " (int8 quantized)"
         self.status_label.setText(device_msg)
         
         self.worker.start()
+        self.cancel_btn.setEnabled(True)
+        self.pause_btn.setEnabled(self.worker.supports_pause)
+        self.pause_btn.setText("Pause")
         
         format_info = f" ({format_name})" if format_name != "Text Only" else ""
-        self.status_label.setText(f"Transcribing{format_info}...")
+        batch_info = f" {len(audio_files)} files" if len(audio_files) > 1 else ""
+        self.status_label.setText(f"Transcribing{batch_info}{format_info}...")
+    
+    def service_client(self):
+        """Client for the configured transcription service, or None to transcribe in this process.
+
+        Uses the last background check, and starts a new one for the next job.
+        """
+        client = self.service
+        self.probe_service()
+        return client
+    
+    def cancel_transcription(self):
+        """Abort the running job at its next window boundary"""
+        self.cancel_btn.setEnabled(False)
+        self.pause_btn.setEnabled(False)
+        self.worker.cancel()
+    
+    def toggle_pause(self):
+        if self.worker.control.paused:
+            self.worker.resume()
+            self.pause_btn.setText("Pause")
+        else:
+            self.worker.pause()
+            self.pause_btn.setText("Resume")
+    
+    def show_metrics(self, metrics):
+        """Summarise a finished job's real-time factor and memory peak in the status bar"""
+        if metrics.get('error') or metrics.get('cached') or not metrics.get('real_time_factor'):
+            return
+        summary = f"RTF {metrics['real_time_factor']:.2f}"
+        if metrics.get('audio_seconds'):
+            summary += f" for {format_duration(metrics['audio_seconds'])} of audio"
+        if metrics.get('peak_rss_mb'):
+            summary += f" | peak {metrics['peak_rss_mb'] / 1024:.1f} GB"
+        self.metrics_label.setText(summary)
+        self.metrics_label.setToolTip("\n".join(
+            f"{name}: {seconds:.2f}s" for name, seconds in metrics['stages'].items()))
+    
+    def transcription_cancelled(self):
+        self.status_label.setText("Transcription cancelled")
+        self.progress_bar.setValue(0)
+        self.enable_controls()
     
     def update_progress(self, value):
         self.progress_bar.setValue(value)
@@ -798,44 +1466,24 @@ class MainWindow(QMainWindow):
     def update_status(self, message):
         self.status_label.setText(message)
     
+    def show_segments(self, result):
+        """Show the segment-level transcript while the word timings are still being aligned"""
+        self.live_transcript.flush()
+        if self.live_transcript.segment_count != len(result['segments']):
+            # Nothing was streamed (a cached result): show the segments now
+            self.live_transcript.model.set_segments(result['segments'])
+
     def transcription_finished(self, result):
         try:
-            output_format = getattr(self.worker, 'output_format', 'text')
-            formatted_text = ""
-            
-            # Ensure result is a dictionary
-            if not isinstance(result, dict):
-                formatted_text = str(result)
+            self.result = result
+            self.result_file = self.worker.audio_file
+            self.result_model = self.worker.model_name
+            self.live_transcript.show_result(result)
+            if isinstance(result, Mapping) and 'vad' in result:
+                self.status_label.setText(
+                    f"Transcription completed ({result['vad']['skipped_fraction']:.0%} of the audio skipped as silence)")
             else:
-                if output_format == "srt" and 'segments' in result:
-                    try:
-                        formatted_text = format_srt(result['segments'])
-                    except Exception as e:
-                        formatted_text = f"Error formatting SRT: {str(e)}\n\n{result['text']}"
-                
-                elif output_format == "vtt" and 'segments' in result:
-                    try:
-                        formatted_text = format_vtt(result['segments'])
-                    except Exception as e:
-                        formatted_text = f"Error formatting VTT: {str(e)}\n\n{result['text']}"
-                
-                elif output_format == "word_timestamps":
-                    try:
-                        formatted_text = format_word_timestamps(result)
-                    except Exception as e:
-                        formatted_text = f"Error formatting word timestamps: {str(e)}\n\n{result['text']}"
-                
-                elif output_format == "json":
-                    try:
-                        formatted_text = json.dumps(result, indent=2)
-                    except Exception as e:
-                        formatted_text = f"Error formatting JSON: {str(e)}"
-                
-                else:  # Default to plain text
-                    formatted_text = result.get("text", "No text output available")
-                    
-            self.output_text.setPlainText(formatted_text)
-            self.status_label.setText("Transcription completed")
+                self.status_label.setText("Transcription completed")
             self.enable_controls()
             self.save_btn.setEnabled(True)
             
@@ -844,9 +1492,41 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, "Output Processing Error", error_msg)
             if 'text' in result and isinstance(result['text'], str):
                 # Fallback to plain text if formatting fails
-                self.output_text.setPlainText(result['text'])
+                self.live_transcript.show_text(result['text'])
             self.enable_controls()
     
+    def batch_file_started(self, index, audio_file):
+        """Highlight the file currently being transcribed"""
+        self.live_transcript.start(self.worker.output_format)
+        self.file_list.setCurrentRow(index)
+        item = self.file_list.item(index)
+        if item is not None:
+            item.setToolTip("Transcribing...")
+    
+    def batch_file_finished(self, index, audio_file, result, output_file):
+        """Show the latest finished file and record where its result was written"""
+        item = self.file_list.item(index)
+        if item is not None:
+            item.setToolTip(f"Saved to {output_file}")
+        self.result = Transcript.from_result(result)
+        self.result_file = audio_file
+        self.result_model = self.worker.model_name
+        self.live_transcript.show_result(self.result)
+        self.save_btn.setEnabled(True)
+    
+    def batch_file_failed(self, index, audio_file, error_message):
+        item = self.file_list.item(index)
+        if item is not None:
+            item.setToolTip(f"Failed: {error_message}")
+    
+    def batch_finished(self, results):
+        failed = [(audio_file, error) for audio_file, _, error in results if error]
+        self.status_label.setText(f"Batch completed: {len(results) - len(failed)} succeeded, {len(failed)} failed")
+        self.enable_controls()
+        if failed:
+            details = "\n".join(f"{os.path.basename(audio_file)}: {error}" for audio_file, error in failed)
+            QMessageBox.warning(self, "Some Files Failed", details)
+    
     def transcription_error(self, error_message):
         QMessageBox.critical(self, "Error", f"Transcription failed: {error_message}")
         self.status_label.setText("Error occurred")
@@ -854,21 +1534,77 @@ class MainWindow(QMainWindow):
     
     def enable_controls(self):
         self.transcribe_btn.setEnabled(True)
+        self.pause_btn.setEnabled(False)
+        self.pause_btn.setText("Pause")
+        self.cancel_btn.setEnabled(False)
         self.add_file_btn.setEnabled(True)
         self.model_combo.setEnabled(True)
         self.format_combo.setEnabled(True)
+        self.vad_checkbox.setEnabled(True)
+        self.long_form_checkbox.setEnabled(True)
+        self.int8_checkbox.setEnabled(True)
         
         # Only enable GPU checkbox if GPU is available
-        if torch.cuda.is_available():
+        if self.cuda_info is not None and self.cuda_info['available']:
             self.use_gpu_checkbox.setEnabled(True)
     
     def save_transcription(self):
-        file_name, _ = QFileDialog.getSaveFileName(
+        """Save the last result in the format the file name (or filter) picks, formatted from the result itself"""
+        if self.result is None:
+            return
+        self.result = self.live_transcript.apply_edits(self.result)
+        output_format = self.live_transcript.output_format
+        current_filter = next((name for name, fmt in SAVE_FILTERS.items() if fmt == output_format), "")
+        file_name, selected_filter = QFileDialog.getSaveFileName(
             self,
             "Save Transcription",
-            "",
-            "Text Files (*.txt);;SubRip Subtitle (*.srt);;Word Document (*.docx)"
+            output_file_for(self.result_file, output_format) if self.result_file else "",
+            ";;".join([*SAVE_FILTERS, ALL_FORMATS_FILTER]),
+            current_filter
         )
-        if file_name:
-            with open(file_name, 'w', encoding='utf-8') as f:
-                f.write(self.output_text.toPlainText())
\ No newline at end of file
+        if not file_name:
+            return
+        outputs = self.save_outputs(file_name, selected_filter)
+        saved = list(outputs)
+        try:
+            pane_text = self.live_transcript.edited_text()
+            if pane_text is not None:
+                # Hand edits in the text pane are saved as they are
+                for path in [path for path, fmt in outputs.items() if fmt == output_format]:
+                    with open(path, 'w', encoding='utf-8') as f:
+                        f.write(pane_text)
+                    del outputs[path]
+        except OSError as e:
+            QMessageBox.critical(self, "Save Failed", f"Could not save the transcription: {e}")
+            return
+        if "word_timestamps" in outputs.values() and unaligned_segments(as_dict(self.result)):
+            # Words are aligned on demand; save once the whole file has them
+            self.pending_save = (outputs, saved, file_name)
+            if self.align_worker is not None and self.align_worker.isRunning() or self.align_result_words():
+                self.save_btn.setEnabled(False)
+                self.status_label.setText("Aligning word timestamps before saving...")
+                return
+        self.write_saved_outputs(outputs, saved, file_name)
+
+    def write_saved_outputs(self, outputs, saved, file_name):
+        """Write the result to the files of a save, once any words they show are aligned"""
+        self.pending_save = None
+        self.save_btn.setEnabled(self.result is not None)
+        try:
+            write_result_files(self.result, outputs)
+        except OSError as e:
+            QMessageBox.critical(self, "Save Failed", f"Could not save the transcription: {e}")
+            return
+        self.status_label.setText(f"Saved to {saved[0]}" if len(saved) == 1
+                                  else f"Saved {len(saved)} formats next to {file_name}")
+    
+    def save_outputs(self, file_name, selected_filter):
+        """Map output files to formats for a save: the file's extension decides, then the selected filter"""
+        output_format = output_format_for_path(file_name)
+        if selected_filter == ALL_FORMATS_FILTER:
+            base = file_name[:-len(OUTPUT_EXTENSIONS[output_format])] if output_format else file_name
+            return {base + extension: fmt for fmt, extension in OUTPUT_EXTENSIONS.items()}
+        if output_format is None:
+            output_format = SAVE_FILTERS.get(selected_filter, self.live_transcript.output_format)
+            file_name += OUTPUT_EXTENSIONS[output_format]
+        return {file_name: output_format}
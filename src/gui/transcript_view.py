@@ -0,0 +1,235 @@
+from array import array
+from bisect import bisect_right
+
+from PyQt6.QtWidgets import QApplication, QAbstractItemView, QListView
+from PyQt6.QtCore import Qt, QAbstractListModel, QModelIndex
+from PyQt6.QtGui import QKeySequence
+from core.formatters import SEGMENT_WRITERS, format_timestamp
+from core.transcript import SegmentList
+
+
+class TranscriptModel(QAbstractListModel):
+    """One row per transcript segment, stored in compact arrays.
+
+    Start and end times are float arrays, and the texts are slices of a few
+    shared string buffers addressed by an offset array, so a multi-hour
+    transcript costs a few bytes per segment instead of a dict and a string
+    object each. Each batch of appended rows gets one buffer, so streaming
+    never copies earlier text, and a finished Transcript's own text buffer
+    is used as it is. Word timings are kept the same way. Rows are rendered in
+    the output format only when the view asks for them. Edited texts are
+    kept apart from the buffer (edited rows lose their word timings).
+    """
+    # Output formats shown one segment per row
+    FORMATS = tuple(SEGMENT_WRITERS)
+
+    def __init__(self, output_format="text", parent=None):
+        super().__init__(parent)
+        self.output_format = output_format
+        self._reset_arrays()
+
+    def _reset_arrays(self):
+        self.starts = array('d')
+        self.ends = array('d')
+        self.text_offsets = array('q', [0])  # Row i's text is the buffer between offsets i and i + 1
+        self.has_words = bytearray()
+        self.word_offsets = array('q', [0])  # Row i's words are entries word_offsets[i] to word_offsets[i + 1]
+        self.word_starts = array('d')
+        self.word_ends = array('d')
+        self.word_text_offsets = array('q', [0])
+        self.edits = {}
+        # Buffer k holds the texts and word texts of rows chunk_rows[k] up to the next chunk's first row
+        self.chunk_rows = array('q')
+        self._text_chunks = []
+        self._word_chunks = []
+
+    def _append(self, segments):
+        if not segments:
+            return
+        self.chunk_rows.append(len(self.starts))
+        transcript = segments.transcript if isinstance(segments, SegmentList) else None
+        if transcript is not None and {'start', 'end'} <= transcript.word_columns.keys():
+            self._append_transcript(transcript)
+            return
+        text_parts = []
+        word_parts = []
+        text_end = self.text_offsets[-1]
+        word_text_end = self.word_text_offsets[-1]
+        for segment in segments:
+            self.starts.append(segment['start'])
+            self.ends.append(segment['end'])
+            text = segment['text']
+            text_parts.append(text)
+            text_end += len(text)
+            self.text_offsets.append(text_end)
+            words = segment.get('words')
+            self.has_words.append(words is not None)
+            for word in words or ():
+                self.word_starts.append(word['start'])
+                self.word_ends.append(word['end'])
+                word_parts.append(word['word'])
+                word_text_end += len(word['word'])
+                self.word_text_offsets.append(word_text_end)
+            self.word_offsets.append(len(self.word_starts))
+        self._text_chunks.append("".join(text_parts))
+        self._word_chunks.append("".join(word_parts))
+
+    def _append_transcript(self, transcript):
+        """Append a Transcript's segments straight from its columns, sharing its text buffers"""
+        self.starts.extend(transcript.starts.tolist())
+        self.ends.extend(transcript.ends.tolist())
+        self.text_offsets.extend((transcript.text_offsets[1:] + self.text_offsets[-1]).tolist())
+        self.has_words.extend(transcript.has_words.tobytes())
+        self.word_offsets.extend((transcript.word_offsets[1:] + len(self.word_starts)).tolist())
+        self.word_starts.extend(transcript.word_columns['start'].tolist())
+        self.word_ends.extend(transcript.word_columns['end'].tolist())
+        self.word_text_offsets.extend((transcript.word_text_offsets[1:] + self.word_text_offsets[-1]).tolist())
+        self._text_chunks.append(transcript.texts)
+        self._word_chunks.append(transcript.word_texts)
+
+    def _chunk(self, row):
+        """Index of the buffer holding row's texts"""
+        return bisect_right(self.chunk_rows, row) - 1
+
+    def set_output_format(self, output_format):
+        self.beginResetModel()
+        self.output_format = output_format
+        self.endResetModel()
+
+    def set_segments(self, segments):
+        """Replace the transcript with segments"""
+        self.beginResetModel()
+        self._reset_arrays()
+        self._append(segments)
+        self.endResetModel()
+
+    def append_segments(self, segments):
+        """Add newly decoded segments at the end, in one row insertion"""
+        if not segments:
+            return
+        first = len(self.starts)
+        self.beginInsertRows(QModelIndex(), first, first + len(segments) - 1)
+        self._append(segments)
+        self.endInsertRows()
+
+    def clear(self):
+        self.set_segments([])
+
+    def text(self, row):
+        """Segment text of row, as transcribed or as edited"""
+        if row in self.edits:
+            return self.edits[row]
+        chunk = self._chunk(row)
+        base = self.text_offsets[self.chunk_rows[chunk]]
+        return self._text_chunks[chunk][self.text_offsets[row] - base:self.text_offsets[row + 1] - base]
+
+    def words(self, row):
+        """Word dicts of row, or None when the row has no word timings"""
+        if not self.has_words[row] or row in self.edits:
+            return None
+        chunk = self._chunk(row)
+        words = self._word_chunks[chunk]
+        base = self.word_text_offsets[self.word_offsets[self.chunk_rows[chunk]]]
+        return [{'word': words[self.word_text_offsets[i] - base:self.word_text_offsets[i + 1] - base],
+                 'start': self.word_starts[i], 'end': self.word_ends[i]}
+                for i in range(self.word_offsets[row], self.word_offsets[row + 1])]
+
+    def segment(self, row):
+        segment = {'id': row, 'start': self.starts[row], 'end': self.ends[row], 'text': self.text(row)}
+        words = self.words(row)
+        if words is not None:
+            segment['words'] = words
+        return segment
+
+    def iter_segments(self):
+        """Segment dicts built one at a time, for writers that stream them out"""
+        for row in range(len(self.starts)):
+            yield self.segment(row)
+
+    def write(self, sink, output_format=None):
+        """Write the (edited) transcript to a text sink in a segment-based output format"""
+        writer_class = SEGMENT_WRITERS[output_format or self.output_format]
+        writer_class(sink).write_segments(self.iter_segments())
+
+    def display_text(self, row):
+        text = self.text(row).strip()
+        if self.output_format == "text":
+            return text
+        if self.output_format == "word_timestamps":
+            words = self.words(row)
+            if words is not None:
+                return " ".join(f"[{format_timestamp(word['start'])}] {word['word']}" for word in words)
+            return f"[{format_timestamp(self.starts[row])}] {text}"
+        start = format_timestamp(self.starts[row], always_include_hours=True)
+        end = format_timestamp(self.ends[row], always_include_hours=True)
+        return f"{start} --> {end}  {text}"
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.starts)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or index.row() >= len(self.starts):
+            return None
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self.display_text(index.row())
+        if role == Qt.ItemDataRole.EditRole:
+            return self.text(index.row()).strip()
+        return None
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        if role != Qt.ItemDataRole.EditRole or not index.isValid():
+            return False
+        row = index.row()
+        value = value.strip()
+        if value == self.text(row).strip():
+            return False
+        # Keep Whisper's leading space so plain text output still joins segments with spaces
+        self.edits[row] = " " + value if self.text(row).startswith(" ") else value
+        self.dataChanged.emit(index, index)
+        return True
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.ItemFlag.NoItemFlags
+        return super().flags(index) | Qt.ItemFlag.ItemIsEditable
+
+
+class TranscriptView(QListView):
+    """List view of a TranscriptModel that lays out and paints only the visible rows.
+
+    Rows are single lines of equal height, which lets Qt skip measuring the
+    rest of the transcript. Double-click (or F2) edits a segment's text, and
+    Ctrl+C copies the selected rows as displayed.
+    """
+
+    def __init__(self, model=None, parent=None):
+        super().__init__(parent)
+        self.setModel(model if model is not None else TranscriptModel(parent=self))
+        self.setUniformItemSizes(True)
+        self.setWordWrap(False)
+        self.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        self.setEditTriggers(QAbstractItemView.EditTrigger.DoubleClicked
+                             | QAbstractItemView.EditTrigger.EditKeyPressed)
+
+    def visible_rows(self):
+        """(first, last) rows in the viewport, or None when it shows none"""
+        viewport = self.viewport().rect()
+        first = self.indexAt(viewport.topLeft())
+        if not first.isValid():
+            return None
+        last = self.indexAt(viewport.bottomLeft())
+        return first.row(), last.row() if last.isValid() else self.model().rowCount() - 1
+
+    def at_bottom(self):
+        scrollbar = self.verticalScrollBar()
+        return scrollbar.value() >= scrollbar.maximum() - 1
+
+    def selected_text(self):
+        rows = sorted(index.row() for index in self.selectionModel().selectedIndexes())
+        return "\n".join(self.model().display_text(row) for row in rows)
+
+    def keyPressEvent(self, event):
+        if event.matches(QKeySequence.StandardKey.Copy) and self.state() != QAbstractItemView.State.EditingState:
+            QApplication.clipboard().setText(self.selected_text())
+            return
+        super().keyPressEvent(event)
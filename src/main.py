@@ -1,94 +1,41 @@
 import sys
-import subprocess
-import re
-import os
-import shutil
 from PyQt6.QtWidgets import QApplication
 from gui.main_window import MainWindow
-import torch
+from core.hardware import get_hardware_info, probe_hardware_async
 
-def print_cuda_info():
-    print("\n=== CUDA Information ===")
-    print(f"PyTorch version: {torch.__version__}")
-    print(f"CUDA available: {torch.cuda.is_available()}")
+def print_cuda_info(cuda_info=None):
+    """Print the shared hardware probe results to the terminal"""
+    if cuda_info is None:
+        cuda_info = get_hardware_info()
     
-    cuda_version = None
+    print("\n=== CUDA Information ===")
+    print(f"PyTorch version: {cuda_info['torch_version']}")
+    print(f"CUDA available: {cuda_info['available']}")
     
-    # Try to get CUDA info from PyTorch first
-    if torch.cuda.is_available():
-        try:
-            # Get CUDA version directly from PyTorch (safer approach)
-            if hasattr(torch.cuda, 'get_device_properties'):
-                props = torch.cuda.get_device_properties(0)
-                print(f"CUDA device count: {torch.cuda.device_count()}")
-                print(f"Using GPU: {torch.cuda.get_device_name(0)}")
-                print(f"Compute capability: {props.major}.{props.minor}")
-                print(f"GPU Memory: {props.total_memory / (1024**3):.2f} GB")
-                print(f"GPU Name: {props.name}")
-        except Exception as e:
-            print(f"Could not get detailed GPU information: {e}")
+    if cuda_info['available']:
+        print(f"CUDA device count: {cuda_info['device_count']}")
+        print(f"Using GPU: {cuda_info['device_name']}")
+        print(f"Compute capability: {cuda_info['compute_capability']}")
+        print(f"GPU Memory: {cuda_info['memory_gb']:.2f} GB")
     else:
         print("No CUDA GPU detected through PyTorch")
     
-    # Try to get CUDA version using nvidia-smi
-    try:
-        # Check if nvidia-smi is available using shutil.which
-        nvidia_smi_path = shutil.which("nvidia-smi")
-        if nvidia_smi_path:
-            print(f"Found nvidia-smi at: {nvidia_smi_path}")
-            
-            # First try a simple call with no arguments to verify it works
-            try:
-                result = subprocess.run([nvidia_smi_path], capture_output=True, text=True, timeout=5)
-                if result.returncode == 0:
-                    print("Basic nvidia-smi call succeeded")
-                    
-                    # Extract CUDA version from the direct output (which contains a header with the version)
-                    version_match = re.search(r"CUDA Version: (\d+\.\d+)", result.stdout)
-                    if version_match:
-                        cuda_version = version_match.group(1)
-                        print(f"Extracted CUDA version from nvidia-smi output: {cuda_version}")
-                    else:
-                        print("Could not extract CUDA version from nvidia-smi output")
-                else:
-                    print(f"Basic nvidia-smi call failed with error: {result.stderr}")
-            except subprocess.TimeoutExpired:
-                print("nvidia-smi command timed out")
-            except Exception as e:
-                print(f"Error running basic nvidia-smi: {e}")
+    if cuda_info['nvidia_smi_path']:
+        print(f"Found nvidia-smi at: {cuda_info['nvidia_smi_path']}")
+        if cuda_info['version']:
+            print(f"Extracted CUDA version from nvidia-smi output: {cuda_info['version']}")
         else:
-            print("nvidia-smi not found in PATH")
-            
-            # Try looking for it manually in common locations
-            possible_paths = [
-                os.path.join(os.environ.get('ProgramFiles', 'C:\\Program Files'), 'NVIDIA Corporation\\NVSMI\\nvidia-smi.exe'),
-                os.path.join(os.environ.get('ProgramW6432', 'C:\\Program Files'), 'NVIDIA Corporation\\NVSMI\\nvidia-smi.exe')
-            ]
-            
-            for possible_path in possible_paths:
-                if os.path.exists(possible_path):
-                    print(f"Found nvidia-smi at: {possible_path}")
-                    try:
-                        result = subprocess.run([possible_path], capture_output=True, text=True, timeout=5)
-                        if result.returncode == 0:
-                            print("nvidia-smi call succeeded")
-                            
-                            # Extract CUDA version from output
-                            version_match = re.search(r"CUDA Version: (\d+\.\d+)", result.stdout)
-                            if version_match:
-                                cuda_version = version_match.group(1)
-                                print(f"Extracted CUDA version from nvidia-smi output: {cuda_version}")
-                                break
-                    except Exception as e:
-                        print(f"Error running nvidia-smi from {possible_path}: {e}")
-    except Exception as e:
-        print(f"Error in nvidia-smi detection: {e}")
+            print("Could not extract CUDA version from nvidia-smi output")
+    else:
+        print("nvidia-smi not found")
     
     print("========================\n")
 
 def main():
     app = QApplication(sys.argv)
-    print_cuda_info()
     window = MainWindow()
     window.show()
-    sys.exit(app.exec())
\ No newline at end of file
+    # Log CUDA details in the background instead of delaying the first paint;
+    # the probe is shared with the window, so nvidia-smi runs at most once
+    probe_hardware_async(print_cuda_info)
+    sys.exit(app.exec())
@@ -0,0 +1,21 @@
+"""Shared fixtures for the tests that need a real Whisper model"""
+import torch
+
+
+def small_model():
+    """Random-weight two-layer Whisper with the real vocabulary and mel layout"""
+    from whisper.model import ModelDimensions, Whisper
+    torch.manual_seed(0)
+    dims = ModelDimensions(n_mels=80, n_audio_ctx=1500, n_audio_state=64, n_audio_head=2, n_audio_layer=2,
+                           n_vocab=51865, n_text_ctx=448, n_text_state=64, n_text_head=2, n_text_layer=2)
+    model = Whisper(dims).eval()
+    # The decoder's positional embedding is allocated uninitialised (checkpoints always set it)
+    torch.nn.init.normal_(model.decoder.positional_embedding)
+    return model
+
+
+def save_small_checkpoint(path):
+    """Write small_model() as a checkpoint in the official layout (float16 weights)"""
+    model = small_model()
+    state = {name: tensor.half() for name, tensor in model.state_dict().items()}
+    torch.save({'dims': model.dims.__dict__, 'model_state_dict': state}, path)
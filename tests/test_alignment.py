@@ -0,0 +1,97 @@
+import os
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from core.alignment import segments_in_range, unaligned_segments, alignment_groups, transcript_digest
+from helpers import small_model
+
+
+def segment(start, end, text=" word", **extra):
+    return dict({'start': start, 'end': end, 'text': text}, **extra)
+
+
+class TestAlignmentRanges(unittest.TestCase):
+    def test_range_selects_overlapping_segments(self):
+        segments = [segment(0, 5), segment(5, 12), segment(12, 20), segment(40, 45)]
+        self.assertEqual(segments_in_range(segments), [0, 1, 2, 3])
+        self.assertEqual(segments_in_range(segments, 6, 13), [1, 2])
+        self.assertEqual(segments_in_range(segments, start=20), [3])
+        self.assertEqual(segments_in_range(segments, end=5), [0])
+
+    def test_only_segments_without_words_need_alignment(self):
+        result = {'segments': [segment(0, 5, words=[]), segment(5, 12), segment(12, 20)]}
+        self.assertEqual(unaligned_segments(result), [1, 2])
+        self.assertEqual(unaligned_segments(result, 0, 6), [1])
+
+    def test_groups_fit_one_window_and_stay_contiguous(self):
+        segments = [segment(0, 10), segment(10, 25), segment(25, 35), segment(35, 40), segment(100, 110)]
+        self.assertEqual(alignment_groups(segments, [0, 1, 2, 3, 4]), [[0, 1], [2, 3], [4]])
+        self.assertEqual(alignment_groups(segments, [0, 2, 3]), [[0], [2, 3]])
+
+    def test_digest_follows_the_transcript_not_the_words(self):
+        result = {'language': "en", 'segments': [segment(0, 5, tokens=[1, 2])]}
+        digest = transcript_digest(result)
+        result['segments'][0]['words'] = [{'word': " a", 'start': 0.0, 'end': 1.0}]
+        self.assertEqual(transcript_digest(result), digest)
+        result['segments'][0]['tokens'] = [1, 3]
+        self.assertNotEqual(transcript_digest(result), digest)
+
+
+class TestAlignWords(unittest.TestCase):
+    def setUp(self):
+        import core.result_cache as result_cache
+        self.model = small_model()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.audio_file = os.path.join(self.temp_dir.name, "clip.wav")
+        open(self.audio_file, 'wb').write(b"fake audio bytes")
+        self.audio = np.random.default_rng(0).standard_normal(50 * 16000).astype(np.float32) * 0.1
+        # Keep stored alignments out of the user's result cache
+        self.saved_cache = result_cache._result_cache
+        result_cache._result_cache = result_cache.ResultCache(os.path.join(self.temp_dir.name, "cache"))
+
+    def tearDown(self):
+        import core.result_cache as result_cache
+        result_cache._result_cache = self.saved_cache
+        self.temp_dir.cleanup()
+
+    def result(self):
+        from whisper.tokenizer import get_tokenizer
+        tokenizer = get_tokenizer(self.model.is_multilingual, num_languages=self.model.num_languages, language="en")
+        texts = [" Hello there.", " How are you?", " Fine, thanks."]
+        spans = [(0.0, 4.0), (4.0, 9.5), (38.0, 42.0)]
+        return {'text': "".join(texts), 'language': "en", 'segments': [
+            segment(start, end, text, tokens=tokenizer.encode(text)) for (start, end), text in zip(spans, texts)]}
+
+    def test_aligns_requested_range_and_reuses_stored_words(self):
+        from core.pipeline import align_words, cached_words
+        result = self.result()
+        align_words(self.model, self.audio_file, result, "test", start=0, end=10, audio_data=self.audio)
+        segments = result['segments']
+        self.assertEqual([len(s['words']) for s in segments[:2]], [2, 3])
+        self.assertNotIn('words', segments[2])
+        for s in segments[:2]:
+            self.assertEqual("".join(word['word'] for word in s['words']), s['text'])
+            # Words fall inside the audio of their group, whatever the (random) model makes of it
+            self.assertTrue(all(0 <= word['start'] <= word['end'] <= 9.5 for word in s['words']))
+        # Segment timing is left as transcribed
+        self.assertEqual((segments[1]['start'], segments[1]['end']), (4.0, 9.5))
+
+        fresh = cached_words(self.audio_file, self.result(), "test")
+        self.assertEqual(fresh['segments'][1]['words'], segments[1]['words'])
+        self.assertNotIn('words', fresh['segments'][2])
+
+        # Everything in range is stored, so no audio or model is needed the second time
+        again = align_words(None, self.audio_file, self.result(), "test", end=10)
+        self.assertEqual(again['segments'][0]['words'], segments[0]['words'])
+
+        align_words(self.model, self.audio_file, result, "test", audio_data=self.audio)
+        self.assertTrue(all(38 <= word['start'] <= word['end'] <= 42 for word in result['segments'][2]['words']))
+
+
+if __name__ == '__main__':
+    unittest.main()
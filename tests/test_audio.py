@@ -0,0 +1,50 @@
+import io
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from core.audio import read_pcm_stream
+
+
+class OddSizedReads(io.RawIOBase):
+    """Stream that returns short, odd-sized reads like a pipe can"""
+    def __init__(self, data, read_size=777):
+        self.data = data
+        self.position = 0
+        self.read_size = read_size
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        count = min(len(buffer), self.read_size, len(self.data) - self.position)
+        buffer[:count] = self.data[self.position:self.position + count]
+        self.position += count
+        return count
+
+
+class TestReadPcmStream(unittest.TestCase):
+    def setUp(self):
+        self.samples = (np.random.default_rng(0).standard_normal(50001) * 3000).astype(np.int16)
+        self.expected = self.samples.astype(np.float32) / 32768.0
+
+    def test_matches_full_buffer_conversion(self):
+        audio = read_pcm_stream(OddSizedReads(self.samples.tobytes()), len(self.samples), block_size=4096)
+        self.assertEqual(audio.dtype, np.float32)
+        np.testing.assert_allclose(audio, self.expected)
+
+    def test_grows_when_length_is_underestimated(self):
+        audio = read_pcm_stream(OddSizedReads(self.samples.tobytes()), 1000, block_size=4096)
+        np.testing.assert_allclose(audio, self.expected)
+
+    def test_empty_stream(self):
+        audio = read_pcm_stream(io.BytesIO(b""))
+        self.assertEqual(len(audio), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
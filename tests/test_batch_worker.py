@@ -0,0 +1,140 @@
+import os
+import sys
+import tempfile
+import unittest
+import wave
+from unittest import mock
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from PyQt6.QtWidgets import QApplication
+from src.gui.main_window import BatchTranscriptionWorker, TranscriptionWorker
+import core.pipeline as pipeline
+from helpers import small_model
+
+
+def write_wav(path, seconds):
+    samples = (np.sin(np.arange(int(seconds * 16000)) * 0.05) * 8000).astype(np.int16)
+    with wave.open(path, 'wb') as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(16000)
+        f.writeframes(samples.tobytes())
+
+
+class StubModelWorker(BatchTranscriptionWorker):
+    """Batch worker whose "model" returns one segment per file and fails on files named bad*"""
+
+    def load_model(self):
+        self.report_progress(10)
+        return object()
+
+    def transcribe_audio(self, model, audio_data=None):
+        self.report_progress(50)
+        if os.path.basename(self.audio_file).startswith("bad"):
+            raise RuntimeError("decoder exploded")
+        name = os.path.basename(self.audio_file)
+        return {'text': f" {name}", 'segments': [{'start': 0.0, 'end': 1.0, 'text': f" {name}"}], 'language': "en"}
+
+
+class AligningStubWorker(TranscriptionWorker):
+    """Worker whose transcription is canned but whose word alignment runs on a real (tiny) model"""
+
+    def load_model(self):
+        return small_model()
+
+    def transcribe_audio(self, model, audio_data=None):
+        self.transcribed_with = audio_data
+        return {'text': " hello world", 'language': "en",
+                'segments': [{'start': 0.0, 'end': 1.0, 'text': " hello world"}]}
+
+
+class TestTranscriptionWorker(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication(sys.argv)
+
+    def test_audio_is_decoded_once_for_transcription_and_alignment(self):
+        with tempfile.TemporaryDirectory() as directory:
+            audio_file = os.path.join(directory, "clip.wav")
+            write_wav(audio_file, 1)
+            worker = AligningStubWorker("tiny", audio_file, use_gpu=False, show_terminal_progress=False)
+            worker.use_result_cache = False
+            worker.align_words = True
+            results = []
+            worker.finished.connect(results.append)
+            with mock.patch.object(pipeline, 'load_audio', wraps=pipeline.load_audio) as load_audio:
+                # Run on this thread: after word alignment on another thread, the test process hangs at exit
+                worker.run()
+        self.assertEqual(load_audio.call_count, 1)
+        self.assertEqual(len(worker.transcribed_with), 16000)
+        self.assertEqual(len(results), 1)
+
+
+class TestBatchTranscriptionWorker(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication(sys.argv)
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.files = [os.path.join(self.temp_dir.name, name) for name in ("one.wav", "bad.wav", "three.wav")]
+        for path in self.files:
+            write_wav(path, 1)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def run_worker(self):
+        worker = StubModelWorker("tiny", self.files, use_gpu=False, show_terminal_progress=False)
+        worker.use_result_cache = False
+        events = []
+        worker.file_started.connect(lambda index, path: events.append(("started", index)))
+        worker.file_finished.connect(lambda index, path, result, output: events.append(("finished", index, output)))
+        worker.file_failed.connect(lambda index, path, error: events.append(("failed", index, error)))
+        worker.file_progress.connect(lambda percent: events.append(("file_progress", percent)))
+        worker.progress.connect(lambda percent: events.append(("progress", percent)))
+        worker.finished.connect(lambda results: events.append(("done", results)))
+        worker.error.connect(lambda message: events.append(("error", message)))
+        worker.start()
+        self.assertTrue(worker.wait(30000))
+        # Signals from the worker and writer threads are queued for this thread
+        self.app.processEvents()
+        return events
+
+    def test_failed_file_does_not_stop_the_queue(self):
+        events = self.run_worker()
+        files = [event[:2] for event in events if event[0] in ("started", "finished", "failed")]
+        # Results are written behind the model, so file 0 may finish after file 1 starts
+        self.assertEqual([event for event in files if event[0] == "started"],
+                         [("started", 0), ("started", 1), ("started", 2)])
+        for index, outcome in ((0, "finished"), (1, "failed"), (2, "finished")):
+            self.assertLess(files.index(("started", index)), files.index((outcome, index)))
+        self.assertEqual(files.index(("failed", 1)), files.index(("started", 1)) + 1)
+        self.assertNotIn("error", [event[0] for event in events])
+
+        failed = next(event for event in events if event[0] == "failed")
+        self.assertIn("decoder exploded", failed[2])
+        with open(os.path.join(self.temp_dir.name, "three.txt"), encoding='utf-8') as f:
+            self.assertEqual(f.read().strip(), "three.wav")
+        self.assertFalse(os.path.exists(os.path.join(self.temp_dir.name, "bad.txt")))
+
+        # The batch ends with one summary after every file has been reported
+        self.assertEqual(events[-1][0], "done")
+        self.assertEqual({os.path.basename(path): error is None for path, _, error in events[-1][1]},
+                         {"one.wav": True, "bad.wav": False, "three.wav": True})
+
+    def test_progress_covers_each_file_and_the_whole_queue(self):
+        events = self.run_worker()
+        overall = [event[1] for event in events if event[0] == "progress"]
+        self.assertEqual(overall, sorted(overall))
+        self.assertEqual(overall[-1], 100)
+        # The second file's 50% is half way through the queue's second third
+        self.assertIn(int((1 + 0.5) / 3 * 100), overall)
+        self.assertIn(("file_progress", 50), events)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import os
+import sys
+import tempfile
+import unittest
+import wave
+from types import SimpleNamespace
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from core.batching import BatchDecoder, segments_from_tokens, split_windows, batching_supported, WINDOW_SECONDS
+from core.progress import JobControl, TranscriptionCancelled
+from core.pipeline import transcribe_files_batched
+from helpers import small_model
+
+SR = 16000
+
+
+class FakeTokenizer:
+    eot = 100
+    timestamp_begin = 200
+
+    def decode(self, tokens):
+        return "".join(f" w{token}" for token in tokens)
+
+
+class TestBatching(unittest.TestCase):
+    def test_segments_from_timestamp_tokens(self):
+        # <|0.00|> 1 2 <|1.00|><|1.00|> 3 <|2.50|> 4 (unterminated)
+        decoded = SimpleNamespace(tokens=[200, 1, 2, 250, 250, 3, 325, 4], temperature=0.0,
+                                  avg_logprob=-0.2, compression_ratio=1.1, no_speech_prob=0.01)
+        segments = segments_from_tokens(decoded, FakeTokenizer(), duration=4.0)
+        self.assertEqual([(s['start'], s['end'], s['text']) for s in segments],
+                         [(0.0, 1.0, " w1 w2"), (1.0, 2.5, " w3"), (2.5, 4.0, " w4")])
+
+    def test_windows_fit_the_encoder(self):
+        self.assertEqual(split_windows(np.zeros(10 * SR, dtype=np.float32)), [(0, 10 * SR)])
+        audio = np.random.default_rng(0).standard_normal(95 * SR).astype(np.float32)
+        windows = split_windows(audio)
+        self.assertEqual((windows[0][0], windows[-1][1]), (0, len(audio)))
+        for (start, end), (next_start, _) in zip(windows, windows[1:]):
+            self.assertEqual(end, next_start)
+        self.assertTrue(all(end - start <= WINDOW_SECONDS * SR for start, end in windows))
+
+    def test_word_timestamps_are_not_batched(self):
+        self.assertFalse(batching_supported({'word_timestamps': True}))
+        self.assertTrue(batching_supported({'word_timestamps': False, 'verbose': True}))
+
+    def test_files_are_reported_started_before_they_are_decoded(self):
+        model = small_model()
+        with tempfile.TemporaryDirectory() as directory:
+            files = []
+            for name in ("a", "b", "c"):
+                files.append(os.path.join(directory, f"{name}.wav"))
+                with wave.open(files[-1], 'wb') as f:
+                    f.setnchannels(1)
+                    f.setsampwidth(2)
+                    f.setframerate(SR)
+                    f.writeframes(np.zeros(SR, dtype=np.int16).tobytes())
+            events = []
+            for index, _, result, audio_data, error in transcribe_files_batched(
+                    model, files, "test", format_options={'language': "en", 'temperature': 0.0}, batch_size=2,
+                    use_cache=False,
+                    file_started=lambda index, audio_file: events.append(("started", index))):
+                self.assertIsNone(error)
+                self.assertEqual(len(audio_data), SR)
+                events.append(("done", index))
+        # Files 0 and 1 share the first batch; file 2 is decoded when the queue is flushed
+        self.assertEqual(events, [("started", 0), ("started", 1), ("done", 0), ("done", 1),
+                                  ("started", 2), ("done", 2)])
+
+    def test_cancel_stops_a_batch_between_decoder_steps(self):
+        model = small_model()
+        control = JobControl()
+        steps = []
+
+        def step(module, inputs):
+            steps.append(len(steps))
+            if len(steps) == 3:
+                control.cancel()
+
+        model.decoder.register_forward_pre_hook(step)
+        decoder = BatchDecoder(model, batch_size=2, control=control, language="en", temperature=0.0)
+        decoder.add(0, np.zeros(SR, dtype=np.float32))
+        with self.assertRaises(TranscriptionCancelled):
+            decoder.add(1, np.zeros(SR, dtype=np.float32))
+        # The batch stops at the next decoder step instead of decoding up to 224 tokens
+        self.assertEqual(len(steps), 3)
+        self.assertEqual(len(model.decoder._forward_pre_hooks), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from core.binary_transcript import (
+    TranscriptFormatError, TranscriptReader, export_transcript, read_transcript, write_transcript
+)
+from core.formatters import format_result, write_result_next_to_source
+from test_transcript import make_result
+
+
+class TestBinaryTranscript(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "talk.wtr")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_round_trip_is_exact(self):
+        result = make_result(1500)
+        for compress in (True, False):
+            write_transcript(result, self.path, compress=compress, block_segments=100)
+            self.assertEqual(json.dumps(read_transcript(self.path).to_dict()), json.dumps(result))
+        write_transcript({'text': "", 'segments': []}, self.path)
+        self.assertEqual(read_transcript(self.path).to_dict(), {'text': "", 'segments': []})
+
+    def test_results_without_tokens(self):
+        # Hand-written or converted results may have no token lists
+        plain = {'text': " a b", 'segments': [{'start': 0.0, 'end': 1.0, 'text': " a"},
+                                               {'start': 1.0, 'end': 2.0, 'text': " b"}]}
+        write_transcript(plain, self.path, block_segments=1)
+        self.assertEqual(read_transcript(self.path).to_dict(), plain)
+        with TranscriptReader(self.path) as reader:
+            output = io.StringIO()
+            reader.export(output, "srt")
+        self.assertEqual(output.getvalue(), format_result(plain, "srt"))
+
+    def test_exports_match_the_formatters(self):
+        result = make_result(700)
+        write_transcript(result, self.path, block_segments=64)
+        with TranscriptReader(self.path) as reader:
+            self.assertEqual(len(reader), 700)
+            for output_format in ("text", "srt", "vtt", "word_timestamps", "json"):
+                output = io.StringIO()
+                reader.export(output, output_format)
+                self.assertEqual(output.getvalue(), format_result(result, output_format))
+        output_file = export_transcript(self.path, os.path.join(self.temp_dir.name, "talk.srt"), "srt")
+        with open(output_file, encoding='utf-8') as f:
+            self.assertEqual(f.read(), format_result(result, "srt"))
+
+    def test_time_range_reads_only_overlapping_blocks(self):
+        result = make_result(2000)
+        write_transcript(result, self.path, block_segments=50)
+        with TranscriptReader(self.path) as reader:
+            # Segments start every 2.37 s, so 1000-1010 s falls in segment 421's block
+            self.assertEqual(list(reader.blocks_in_range(1000, 1010)), [8])
+            segments = list(reader.segments(1000, 1010))
+        expected = [segment for segment in result['segments'] if segment['end'] > 1000 and segment['start'] < 1010]
+        self.assertEqual([dict(segment) for segment in segments], expected)
+
+        with TranscriptReader(self.path) as reader:
+            output = io.StringIO()
+            reader.export(output, "json", 1000, 1010)
+        exported = json.loads(output.getvalue())
+        self.assertEqual(exported['segments'], expected)
+        self.assertEqual(exported['text'], "".join(segment['text'] for segment in expected))
+        self.assertEqual(exported['language'], "en")
+
+    def test_binary_output_format_and_bad_files(self):
+        audio_file = os.path.join(self.temp_dir.name, "talk.wav")
+        output_file = write_result_next_to_source(make_result(10), audio_file, "binary")
+        self.assertEqual(output_file, self.path)
+        self.assertEqual(len(read_transcript(output_file)['segments']), 10)
+
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write("WEBVTT\n")
+        with self.assertRaises(TranscriptFormatError):
+            TranscriptReader(self.path)
+
+
+if __name__ == '__main__':
+    unittest.main()
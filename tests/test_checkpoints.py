@@ -0,0 +1,61 @@
+import os
+import sys
+import tempfile
+import threading
+import unittest
+
+import torch
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from core.checkpoints import _meta_construction, load_mmap_model, mmap_checkpoint_path, mmap_checkpoint_exists
+from helpers import save_small_checkpoint
+
+
+class TestMmapCheckpoints(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.checkpoint = os.path.join(self.temp_dir.name, "small.pt")
+        self.cache_dir = os.path.join(self.temp_dir.name, "mmap")
+        save_small_checkpoint(self.checkpoint)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_mapped_model_matches_regular_load(self):
+        import whisper
+        expected = whisper.load_model(self.checkpoint, device="cpu")
+        self.assertFalse(mmap_checkpoint_exists(self.checkpoint, self.cache_dir))
+        converted = load_mmap_model(self.checkpoint, self.cache_dir)
+        self.assertTrue(mmap_checkpoint_exists(self.checkpoint, self.cache_dir))
+        mapped = load_mmap_model(self.checkpoint, self.cache_dir)
+
+        mel = torch.randn(1, 80, 3000)
+        with torch.no_grad():
+            reference = expected.encoder(mel)
+            for model in (converted, mapped):
+                self.assertTrue(torch.equal(model.encoder(mel), reference))
+                for name, tensor in expected.state_dict().items():
+                    self.assertTrue(torch.equal(model.state_dict()[name], tensor), name)
+        self.assertTrue(torch.equal(mapped.alignment_heads.to_dense(), expected.alignment_heads.to_dense()))
+        self.assertFalse(any(tensor.is_meta for tensor in [*mapped.parameters(), *mapped.buffers()]))
+
+    def test_other_threads_build_initialised_modules(self):
+        built = []
+        with _meta_construction():
+            self.assertTrue(torch.nn.Linear(4, 4).weight.is_meta)
+            # e.g. a prefetch worker loading another model while this one is mapped
+            thread = threading.Thread(target=lambda: built.append(torch.nn.Linear(64, 64)))
+            thread.start()
+            thread.join()
+        self.assertFalse(built[0].weight.is_meta)
+        self.assertGreater(built[0].weight.abs().sum().item(), 0)
+
+    def test_changed_checkpoint_gets_a_new_file(self):
+        first = mmap_checkpoint_path(self.checkpoint, self.cache_dir)
+        os.utime(self.checkpoint, ns=(0, 0))
+        self.assertNotEqual(first, mmap_checkpoint_path(self.checkpoint, self.cache_dir))
+
+
+if __name__ == '__main__':
+    unittest.main()
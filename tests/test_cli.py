@@ -0,0 +1,44 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from cli import collect_audio_files, build_format_options, needs_word_alignment
+
+
+class TestCli(unittest.TestCase):
+    def test_collects_directories_and_globs(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            for name in ("a.mp3", "b.WAV", "notes.txt"):
+                open(os.path.join(tmp, name), 'w').close()
+            os.mkdir(os.path.join(tmp, "sub"))
+            open(os.path.join(tmp, "sub", "c.flac"), 'w').close()
+
+            from_dir = collect_audio_files([tmp])
+            self.assertEqual([os.path.basename(f) for f in from_dir], ["a.mp3", "b.WAV"])
+
+            recursive = collect_audio_files([tmp], recursive=True)
+            self.assertEqual(len(recursive), 3)
+
+            from_glob = collect_audio_files([os.path.join(tmp, "*.mp3"), os.path.join(tmp, "a.mp3")])
+            self.assertEqual(len(from_glob), 1)
+
+    def test_words_are_aligned_separately_and_only_for_word_output(self):
+        # Whisper's inline alignment is never requested; word output gets a separate pass
+        self.assertFalse(build_format_options(["srt", "json", "word_timestamps"])["word_timestamps"])
+        self.assertFalse(needs_word_alignment(["text", "srt", "json"]))
+        self.assertTrue(needs_word_alignment(["srt", "word_timestamps"]))
+
+    def test_does_not_import_qt(self):
+        src_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+        output = subprocess.run(
+            [sys.executable, "-c", "import sys, cli; print(any(m.startswith('PyQt6') for m in sys.modules))"],
+            cwd=src_dir, capture_output=True, text=True, check=True
+        ).stdout
+        self.assertEqual(output.strip(), "False")
+
+if __name__ == '__main__':
+    unittest.main()
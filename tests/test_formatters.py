@@ -0,0 +1,69 @@
+import io
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from core.formatters import format_srt, format_vtt, format_word_timestamps, write_result, write_result_next_to_source, SrtWriter
+from core.formatters import format_result, output_format_for_path, write_results_next_to_source
+
+RESULT = {
+    'text': " Hello there. General Kenobi.",
+    'segments': [
+        {'start': 0.0, 'end': 1.5, 'text': " Hello there.",
+         'words': [{'word': " Hello", 'start': 0.0, 'end': 0.5}, {'word': " there.", 'start': 0.6, 'end': 1.5}]},
+        {'start': 3661.25, 'end': 3663.0, 'text': " General Kenobi."}
+    ]
+}
+
+
+class TestFormatters(unittest.TestCase):
+    def test_srt(self):
+        self.assertEqual(format_srt(RESULT['segments']),
+                         "1\n00:00:00,000 --> 00:00:01,500\nHello there.\n\n"
+                         "2\n01:01:01,250 --> 01:01:03,000\nGeneral Kenobi.\n\n")
+
+    def test_vtt(self):
+        self.assertEqual(format_vtt(RESULT['segments']),
+                         "WEBVTT\n\n00:00:00.000 --> 00:00:01.500\nHello there.\n\n"
+                         "01:01:01.250 --> 01:01:03.000\nGeneral Kenobi.\n\n")
+
+    def test_word_timestamps(self):
+        self.assertEqual(format_word_timestamps(RESULT),
+                         "[00:00.000]  Hello [00:00.600]  there. \n[01:01:01.250] General Kenobi.\n")
+        self.assertEqual(format_word_timestamps({'text': ""}), "No word timestamps available in results.")
+
+    def test_segments_stream_as_they_are_written(self):
+        sink = io.StringIO()
+        writer = SrtWriter(sink)
+        writer.begin()
+        writer.write_segment(RESULT['segments'][0])
+        self.assertTrue(sink.getvalue().startswith("1\n00:00:00,000"))
+        writer.write_segment(RESULT['segments'][1])
+        writer.end()
+        self.assertEqual(sink.getvalue(), format_srt(RESULT['segments']))
+
+    def test_write_next_to_source(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            output = write_result_next_to_source(RESULT, os.path.join(tmp, "talk.mp3"), "vtt")
+            self.assertEqual(output, os.path.join(tmp, "talk.vtt"))
+            with open(output, encoding='utf-8') as f:
+                self.assertEqual(f.read(), format_vtt(RESULT['segments']))
+            sink = io.StringIO()
+            write_result(RESULT, "json", sink)
+            self.assertIn('"General Kenobi."', sink.getvalue().replace('" ', '"'))
+
+    def test_several_formats_in_one_pass(self):
+        formats = ["text", "srt", "vtt", "word_timestamps", "json"]
+        with tempfile.TemporaryDirectory() as tmp:
+            outputs = write_results_next_to_source(RESULT, os.path.join(tmp, "talk.mp3"), formats)
+            self.assertEqual([output_format_for_path(output) for output in outputs], formats)
+            for output, output_format in zip(outputs, formats):
+                with open(output, encoding='utf-8') as f:
+                    self.assertEqual(f.read(), format_result(RESULT, output_format))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import os
+import stat
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from core import hardware
+
+NVIDIA_SMI_SCRIPT = """#!/bin/sh
+echo run >> "{calls}"
+echo "| NVIDIA-SMI 550.54.14    Driver Version: 550.54.14    CUDA Version: 12.4     |"
+"""
+
+
+@unittest.skipIf(os.name == 'nt', "uses a shell script as a stand-in for nvidia-smi")
+class TestHardwareProbe(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.calls = os.path.join(self.tmp.name, "calls")
+        script = os.path.join(self.tmp.name, "nvidia-smi")
+        with open(script, 'w') as f:
+            f.write(NVIDIA_SMI_SCRIPT.format(calls=self.calls))
+        os.chmod(script, os.stat(script).st_mode | stat.S_IEXEC)
+
+        self.saved = (os.environ.get('PATH'), hardware.CACHE_FILE)
+        os.environ['PATH'] = self.tmp.name + os.pathsep + os.environ.get('PATH', '')
+        hardware.CACHE_FILE = os.path.join(self.tmp.name, "hardware.json")
+        hardware.clear_memoized()
+
+    def tearDown(self):
+        os.environ['PATH'], hardware.CACHE_FILE = self.saved
+        hardware.clear_memoized()
+        self.tmp.cleanup()
+
+    def call_count(self):
+        if not os.path.exists(self.calls):
+            return 0
+        with open(self.calls) as f:
+            return len(f.readlines())
+
+    def test_parses_versions(self):
+        info = hardware.get_nvidia_smi_info()
+        self.assertEqual(info['status'], hardware.STATUS_OK)
+        self.assertEqual(info['cuda_version'], "12.4")
+        self.assertEqual(info['driver_version'], "550.54.14")
+
+    def test_memoized_and_persisted(self):
+        hardware.get_nvidia_smi_info()
+        hardware.get_nvidia_smi_info()
+        self.assertEqual(self.call_count(), 1)
+
+        # A new process (simulated by clearing the memo) reads the cache file instead
+        hardware.clear_memoized()
+        self.assertEqual(hardware.get_nvidia_smi_info()['cuda_version'], "12.4")
+        self.assertEqual(self.call_count(), 1)
+
+    def test_cache_invalidated_by_driver_change(self):
+        hardware.get_nvidia_smi_info()
+        hardware.clear_memoized()
+        # Reinstalling the driver replaces nvidia-smi
+        script = os.path.join(self.tmp.name, "nvidia-smi")
+        with open(script, 'a') as f:
+            f.write("\n")
+        hardware.get_nvidia_smi_info()
+        self.assertEqual(self.call_count(), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,133 @@
+import json
+import os
+import sys
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from core.instrumentation import (
+    JobMetrics, MetricsLog, collect_metrics, current_rss_mb, instrument_model, peak_rss_mb, stage
+)
+from core.pipeline import BackgroundWriter
+
+
+class TestInstrumentation(unittest.TestCase):
+    def test_nested_stages_report_exclusive_times(self):
+        metrics = JobMetrics("a.wav", "tiny", "cpu")
+        with collect_metrics(metrics):
+            with stage("transcribe"):
+                time.sleep(0.02)
+                with stage("decoder"):
+                    time.sleep(0.05)
+        self.assertGreaterEqual(metrics.stages['decoder'], 0.05)
+        self.assertLess(metrics.stages['transcribe'], 0.05)
+        self.assertAlmostEqual(metrics.processing_seconds, 0.07, delta=0.03)
+
+    def test_stages_outside_a_job_are_ignored(self):
+        metrics = JobMetrics()
+        with stage("decode"):
+            pass
+        with collect_metrics(metrics):
+            with collect_metrics(None):
+                with stage("decode"):
+                    pass
+        self.assertEqual(metrics.stages, {})
+
+    def test_real_time_factor_and_record(self):
+        metrics = JobMetrics("a.wav", "tiny", "cpu")
+        metrics.audio_seconds = 10.0
+        metrics.add("encoder", 1.0)
+        metrics.add("decoder", 1.5)
+        record = metrics.finish().to_dict()
+        self.assertAlmostEqual(record['real_time_factor'], 0.25)
+        self.assertEqual(record['stages'], {'encoder': 1.0, 'decoder': 1.5})
+        if peak_rss_mb() is not None:
+            self.assertGreater(record['peak_rss_mb'], 0)
+
+    def test_peak_memory_is_the_jobs_own(self):
+        if current_rss_mb() is None:
+            self.skipTest("current resident memory cannot be read here")
+        # An earlier, larger job raises the process-lifetime peak...
+        np.ones(300 * 1024 * 1024 // 8).sum()
+        metrics = JobMetrics("a.wav", "tiny", "cpu")
+        with collect_metrics(metrics):
+            with stage("decode"):
+                pass
+        # ...but not what a small job reports
+        self.assertLess(metrics.finish().peak_rss_mb, peak_rss_mb() - 200)
+
+    def test_gpu_peak_is_the_jobs_own(self):
+        import torch
+        allocator = {'current': 0, 'peak': 0}
+
+        def allocate(mb):
+            allocator['current'] = mb * 1024 * 1024
+            allocator['peak'] = max(allocator['peak'], allocator['current'])
+
+        def reset_peak():
+            allocator['peak'] = allocator['current']
+
+        def run_job(mb):
+            metrics = JobMetrics("a.wav", "tiny", "cuda")
+            with collect_metrics(metrics):
+                allocate(mb)
+                allocate(0)
+            # The job's output is saved under a second collection, which must not reset the peak
+            with collect_metrics(metrics):
+                pass
+            return metrics.finish().peak_gpu_mb
+
+        with mock.patch.object(torch.cuda, 'is_available', return_value=True), \
+                mock.patch.object(torch.cuda, 'reset_peak_memory_stats', side_effect=reset_peak), \
+                mock.patch.object(torch.cuda, 'max_memory_allocated', side_effect=lambda: allocator['peak']):
+            self.assertEqual(run_job(900), 900)
+            self.assertEqual(run_job(100), 100)
+
+    def test_failed_forward_closes_its_stage(self):
+        import torch
+
+        class Failing(torch.nn.Module):
+            def forward(self, x):
+                raise RuntimeError("out of memory")
+
+        model = torch.nn.Module()
+        model.encoder = Failing()
+        instrument_model(model)
+        metrics = JobMetrics("a.wav", "tiny", "cpu")
+        with collect_metrics(metrics):
+            with stage("transcribe"):
+                with self.assertRaises(RuntimeError):
+                    model.encoder(torch.zeros(1))
+                time.sleep(0.02)
+        self.assertIn("encoder", metrics.stages)
+        # The transcribe stage was closed by its own block, not absorbed by the encoder's
+        self.assertGreaterEqual(metrics.stages['transcribe'], 0.02)
+
+    def test_writer_records_format_and_save_and_log_appends_lines(self):
+        with tempfile.TemporaryDirectory() as directory:
+            audio_file = os.path.join(directory, "clip.wav")
+            metrics = JobMetrics(audio_file, "tiny", "cpu")
+            writer = BackgroundWriter()
+            segments = [{'start': i, 'end': i + 1, 'text': f" segment {i}"} for i in range(200)]
+            writer.submit(0, audio_file, {'text': "", 'segments': segments}, ["srt"], metrics=metrics)
+            writer.close()
+            self.assertIn("format", metrics.stages)
+            self.assertIn("save", metrics.stages)
+
+            log_file = os.path.join(directory, "logs", "metrics.jsonl")
+            log = MetricsLog(log_file)
+            log.write(metrics.finish())
+            log.write(JobMetrics("other.wav").finish("boom"))
+            with open(log_file, encoding='utf-8') as f:
+                records = [json.loads(line) for line in f]
+        self.assertEqual([record['audio_file'] for record in records], [audio_file, "other.wav"])
+        self.assertEqual(records[1]['error'], "boom")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from core.audio import SAMPLE_RATE
+from core.longform import find_silence_splits, offset_result, stitch_results
+
+
+class TestLongForm(unittest.TestCase):
+    def test_short_audio_is_one_chunk(self):
+        audio = np.zeros(10 * SAMPLE_RATE, dtype=np.float32)
+        self.assertEqual(find_silence_splits(audio, chunk_seconds=10), [(0, len(audio))])
+
+    def test_splits_land_in_silence(self):
+        # 60 s of noise with a one-second silence at 22 s and 41 s
+        audio = np.random.default_rng(0).standard_normal(60 * SAMPLE_RATE).astype(np.float32)
+        for silence in (22, 41):
+            audio[silence * SAMPLE_RATE:(silence + 1) * SAMPLE_RATE] = 0
+        chunks = find_silence_splits(audio, chunk_seconds=20, search_seconds=5)
+        self.assertEqual(chunks[0][0], 0)
+        self.assertEqual(chunks[-1][1], len(audio))
+        for (_, end), (start, _) in zip(chunks, chunks[1:]):
+            self.assertEqual(end, start)
+        for _, end in chunks[:-1]:
+            self.assertTrue(np.all(audio[end - 100:end + 100] == 0))
+
+    def test_stitch_offsets_timestamps(self):
+        first = {'text': ' a', 'language': 'en', 'segments': [{'id': 0, 'start': 0.0, 'end': 1.0, 'text': ' a'}]}
+        second = {'text': ' b', 'language': 'en', 'segments': [
+            {'id': 0, 'start': 0.5, 'end': 2.0, 'text': ' b', 'words': [{'word': ' b', 'start': 0.5, 'end': 2.0}]}
+        ]}
+        result = stitch_results([offset_result(first, 0.0), offset_result(second, 300.0)])
+        self.assertEqual(result['text'], ' a b')
+        self.assertEqual([s['id'] for s in result['segments']], [0, 1])
+        self.assertEqual(result['segments'][1]['start'], 300.5)
+        self.assertEqual(result['segments'][1]['words'][0]['end'], 302.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
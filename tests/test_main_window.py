@@ -1,7 +1,39 @@
+import io
+import json
+import os
+import subprocess
+import tempfile
 import sys
+import threading
+import time
 import unittest
-from PyQt6.QtWidgets import QApplication
-from src.gui.main_window import MainWindow
+from unittest import mock
+
+# The GUI imports sibling packages (e.g. core) from src/, as run.py arranges at startup
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from PyQt6.QtCore import QThread
+from PyQt6.QtWidgets import QApplication, QFileDialog
+from core.alignment import segments_in_range
+from core.formatters import format_srt, write_result_files
+from core.transcript import Transcript
+import src.gui.main_window as main_window
+from src.gui.main_window import (
+    ALL_FORMATS_FILTER, LiveTranscript, MainWindow, RemoteTranscriptionWorker, WordAlignmentWorker
+)
+
+
+class StubAligner(WordAlignmentWorker):
+    """Gives each segment in range one word spanning it, without a model"""
+    ranges = []
+
+    def run(self):
+        self.ranges.append(self.time_range)
+        for index in segments_in_range(self.result['segments'], *self.time_range):
+            segment = self.result['segments'][index]
+            segment['words'] = [{'word': segment['text'], 'start': segment['start'], 'end': segment['end']}]
+        self.finished.emit(Transcript.from_result(self.result))
+
 
 class TestMainWindow(unittest.TestCase):
     @classmethod
@@ -17,10 +49,176 @@ class TestMainWindow(unittest.TestCase):
         for i, model in enumerate(models):
             self.assertEqual(self.window.model_combo.itemText(i), model)
 
+    def test_import_does_not_load_ml_stack(self):
+        # torch and whisper are loaded in the background after the window is shown
+        src_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+        output = subprocess.run(
+            [sys.executable, "-c", "import sys, gui.main_window; print('torch' in sys.modules, 'whisper' in sys.modules)"],
+            cwd=src_dir, capture_output=True, text=True, check=True
+        ).stdout
+        self.assertEqual(output.strip(), "False False")
+
     def test_initial_state(self):
         self.assertFalse(self.window.save_btn.isEnabled())
         self.assertEqual(self.window.status_label.text(), "Ready")
         self.assertEqual(self.window.file_list.count(), 0)
 
+    def test_remote_worker_reports_any_failure(self):
+        class ResettingClient:
+            url = "http://127.0.0.1:8765"
+
+            def submit(self, *args, **kwargs):
+                raise ConnectionResetError("Connection reset by peer")
+
+        worker = RemoteTranscriptionWorker(ResettingClient(), "tiny", "talk.wav")
+        errors = []
+        worker.error.connect(errors.append)
+        worker.run()
+        self.assertEqual(len(errors), 1)
+        self.assertIn("Connection reset", errors[0])
+
+    def test_closing_mid_job_hides_instead_of_blocking(self):
+        class SlowToStop(QThread):
+            # Like a worker in the middle of a long decoder step when cancel arrives
+            def __init__(self):
+                super().__init__()
+                self.cancelled = threading.Event()
+
+            def cancel(self):
+                self.cancelled.set()
+
+            def run(self):
+                self.cancelled.wait(10)
+                time.sleep(1.5)
+
+        window = MainWindow()
+        window.show()
+        window.worker = SlowToStop()
+        window.worker.start()
+        started = time.perf_counter()
+        self.assertFalse(window.close())
+        self.assertLess(time.perf_counter() - started, 1.2)
+        self.assertTrue(window.isHidden())
+        self.assertTrue(window.worker.wait(5000))
+        self.assertTrue(window.close())
+
+    def test_closing_during_a_slow_probe_hides_instead_of_blocking(self):
+        class SlowProbe(QThread):
+            # Like a hardware probe stuck importing torch or a service probe waiting on a socket
+            def run(self):
+                time.sleep(1.5)
+
+        window = MainWindow()
+        window.show()
+        for name in ('hardware_probe', 'service_probe'):
+            probe = getattr(window, name)
+            if probe is not None:
+                probe.wait()
+        window.service_probe = SlowProbe()
+        window.service_probe.start()
+        started = time.perf_counter()
+        self.assertFalse(window.close())
+        self.assertLess(time.perf_counter() - started, 1.2)
+        self.assertTrue(window.isHidden())
+        self.assertTrue(window.service_probe.wait(5000))
+        self.assertTrue(window.close())
+
+    def test_live_transcript_streams_segments_as_rows(self):
+        segments = [{'start': i, 'end': i + 1, 'text': f" segment {i}"} for i in range(500)]
+        live = self.window.live_transcript
+        live.start("srt")
+        for i in range(0, len(segments), 7):
+            live.add_segments(segments[i:i + 7])
+        live.flush()
+        self.assertEqual(live.segment_count, len(segments))
+        live.show_result({'text': "", 'segments': segments})
+        self.assertTrue(live.showing_segments())
+        output = io.StringIO()
+        live.model.write(output)
+        self.assertEqual(output.getvalue(), format_srt(segments))
+
+    def test_live_transcript_shows_json_in_chunks(self):
+        live = self.window.live_transcript
+        result = {'text': "word " * (LiveTranscript.CHUNK_CHARS // 2), 'segments': []}
+        live.start("json")
+        live.show_result(result)
+        self.assertFalse(live.showing_segments())
+        self.assertEqual(len(live.chunks), 2)
+        while live.chunks:
+            live.append_next_chunk()
+        self.assertTrue(self.window.output_text.isUndoRedoEnabled())
+        self.assertEqual(json.loads(self.window.output_text.toPlainText()), result)
+
+    def test_save_formats_from_the_result_with_edits(self):
+        segments = [{'start': i, 'end': i + 1, 'text': f" segment {i}"} for i in range(20)]
+        result = Transcript.from_result({'text': "".join(s['text'] for s in segments), 'segments': segments})
+        window = self.window
+        window.result, window.result_file = result, None
+        window.live_transcript.start("srt")
+        window.live_transcript.show_result(result)
+        window.live_transcript.model.setData(window.live_transcript.model.index(3), "fixed")
+
+        window.format_combo.setCurrentText("VTT Subtitles")
+        self.assertEqual(window.live_transcript.output_format, "vtt")
+        self.assertEqual(window.result['segments'][3]['text'], " fixed")
+
+        with tempfile.TemporaryDirectory() as directory:
+            base = os.path.join(directory, "talk")
+            self.assertEqual(window.save_outputs(base + ".srt", ""), {base + ".srt": "srt"})
+            self.assertEqual(window.save_outputs(base, "JSON Output (*.json)"), {base + ".json": "json"})
+            outputs = window.save_outputs(base + ".srt", ALL_FORMATS_FILTER)
+            self.assertIn(base + ".words.txt", outputs)
+            write_result_files(window.result, outputs)
+            with open(base + ".srt", encoding='utf-8') as f:
+                self.assertIn("fixed", f.read())
+            with open(base + ".json", encoding='utf-8') as f:
+                self.assertEqual(json.load(f)['segments'][3]['text'], " fixed")
+        window.format_combo.setCurrentIndex(0)
+        window.result = None
+
+    def wait_for(self, condition, timeout=10):
+        deadline = time.monotonic() + timeout
+        while not condition() and time.monotonic() < deadline:
+            self.app.processEvents()
+            time.sleep(0.01)
+        self.assertTrue(condition())
+
+    def test_word_timestamps_are_aligned_for_the_rows_in_view_and_before_saving(self):
+        segments = [{'start': i, 'end': i + 1, 'text': f" segment {i}"} for i in range(500)]
+        window = MainWindow()
+        window.show()
+        StubAligner.ranges = []
+        with tempfile.TemporaryDirectory() as directory, \
+                mock.patch.object(main_window, 'WordAlignmentWorker', StubAligner):
+            audio_file = os.path.join(directory, "talk.wav")
+            open(audio_file, 'wb').close()
+            window.result = Transcript.from_result({'text': "", 'segments': segments})
+            window.result_file, window.result_model = audio_file, "tiny"
+            window.live_transcript.start("text")
+            window.live_transcript.show_result(window.result)
+
+            window.format_combo.setCurrentText("Word Timestamps")
+            self.wait_for(lambda: window.live_transcript.model.has_words[0])
+            first, last = window.transcript_view.visible_rows()
+            self.assertEqual(StubAligner.ranges, [(0, last + 1)])
+            self.assertLess(last, 100)
+            self.assertFalse(window.live_transcript.model.has_words[499])
+
+            # Scrolling aligns the rows that come into view, and showing their words keeps the place
+            window.transcript_view.scrollToBottom()
+            self.wait_for(lambda: window.live_transcript.model.has_words[499])
+            self.assertTrue(window.transcript_view.at_bottom())
+            self.assertFalse(window.live_transcript.model.has_words[250])
+
+            saved = os.path.join(directory, "talk.words.txt")
+            with mock.patch.object(QFileDialog, 'getSaveFileName', return_value=(saved, "")):
+                window.save_transcription()
+                self.wait_for(lambda: os.path.exists(saved))
+            self.assertEqual(StubAligner.ranges[-1], (None, None))
+            with open(saved, encoding='utf-8') as f:
+                self.assertIn("segment 499", f.read())
+            self.assertTrue(all(segment.get('words') for segment in window.result['segments']))
+        window.close()
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
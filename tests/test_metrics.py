@@ -0,0 +1,32 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from core.metrics import normalize_text, word_errors, word_error_rate, corpus_word_error_rate
+
+
+class TestMetrics(unittest.TestCase):
+    def test_normalize_ignores_case_and_punctuation(self):
+        self.assertEqual(normalize_text("Hello, World! Don't 'stop'."), ["hello", "world", "don't", "stop"])
+
+    def test_identical_text_has_no_errors(self):
+        self.assertEqual(word_error_rate("The quick brown fox.", "the quick brown fox"), 0.0)
+
+    def test_counts_substitutions_deletions_and_insertions(self):
+        self.assertEqual(word_errors("the quick brown fox", "the quack brown"), 2)
+        self.assertEqual(word_errors("a b", "x a b y"), 2)
+        self.assertAlmostEqual(word_error_rate("one two three four", "one too three"), 0.5)
+
+    def test_empty_reference(self):
+        self.assertEqual(word_error_rate("", ""), 0.0)
+        self.assertEqual(word_error_rate("", "noise"), 1.0)
+
+    def test_corpus_rate_is_weighted_by_reference_length(self):
+        pairs = [("a b c d", "a b c d"), ("e f", "e x")]
+        self.assertAlmostEqual(corpus_word_error_rate(pairs), 1 / 6)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+import os
+import sys
+import tempfile
+import unittest
+
+import torch
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from core.model_cache import ModelCache, model_size_mb
+from core.quantize import load_quantized_model, quantize_model, quantized_cache_path
+from helpers import save_small_checkpoint
+
+
+class WritesMarker:
+    """Pickled object that would create a file if unpickling ran code"""
+
+    def __init__(self, path):
+        self.path = path
+
+    def __reduce__(self):
+        return (open, (self.path, 'w'))
+
+
+def fake_loader(loaded):
+    """Build a loader that returns a 1 MB model and records every load"""
+    def loader(model_name, device, dtype):
+        loaded.append((model_name, device, dtype))
+        return torch.nn.Linear(512, 512, bias=False)  # 512 * 512 * 4 bytes = 1 MB
+    return loader
+
+
+class TestModelCache(unittest.TestCase):
+    def test_second_get_is_cached(self):
+        loaded = []
+        cache = ModelCache(memory_budget_mb=10, loader=fake_loader(loaded))
+        first, first_cached = cache.get("tiny", "cpu")
+        second, second_cached = cache.get("tiny", "cpu")
+        self.assertFalse(first_cached)
+        self.assertTrue(second_cached)
+        self.assertIs(first, second)
+        self.assertEqual(len(loaded), 1)
+
+    def test_key_includes_device_and_dtype(self):
+        loaded = []
+        cache = ModelCache(memory_budget_mb=10, loader=fake_loader(loaded))
+        cache.get("tiny", "cpu")
+        cache.get("tiny", "cpu", dtype="float16")
+        self.assertEqual(len(loaded), 2)
+
+    def test_evicts_least_recently_used(self):
+        loaded = []
+        cache = ModelCache(memory_budget_mb=2, loader=fake_loader(loaded))
+        cache.get("tiny", "cpu")
+        cache.get("base", "cpu")
+        cache.get("tiny", "cpu")  # base is now least recently used
+        cache.get("small", "cpu")
+        self.assertTrue(cache.contains("tiny", "cpu"))
+        self.assertFalse(cache.contains("base", "cpu"))
+        self.assertTrue(cache.contains("small", "cpu"))
+
+    def test_keeps_most_recent_model_over_budget(self):
+        cache = ModelCache(memory_budget_mb=0, loader=fake_loader([]))
+        model, _ = cache.get("tiny", "cpu")
+        self.assertTrue(cache.contains("tiny", "cpu"))
+        self.assertAlmostEqual(model_size_mb(model), 1.0)
+
+
+class TestQuantize(unittest.TestCase):
+    def test_quantized_linear_keeps_outputs_and_shrinks(self):
+        torch.manual_seed(0)
+        model = torch.nn.Sequential(torch.nn.Linear(512, 512), torch.nn.ReLU(), torch.nn.Linear(512, 8))
+        inputs = torch.randn(4, 512)
+        expected = model(inputs)
+        quantized = quantize_model(model)
+        self.assertLess(model_size_mb(quantized), 0.5)
+        self.assertLess((quantized(inputs) - expected).abs().max().item(), 0.05)
+
+    def test_cache_path_follows_checkpoint_changes(self):
+        with tempfile.TemporaryDirectory() as directory:
+            checkpoint = os.path.join(directory, "custom.pt")
+            with open(checkpoint, 'wb') as f:
+                f.write(b"v1")
+            first = quantized_cache_path(checkpoint, directory)
+            with open(checkpoint, 'wb') as f:
+                f.write(b"v2 with more bytes")
+            self.assertNotEqual(first, quantized_cache_path(checkpoint, directory))
+            self.assertEqual(quantized_cache_path("tiny", directory), quantized_cache_path("tiny", directory))
+
+    def test_cached_weights_rebuild_the_same_model(self):
+        with tempfile.TemporaryDirectory() as directory:
+            checkpoint = os.path.join(directory, "small.pt")
+            save_small_checkpoint(checkpoint)
+            quantized = load_quantized_model(checkpoint, directory)
+            self.assertTrue(os.path.exists(quantized_cache_path(checkpoint, directory)))
+            cached = load_quantized_model(checkpoint, directory)
+            self.assertIsInstance(cached.decoder.blocks[0].mlp[0], torch.ao.nn.quantized.dynamic.Linear)
+            mel = torch.randn(1, 80, 3000)
+            tokens = torch.tensor([[50258, 50259, 50359]])
+            with torch.no_grad():
+                features = quantized.encoder(mel)
+                self.assertTrue(torch.equal(cached.encoder(mel), features))
+                self.assertTrue(torch.equal(cached.decoder(tokens, features), quantized.decoder(tokens, features)))
+            self.assertTrue(torch.equal(cached.alignment_heads.to_dense(), quantized.alignment_heads.to_dense()))
+
+    def test_cache_file_cannot_run_code(self):
+        with tempfile.TemporaryDirectory() as directory:
+            checkpoint = os.path.join(directory, "small.pt")
+            save_small_checkpoint(checkpoint)
+            marker = os.path.join(directory, "pwned")
+            os.makedirs(os.path.dirname(quantized_cache_path(checkpoint, directory)), exist_ok=True)
+            torch.save(WritesMarker(marker), quantized_cache_path(checkpoint, directory))
+            model = load_quantized_model(checkpoint, directory)
+            self.assertFalse(os.path.exists(marker))
+            # The bad file was replaced by a real one
+            self.assertIsInstance(model.encoder.blocks[0].mlp[0], torch.ao.nn.quantized.dynamic.Linear)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import os
+import sys
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+import wave
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from core.pipeline import _cache_options, prefetch_audio, BackgroundWriter
+
+
+class TestPipelineStages(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.files = []
+        for name in ("one.wav", "two.wav", "three.wav"):
+            path = os.path.join(self.tmp.name, name)
+            with open(path, 'wb') as f:
+                f.write(b"not really audio")
+            self.files.append(path)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_prefetch_keeps_queue_order_and_skips_cached_files(self):
+        files = self.files + [os.path.join(self.tmp.name, "missing.wav")]
+        lookup = lambda audio_file: {'text': os.path.basename(audio_file)}
+        items = list(prefetch_audio(files, lookup, depth=1))
+        self.assertEqual([index for index, *_ in items], [0, 1, 2, 3])
+        self.assertEqual(items[1][2], {'text': "two.wav"})
+        self.assertIsNone(items[1][3])
+        self.assertIn("File not found", items[3][4])
+
+    @unittest.skipUnless(hasattr(os, 'mkfifo') and shutil.which("ffmpeg"), "needs FFmpeg and named pipes")
+    def test_stopping_early_kills_decodes_in_flight(self):
+        first = os.path.join(self.tmp.name, "first.wav")
+        with wave.open(first, 'wb') as f:
+            f.setnchannels(1)
+            f.setsampwidth(2)
+            f.setframerate(16000)
+            f.writeframes(b"\0\0" * 16000)
+        # FFmpeg blocks on a pipe nobody writes to, like a decode that would take minutes
+        stalled = [os.path.join(self.tmp.name, f"stalled{i}.wav") for i in range(4)]
+        for path in stalled:
+            os.mkfifo(path)
+        self.addCleanup(self.release_pipes, stalled)
+
+        with mock.patch('core.audio.probe_duration', return_value=None):
+            items = prefetch_audio([first] + stalled, None, depth=2, workers=2)
+            index, _, _, audio_data, error = next(items)
+            self.assertEqual((index, len(audio_data), error), (0, 16000, None))
+            time.sleep(0.5)  # Let both workers start FFmpeg on a stalled file
+            # Closed from another thread so a regression fails here instead of hanging the suite
+            closer = threading.Thread(target=items.close, daemon=True)
+            closer.start()
+            closer.join(0.5)
+            self.assertFalse(closer.is_alive())
+
+        deadline = time.monotonic() + 5
+        while any(t.name.startswith("audio-prefetch") for t in threading.enumerate()) and time.monotonic() < deadline:
+            time.sleep(0.05)
+        self.assertFalse([t.name for t in threading.enumerate() if t.name.startswith("audio-prefetch")])
+
+    @staticmethod
+    def release_pipes(paths):
+        # Give any FFmpeg still reading a pipe end of file, so a failing test does not leave it running
+        for path in paths:
+            try:
+                os.close(os.open(path, os.O_WRONLY | os.O_NONBLOCK))
+            except OSError:
+                pass
+
+    def test_cache_key_ignores_display_only_options(self):
+        # SRT and Text Only differ only in verbose, so they share one transcription
+        self.assertEqual(_cache_options({'word_timestamps': False, 'verbose': True}, False),
+                         _cache_options({'word_timestamps': False, 'verbose': False}, False))
+        self.assertNotEqual(_cache_options({'word_timestamps': True}, False),
+                            _cache_options({'word_timestamps': False}, False))
+
+    def test_writer_writes_every_format_before_close_returns(self):
+        written = []
+        writer = BackgroundWriter(lambda *args: written.append(args), max_pending=1)
+        for index, audio_file in enumerate(self.files):
+            writer.submit(index, audio_file, {'text': "hello", 'segments': []}, ["text", "srt"])
+        writer.close()
+        self.assertEqual(sorted(args[0] for args in written), [0, 1, 2])
+        for index, audio_file, result, output_files, error in written:
+            self.assertIsNone(error)
+            self.assertEqual([os.path.splitext(f)[1] for f in output_files], [".txt", ".srt"])
+            with open(output_files[0], encoding='utf-8') as f:
+                self.assertEqual(f.read(), "hello")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+import importlib
+import os
+import sys
+import threading
+import time
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import core.progress as progress
+from core.progress import decoder_progress, ProgressEstimate, format_duration, JobControl, TranscriptionCancelled
+from helpers import small_model
+
+
+class TestDecoderProgress(unittest.TestCase):
+    def test_reports_whisper_seek_position(self):
+        updates = []
+        with decoder_progress(lambda processed, total: updates.append((processed, total))):
+            # Drive the progress bar the way whisper.transcribe does
+            whisper_transcribe = importlib.import_module('whisper.transcribe')
+            with whisper_transcribe.tqdm.tqdm(total=6000, unit="frames", disable=True) as pbar:
+                pbar.update(3000)
+                pbar.update(3000)
+        self.assertEqual(updates, [(30.0, 60.0), (60.0, 60.0)])
+
+    def test_no_callback_outside_block(self):
+        updates = []
+        with decoder_progress(lambda processed, total: updates.append(processed)):
+            pass
+        whisper_transcribe = importlib.import_module('whisper.transcribe')
+        with whisper_transcribe.tqdm.tqdm(total=100, disable=True) as pbar:
+            pbar.update(100)
+        self.assertEqual(updates, [])
+
+    def test_cancel_from_callback_stops_transcription(self):
+        control = JobControl()
+        control.cancel()
+        whisper_transcribe = importlib.import_module('whisper.transcribe')
+        with decoder_progress(lambda processed, total: control.check()):
+            with self.assertRaises(TranscriptionCancelled):
+                with whisper_transcribe.tqdm.tqdm(total=6000, disable=True) as pbar:
+                    pbar.update(3000)
+
+    def test_streams_the_segments_of_a_real_transcription(self):
+        # Fails if whisper.transcribe stops keeping its segments where the shim reads them
+        import whisper
+        model = small_model()
+        audio = np.random.default_rng(0).standard_normal(35 * 16000).astype(np.float32) * 0.1
+        streamed = []
+        with decoder_progress(lambda processed, total: None, streamed.extend):
+            result = whisper.transcribe(model, audio, language="en", temperature=0.0, fp16=False, verbose=None)
+        self.assertGreater(len(result['segments']), 1)
+        self.assertEqual(streamed, result['segments'])
+        self.assertFalse(progress._streaming_unavailable)
+
+    def test_missing_segments_disable_streaming_with_a_warning(self):
+        whisper_transcribe = importlib.import_module('whisper.transcribe')
+        streamed = []
+        saved, progress._streaming_unavailable = progress._streaming_unavailable, False
+        try:
+            with decoder_progress(None, streamed.extend):
+                # Updated from a frame with no all_segments, like a whisper that renamed it
+                with whisper_transcribe.tqdm.tqdm(total=6000, disable=True) as pbar:
+                    pbar.update(3000)
+                    pbar.update(3000)
+            self.assertEqual(streamed, [])
+            self.assertTrue(progress._streaming_unavailable)
+        finally:
+            progress._streaming_unavailable = saved
+
+
+class TestJobControl(unittest.TestCase):
+    def test_pause_blocks_until_resume(self):
+        control = JobControl()
+        control.pause()
+        passed = threading.Event()
+        thread = threading.Thread(target=lambda: (control.check(), passed.set()))
+        thread.start()
+        self.assertFalse(passed.wait(0.2))
+        control.resume()
+        self.assertTrue(passed.wait(2))
+        thread.join()
+
+    def test_cancel_wakes_paused_job(self):
+        control = JobControl()
+        control.pause()
+        errors = []
+        def check():
+            try:
+                control.check()
+            except TranscriptionCancelled:
+                errors.append("cancelled")
+        thread = threading.Thread(target=check)
+        thread.start()
+        control.cancel()
+        thread.join(2)
+        self.assertEqual(errors, ["cancelled"])
+        self.assertFalse(control.paused)
+
+
+class TestProgressEstimate(unittest.TestCase):
+    def test_eta_from_measured_speed(self):
+        # 30 s of audio decoded in about 15 s of wall-clock time
+        estimate = ProgressEstimate(start_time=time.time() - 15)
+        estimate.update(30.0, 120.0)
+        self.assertAlmostEqual(estimate.fraction, 0.25)
+        self.assertAlmostEqual(estimate.real_time_factor, 0.5, places=1)
+        self.assertAlmostEqual(estimate.eta, 45.0, delta=1.0)
+
+    def test_format_duration(self):
+        self.assertEqual(format_duration(42), "42s")
+        self.assertEqual(format_duration(185), "3m05s")
+        self.assertEqual(format_duration(3720), "1h02m")
+
+
+if __name__ == '__main__':
+    unittest.main()
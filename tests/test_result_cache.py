@@ -0,0 +1,64 @@
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from core.result_cache import ResultCache
+
+RESULT = {'text': ' hello', 'language': 'en', 'segments': [{'id': 0, 'start': 0.0, 'end': 1.0, 'text': ' hello'}]}
+
+
+class TestResultCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = ResultCache(cache_dir=os.path.join(self.tmp.name, "cache"), max_size_mb=10)
+        self.audio_file = os.path.join(self.tmp.name, "clip.wav")
+        with open(self.audio_file, 'wb') as f:
+            f.write(b"RIFF" + os.urandom(4096))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip(self):
+        options = {'word_timestamps': False, 'verbose': False}
+        self.assertIsNone(self.cache.get(self.audio_file, "tiny", options))
+        self.cache.put(self.audio_file, "tiny", options, RESULT)
+        self.assertEqual(self.cache.get(self.audio_file, "tiny", options), RESULT)
+
+    def test_key_depends_on_model_and_options(self):
+        self.cache.put(self.audio_file, "tiny", {'word_timestamps': False}, RESULT)
+        self.assertIsNone(self.cache.get(self.audio_file, "base", {'word_timestamps': False}))
+        self.assertIsNone(self.cache.get(self.audio_file, "tiny", {'word_timestamps': True}))
+
+    def test_failed_put_leaves_no_temporary_file(self):
+        self.cache.put(self.audio_file, "tiny", {}, {'text': object()})
+        self.assertIsNone(self.cache.get(self.audio_file, "tiny", {}))
+        self.assertEqual(os.listdir(self.cache._entries_dir()), [])
+
+    def test_same_content_at_another_path_hits(self):
+        self.cache.put(self.audio_file, "tiny", {}, RESULT)
+        copy = os.path.join(self.tmp.name, "copy.wav")
+        with open(self.audio_file, 'rb') as src, open(copy, 'wb') as dst:
+            dst.write(src.read())
+        self.assertEqual(self.cache.get(copy, "tiny", {}), RESULT)
+
+    def test_changed_content_misses(self):
+        self.cache.put(self.audio_file, "tiny", {}, RESULT)
+        with open(self.audio_file, 'ab') as f:
+            f.write(b"more audio")
+        self.assertIsNone(self.cache.get(self.audio_file, "tiny", {}))
+
+    def test_evicts_least_recently_used(self):
+        self.cache.put(self.audio_file, "tiny", {}, RESULT)
+        old_entry = os.path.join(self.cache._entries_dir(), os.listdir(self.cache._entries_dir())[0])
+        os.utime(old_entry, (time.time() - 60, time.time() - 60))
+        self.cache.max_size_mb = 0
+        self.cache.put(self.audio_file, "base", {}, RESULT)
+        self.assertFalse(os.path.exists(old_entry))
+
+
+if __name__ == '__main__':
+    unittest.main()
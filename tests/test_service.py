@@ -0,0 +1,107 @@
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+import urllib.error
+import urllib.request
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from core.client import (
+    ServiceClient, ServiceError, CANCELLED, DONE, FAILED, TOKEN_HEADER, read_token_file, write_token_file
+)
+from core.service import TranscriptionService, make_server
+
+
+class BlockingService(TranscriptionService):
+    """Service whose jobs wait for release and record that they ran"""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.ran = []
+        super().__init__()
+
+    def _transcribe(self, job):
+        self.ran.append(job.id)
+        self.release.wait(10)
+        return {'text': "", 'segments': []}
+
+
+class TestTranscriptionService(unittest.TestCase):
+    def setUp(self):
+        self.server = make_server(port=0, token="secret")
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.client = ServiceClient(self.url, token="secret")
+        self.tmp = tempfile.NamedTemporaryFile(suffix=".wav", delete=False)
+        self.tmp.close()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        os.unlink(self.tmp.name)
+
+    def test_health_and_token(self):
+        self.assertTrue(self.client.available())
+        self.assertEqual(self.client.health()['status'], "ok")
+        with self.assertRaises(ServiceError):
+            ServiceClient(self.url, token="wrong").health()
+        self.assertFalse(ServiceClient("http://127.0.0.1:9", token="secret").available())
+        with self.assertRaises(ValueError):
+            make_server(port=0)
+
+    def test_rejects_non_json_posts(self):
+        # What a cross-site form post looks like, with the right token even
+        request = urllib.request.Request(self.url + "/jobs", data=b"file=/etc/passwd", method="POST")
+        request.add_header("Content-Type", "application/x-www-form-urlencoded")
+        request.add_header(TOKEN_HEADER, "secret")
+        with self.assertRaises(urllib.error.HTTPError) as raised:
+            urllib.request.urlopen(request, timeout=5)
+        self.assertEqual(raised.exception.code, 415)
+        self.assertEqual(self.server.service.jobs, {})
+
+    def test_token_file_is_private(self):
+        path = os.path.join(tempfile.mkdtemp(), "cache", "service-token")
+        write_token_file("secret", path)
+        self.assertEqual(read_token_file(path), "secret")
+        if os.name == 'posix':
+            self.assertEqual(os.stat(path).st_mode & 0o777, 0o600)
+        self.assertIsNone(read_token_file(path + ".missing"))
+
+    def test_rejects_bad_jobs(self):
+        with self.assertRaisesRegex(ServiceError, "File not found"):
+            self.client.submit(self.tmp.name + ".missing", "tiny")
+        with self.assertRaisesRegex(ServiceError, "Unknown job"):
+            self.client.status("12345")
+
+    def test_cancelled_queued_job_never_runs(self):
+        service = BlockingService()
+        running = service.submit({'audio_file': self.tmp.name, 'model': "tiny"})
+        queued = service.submit({'audio_file': self.tmp.name, 'model': "tiny"})
+        while not service.ran:
+            time.sleep(0.01)
+        service.cancel(queued.id)
+        service.release.set()
+        while running.state != DONE:
+            time.sleep(0.01)
+        time.sleep(0.1)
+        self.assertEqual(service.ran, [running.id])
+        self.assertEqual(queued.state, CANCELLED)
+
+    def test_failed_job_reports_error(self):
+        job_id = self.client.submit(self.tmp.name, os.path.join(tempfile.gettempdir(), "no_such_model.pt"),
+                                    use_gpu=False, use_cache=False)
+        with self.assertRaises(ServiceError):
+            self.client.wait(job_id, poll_interval=0.05)
+        status = self.client.status(job_id)
+        self.assertEqual(status['state'], FAILED)
+        self.assertTrue(status['error'])
+        self.assertEqual(status['metrics']['error'], status['error'])
+        with self.assertRaisesRegex(ServiceError, "failed"):
+            self.client.result(job_id)
+
+
+if __name__ == '__main__':
+    unittest.main()
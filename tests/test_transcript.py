@@ -0,0 +1,57 @@
+import io
+import json
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from core.formatters import format_result, write_result
+from core.transcript import Transcript, as_dict
+
+
+def make_result(count):
+    segments = []
+    for i in range(count):
+        start = i * 2.37
+        segment = {'id': i, 'seek': i // 10 * 3000, 'start': start, 'end': start + 1.91, 'text': f" Segment {i}.",
+                   'tokens': [50364 + i % 7, 1000 + i, 13], 'temperature': 0.0, 'avg_logprob': -0.1234567 * (i % 5),
+                   'compression_ratio': 1.2345678, 'no_speech_prob': 0.0123456789}
+        if i % 3:
+            segment['words'] = [{'word': " Segment", 'start': start, 'end': start + 0.8, 'probability': 0.91},
+                                {'word': f" {i}.", 'start': start + 0.8, 'end': start + 1.91, 'probability': 0.4}]
+        segments.append(segment)
+    return {'text': "".join(segment['text'] for segment in segments), 'segments': segments, 'language': "en",
+            'vad': {'skipped_fraction': 0.25}}
+
+
+class TestTranscript(unittest.TestCase):
+    def test_to_dict_round_trips_exactly(self):
+        result = make_result(50)
+        transcript = Transcript(result)
+        self.assertEqual(json.dumps(transcript.to_dict()), json.dumps(result))
+        self.assertEqual(transcript['language'], "en")
+        self.assertNotIn('words', transcript['segments'][0])
+        self.assertEqual(transcript['segments'][-1]['words'], result['segments'][-1]['words'])
+        self.assertEqual(Transcript({'text': "", 'segments': []}).to_dict(), {'text': "", 'segments': []})
+
+    def test_formatters_read_transcripts_like_dicts(self):
+        result = make_result(50)
+        transcript = Transcript.from_result(result)
+        for output_format in ("text", "srt", "vtt", "word_timestamps", "json"):
+            self.assertEqual(format_result(transcript, output_format), format_result(result, output_format))
+            expected, output = io.StringIO(), io.StringIO()
+            write_result(result, output_format, expected)
+            write_result(transcript, output_format, output)
+            self.assertEqual(output.getvalue(), expected.getvalue())
+        self.assertIs(as_dict(result), result)
+
+    def test_columns_are_smaller_than_the_dicts(self):
+        transcript = Transcript(make_result(20000))
+        self.assertEqual(len(transcript['segments']), 20000)
+        # A dict per segment and word alone takes several hundred bytes each
+        self.assertLess(transcript.nbytes / 20000, 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import io
+import os
+import sys
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from PyQt6.QtCore import Qt
+from PyQt6.QtWidgets import QApplication
+from core.formatters import format_srt, format_word_timestamps
+from core.transcript import Transcript
+from gui.transcript_view import TranscriptModel, TranscriptView
+
+
+def make_segments(count, words=False):
+    segments = []
+    for i in range(count):
+        segment = {'start': i * 2.0, 'end': i * 2.0 + 1.5, 'text': f" segment {i} text"}
+        if words:
+            segment['words'] = [{'word': f" w{i}", 'start': i * 2.0, 'end': i * 2.0 + 0.5},
+                                {'word': " text", 'start': i * 2.0 + 0.5, 'end': i * 2.0 + 1.5}]
+        segments.append(segment)
+    return segments
+
+
+class TestTranscriptModel(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication(sys.argv)
+
+    def test_streamed_rows_write_the_same_output(self):
+        segments = make_segments(100, words=True)
+        model = TranscriptModel("word_timestamps")
+        for i in range(0, len(segments), 9):
+            model.append_segments(segments[i:i + 9])
+        self.assertEqual(model.rowCount(), len(segments))
+        output = io.StringIO()
+        model.write(output)
+        self.assertEqual(output.getvalue(), format_word_timestamps({'segments': segments}))
+        self.assertEqual(model.segment(3)['words'], segments[3]['words'])
+        self.assertEqual(model.data(model.index(1)), "[00:02.000]  w1 [00:02.500]  text")
+
+    def test_edits_change_the_written_transcript(self):
+        segments = make_segments(10, words=True)
+        model = TranscriptModel("srt")
+        model.set_segments(segments)
+        index = model.index(4)
+        self.assertTrue(model.flags(index) & Qt.ItemFlag.ItemIsEditable)
+        self.assertEqual(model.data(index, Qt.ItemDataRole.EditRole), "segment 4 text")
+        self.assertTrue(model.setData(index, "corrected line"))
+        self.assertNotIn('words', model.segment(4))
+
+        segments[4] = {'start': 8.0, 'end': 9.5, 'text': " corrected line"}
+        output = io.StringIO()
+        model.write(output)
+        self.assertEqual(output.getvalue(), format_srt(segments))
+        self.assertEqual(model.data(index), "00:00:08.000 --> 00:00:09.500  corrected line")
+
+    def test_200k_segments_stay_responsive(self):
+        segments = make_segments(200000)
+        model = TranscriptModel("srt")
+        view = TranscriptView(model)
+        view.resize(600, 400)
+        started = time.perf_counter()
+        for i in range(0, len(segments), 1000):
+            model.append_segments(segments[i:i + 1000])
+        view.show()
+        view.scrollToBottom()
+        self.app.processEvents()
+        self.assertLess(time.perf_counter() - started, 10)
+        self.assertEqual(model.rowCount(), 200000)
+        self.assertEqual(model.text(199999), " segment 199999 text")
+        # Texts share one buffer per appended batch rather than one string object per segment
+        self.assertEqual(len(model._text_chunks), 200)
+        self.assertEqual(sum(len(chunk) for chunk in model._text_chunks), model.text_offsets[-1])
+        view.close()
+
+    def test_finished_transcript_shares_its_buffers(self):
+        segments = make_segments(50, words=True)
+        transcript = Transcript.from_result({'text': "", 'segments': segments})
+        model = TranscriptModel("word_timestamps")
+        model.append_segments(segments[:3])
+        model.append_segments(transcript['segments'])
+        self.assertIs(model._text_chunks[-1], transcript.texts)
+        self.assertEqual(model.text(40), segments[37]['text'])
+        self.assertEqual(model.words(40), segments[37]['words'])
+        output = io.StringIO()
+        model.write(output)
+        self.assertEqual(output.getvalue(), format_word_timestamps({'segments': segments[:3] + segments}))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from core.vad import detect_speech, compact_audio, frame_features, remap_result, skipped_fraction
+
+SR = 16000
+
+
+def tone(seconds):
+    t = np.arange(int(seconds * SR)) / SR
+    return (0.3 * np.sin(2 * np.pi * 200 * t) + 0.1 * np.sin(2 * np.pi * 400 * t)).astype(np.float32)
+
+
+class TestVad(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        silence = lambda seconds: np.zeros(int(seconds * SR), dtype=np.float32)
+        self.audio = np.concatenate([silence(5), tone(2), silence(10), tone(2), silence(3)])
+        self.audio += 0.001 * rng.standard_normal(len(self.audio)).astype(np.float32)
+
+    def test_detects_speech_between_silences(self):
+        spans = detect_speech(self.audio)
+        self.assertEqual(len(spans), 2)
+        self.assertAlmostEqual(spans[0][0] / SR, 5, delta=0.5)
+        self.assertAlmostEqual(spans[1][1] / SR, 19, delta=0.5)
+        self.assertGreater(skipped_fraction(spans, len(self.audio)), 0.7)
+
+    def test_features_do_not_depend_on_chunking(self):
+        whole = frame_features(self.audio, 480)
+        chunked = frame_features(self.audio, 480, chunk_frames=7)
+        self.assertEqual(len(whole[0]), len(self.audio) // 480)
+        for expected, actual in zip(whole, chunked):
+            np.testing.assert_allclose(actual, expected, rtol=1e-5)
+
+    def test_continuous_and_silent_audio(self):
+        self.assertEqual(detect_speech(tone(5)), [(0, 5 * SR)])
+        self.assertEqual(detect_speech(np.zeros(3 * SR, dtype=np.float32)), [])
+
+    def test_remaps_timestamps_to_original_timeline(self):
+        spans = [(5 * SR, 7 * SR), (17 * SR, 19 * SR)]
+        compact, timeline = compact_audio(self.audio, spans)
+        self.assertEqual(len(compact), 4 * SR)
+        result = {'segments': [
+            {'start': 0.5, 'end': 2.0, 'words': [{'start': 0.5, 'end': 1.0}]},
+            {'start': 2.0, 'end': 3.5}
+        ]}
+        remap_result(result, timeline)
+        self.assertEqual((result['segments'][0]['start'], result['segments'][0]['end']), (5.5, 7.0))
+        self.assertEqual(result['segments'][0]['words'][0]['end'], 6.0)
+        self.assertEqual((result['segments'][1]['start'], result['segments'][1]['end']), (17.0, 18.5))
+
+
+if __name__ == '__main__':
+    unittest.main()